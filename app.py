@@ -4,15 +4,25 @@
 使用 Streamlit 框架
 """
 
+from __future__ import annotations
+
 import streamlit as st
-import tempfile
+import io
 import os
+import tempfile
+import time
+import uuid
 from datetime import datetime
+from itertools import islice
 from scour_calc import (
-    calc_d21, calc_d22, k1_from_type,
-    K1Type, UcMethod
+    calc_d22, k1_from_type,
+    K1Type, UcMethod, K1Code, UcCode, K1_LABELS, UC_LABELS
 )
-from word_export import export_d21_docx, export_d22_docx
+from report_jobs import ReportJobQueue
+from report_model import build_report, render_html
+from scour_incremental import D21Evaluator
+from scour_pipeline import SECTION_COLUMNS, read_sections_csv, run_reach_pipeline, write_envelope_csv
+from shared_cache import SharedCache, make_key
 
 # 页面配置
 st.set_page_config(
@@ -86,6 +96,150 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_report_queue() -> ReportJobQueue:
+    """全服务共享的计算书导出队列（后台线程生成，不阻塞会话）。"""
+    return ReportJobQueue(max_workers=2)
+
+
+@st.cache_resource
+def get_shared_cache() -> SharedCache:
+    """全服务共享的结果/导出缓存：总量 256 MB、单会话 32 MB、1 小时未用即过期。"""
+    return SharedCache(max_bytes=256 << 20, ttl_s=3600, per_session_bytes=32 << 20)
+
+
+# 河段批量结果文件目录；超过保留期的文件在下次计算时清理
+PIPELINE_RESULT_DIR = os.path.join(tempfile.gettempdir(), "scour_pipeline_results")
+PIPELINE_RETENTION_S = 24 * 3600.0
+PIPELINE_PREVIEW_ROWS = 1000
+
+
+def pipeline_result_path(key: str) -> str:
+    """批量结果 CSV 的存放路径（按内容键命名，相同输入跨会话共用一个文件）。"""
+    os.makedirs(PIPELINE_RESULT_DIR, exist_ok=True)
+    cutoff = time.time() - PIPELINE_RETENTION_S
+    for fn in os.listdir(PIPELINE_RESULT_DIR):
+        p = os.path.join(PIPELINE_RESULT_DIR, fn)
+        try:
+            if os.path.getmtime(p) < cutoff:
+                os.unlink(p)
+        except OSError:
+            pass
+    return os.path.join(PIPELINE_RESULT_DIR, f"{key}.csv")
+
+
+def render_workspace_panel(path: str, sections_file, defaults: dict) -> None:
+    """河段批量的工程工作区模式：断面与结果保存在 SQLite 工作区，只重算输入有变化的断面。"""
+    from scour_workspace import Workspace, write_workspace_csv
+
+    c1, c2 = st.columns([1, 1])
+    with c1:
+        run_import = st.button(
+            "🚀 导入断面表并计算", type="primary", use_container_width=True,
+            disabled=sections_file is None, key="ws_import_btn",
+        )
+    with c2:
+        run_open = st.button("📂 打开工作区（重算过期断面）", use_container_width=True, key="ws_open_btn")
+    if not (run_import or run_open or st.session_state.get("ws_open") == path):
+        return
+
+    try:
+        with Workspace(path) as ws:
+            if run_import:
+                text = io.TextIOWrapper(io.BytesIO(sections_file.getvalue()), encoding="utf-8-sig", newline="")
+                n_import = ws.upsert_sections(read_sections_csv(text), defaults=defaults)
+                st.info(f"已导入/更新 {n_import} 个断面")
+            if run_import or run_open:
+                n_calc = ws.recompute()
+                st.success(f"✅ 工作区共 {ws.count()} 个断面，本次计算 {n_calc} 个（输入未变的断面沿用已保存的结果）")
+                st.session_state.ws_open = path
+                st.session_state.pop("ws_export", None)
+
+            st.markdown("#### hs_max 最大的 20 个断面")
+            st.dataframe(ws.top("hs_max", 20), use_container_width=True)
+
+            if st.button("📄 导出工作区包络 CSV", use_container_width=True, key="ws_export_btn"):
+                out = pipeline_result_path(make_key("workspace", os.path.abspath(path), uuid.uuid4().hex))
+                with open(out, "w", encoding="utf-8-sig", newline="") as f:
+                    write_workspace_csv(ws, f)
+                st.session_state.ws_export = out
+    except Exception as e:
+        st.error(f"❌ 工作区错误：{str(e)}")
+        st.session_state.pop("ws_open", None)
+        return
+
+    out = st.session_state.get("ws_export")
+    if out and os.path.exists(out):
+        with open(out, "rb") as f:
+            st.download_button(
+                label="💾 下载包络 CSV",
+                data=f,
+                file_name=f"工作区包络_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv",
+                use_container_width=True,
+                key="ws_download_btn",
+            )
+
+
+def session_id() -> str:
+    """当前会话标识（用于共享缓存按会话记账）。"""
+    if "_session_id" not in st.session_state:
+        st.session_state._session_id = uuid.uuid4().hex
+    return st.session_state._session_id
+
+
+def render_export_job(kind: str, inputs: dict, name: str | None) -> None:
+    """提交计算书导出任务，并在页面上轮询显示进度/提供下载。"""
+    state_key = f"export_job_{kind}"
+    queue = get_report_queue()
+
+    if st.button("📥 生成 Word 计算书", type="secondary", use_container_width=True, key=f"export_{kind}_btn"):
+        try:
+            st.session_state[state_key] = queue.submit(kind, inputs, name=name)
+        except Exception as e:
+            st.error(f"❌ 导出错误：{str(e)}")
+
+    job_id = st.session_state.get(state_key)
+    if not job_id:
+        return
+    job = queue.get(job_id)
+    if job is None:
+        st.warning("导出任务已过期，请重新生成。")
+        st.session_state.pop(state_key, None)
+        return
+    if job.status == "failed":
+        st.error(f"❌ 导出错误：{job.error}")
+    elif job.status == "done" and job.output and os.path.exists(job.output):
+        def _read() -> bytes:
+            with open(job.output, "rb") as f:
+                return f.read()
+
+        # 每次重绘都要给下载按钮传字节，放进共享缓存避免反复读盘、各会话各存一份
+        data = get_shared_cache().get_or_compute(
+            make_key("docx", job.output, os.path.getmtime(job.output)), _read, session=session_id()
+        )
+        st.download_button(
+            label="💾 点击下载",
+            data=data,
+            file_name=f"冲刷计算书_{kind.upper()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            use_container_width=True
+        )
+    else:
+        st.progress(job.progress, text="计算书生成中，可继续其他操作…")
+        st.button("🔄 刷新导出状态", use_container_width=True, key=f"refresh_{kind}_btn")
+
+
+def render_report_preview(kind: str, inputs: dict, name: str | None, result) -> None:
+    """页面内计算书预览（与 Word 计算书同一内容），核对计算过程无需下载 docx。"""
+    with st.expander("👁️ 计算书预览", expanded=False):
+        try:
+            report = build_report(kind, name=name, inputs=inputs, result=result)
+            st.markdown(render_html(report), unsafe_allow_html=True)
+        except Exception as e:
+            st.error(f"❌ 预览错误：{str(e)}")
+
+
 # 标题
 st.title("🌊 冲刷深度计算器")
 st.markdown("---")
@@ -112,9 +266,15 @@ with st.sidebar:
     
     st.markdown("---")
     st.markdown(f"**当前时间：** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    cache_stats = get_shared_cache().stats()
+    st.caption(
+        f"缓存占用：本会话 {get_shared_cache().session_bytes(session_id()) / 2**20:.1f} MB，"
+        f"全服务 {cache_stats.bytes / 2**20:.1f} / {cache_stats.max_bytes / 2**20:.0f} MB，"
+        f"命中率 {cache_stats.hit_rate:.0%}"
+    )
 
 # 创建标签页
-tab1, tab2 = st.tabs(["📐 D.2.1 丁坝一般冲刷", "🏗️ D.2.2 护岸局部冲刷"])
+tab1, tab2, tab3 = st.tabs(["📐 D.2.1 丁坝一般冲刷", "🏗️ D.2.2 护岸局部冲刷", "📑 河段批量 D.2.1→D.2.2"])
 
 # ============== D.2.1 丁坝一般冲刷 ==============
 with tab1:
@@ -146,15 +306,15 @@ with tab1:
         m_d21 = st.number_input("m - 丁坝头坡率", min_value=0.1, value=2.0, 
                                 step=0.1, format="%.1f", key="m_d21")
         k1_type_d21 = st.selectbox("k1 类型", 
-                                    options=["弯曲河段凹岸单丁坝(k1=1.34)", "过渡段/顺直段单丁坝(k1=1.00)"],
+                                    options=list(K1Code), format_func=K1_LABELS.get,
                                     key="k1_type_d21")
         
         st.markdown("#### 起动流速 Uc")
         uc_method_d21 = st.selectbox("Uc 取值方法", 
-                                      options=["张瑞瑾公式(D.2.1-5)", "卵石起动流速(D.2.1-6)", "手动输入"],
+                                      options=list(UcCode), format_func=UC_LABELS.get,
                                       key="uc_method_d21")
         
-        if uc_method_d21 == "手动输入":
+        if uc_method_d21 == UcCode.MANUAL:
             uc_manual_d21 = st.number_input("Uc - 手动输入值 (m/s)", min_value=0.01, value=1.5, 
                                              step=0.1, format="%.2f", key="uc_manual_d21")
             gamma_s_d21, gamma_w_d21 = None, None
@@ -183,14 +343,19 @@ with tab1:
                     "uc_method": uc_method_d21,
                 }
                 
-                if uc_method_d21 == "手动输入":
+                if uc_method_d21 == UcCode.MANUAL:
                     inputs_d21["uc_manual"] = uc_manual_d21
                 else:
                     inputs_d21["gamma_s"] = gamma_s_d21
                     inputs_d21["gamma_w"] = gamma_w_d21
                 
-                # 执行计算
-                result_d21 = calc_d21(**inputs_d21)
+                # 执行计算（共享缓存命中直接复用；未命中则增量计算，只重算受修改参数影响的中间量）
+                if "d21_evaluator" not in st.session_state:
+                    st.session_state.d21_evaluator = D21Evaluator()
+                evaluator = st.session_state.d21_evaluator
+                result_d21 = get_shared_cache().get_or_compute(
+                    make_key("d21", inputs_d21), lambda: evaluator.evaluate(**inputs_d21), session=session_id()
+                )
                 
                 # 保存到session_state（不保存name_d21，因为它已经被widget管理）
                 st.session_state.result_d21 = result_d21
@@ -236,28 +401,17 @@ with tab1:
             
             # 导出Word
             st.markdown("#### 📄 导出计算书")
-            if st.button("📥 下载 Word 计算书", type="secondary", use_container_width=True, key="export_d21_btn"):
-                try:
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-                        export_path = export_d21_docx(
-                            path=tmp.name,
-                            name=st.session_state.get("project_name_d21", name_d21),
-                            inputs=st.session_state.inputs_d21,
-                            result=result
-                        )
-                        
-                        with open(export_path, "rb") as f:
-                            st.download_button(
-                                label="💾 点击下载",
-                                data=f.read(),
-                                file_name=f"冲刷计算书_D21_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx",
-                                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                                use_container_width=True
-                            )
-                        
-                        os.unlink(export_path)
-                except Exception as e:
-                    st.error(f"❌ 导出错误：{str(e)}")
+            render_report_preview(
+                "d21",
+                st.session_state.inputs_d21,
+                st.session_state.get("project_name_d21", name_d21),
+                result,
+            )
+            render_export_job(
+                "d21",
+                st.session_state.inputs_d21,
+                st.session_state.get("project_name_d21", name_d21),
+            )
 
 # ============== D.2.2 护岸局部冲刷 ==============
 with tab2:
@@ -308,8 +462,10 @@ with tab2:
                     "n": n_d22,
                 }
                 
-                # 执行计算
-                result_d22 = calc_d22(**inputs_d22)
+                # 执行计算（共享缓存命中直接复用）
+                result_d22 = get_shared_cache().get_or_compute(
+                    make_key("d22", inputs_d22), lambda: calc_d22(**inputs_d22), session=session_id()
+                )
                 
                 # 保存到session_state（不保存name_d22，因为它已经被widget管理）
                 st.session_state.result_d22 = result_d22
@@ -348,28 +504,89 @@ with tab2:
             
             # 导出Word
             st.markdown("#### 📄 导出计算书")
-            if st.button("📥 下载 Word 计算书", type="secondary", use_container_width=True, key="export_d22_btn"):
-                try:
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-                        export_path = export_d22_docx(
-                            path=tmp.name,
-                            name=st.session_state.get("project_name_d22", name_d22),
-                            inputs=st.session_state.inputs_d22,
-                            result=result
-                        )
-                        
-                        with open(export_path, "rb") as f:
-                            st.download_button(
-                                label="💾 点击下载",
-                                data=f.read(),
-                                file_name=f"冲刷计算书_D22_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx",
-                                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                                use_container_width=True
-                            )
-                        
-                        os.unlink(export_path)
-                except Exception as e:
-                    st.error(f"❌ 导出错误：{str(e)}")
+            render_report_preview(
+                "d22",
+                st.session_state.inputs_d22,
+                st.session_state.get("project_name_d22", name_d22),
+                result,
+            )
+            render_export_job(
+                "d22",
+                st.session_state.inputs_d22,
+                st.session_state.get("project_name_d22", name_d22),
+            )
+
+# ============== 河段批量 D.2.1 → D.2.2 ==============
+with tab3:
+    st.header("河段批量计算（D.2.1 → D.2.2 包络）")
+    st.markdown(
+        "上传断面表 CSV，逐断面计算丁坝一般冲刷，并将 H0、U 及算得的 Uc 带入护岸局部冲刷，"
+        "输出每个断面的冲刷深度包络。填写工程工作区后，断面与结果保存在工作区中，"
+        "再次导入时只重算输入有变化的断面。"
+    )
+    st.caption("表头：" + ", ".join(SECTION_COLUMNS))
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        sections_file = st.file_uploader("断面表 CSV", type=["csv"], key="sections_csv")
+    with col2:
+        st.markdown("#### 缺省参数（表中未填时使用）")
+        def_gamma_s = st.number_input("γs - 泥沙容重 (kN/m³)", min_value=1.0, value=26.0, step=0.1, format="%.2f", key="pipe_gamma_s")
+        def_gamma_w = st.number_input("γ - 水容重 (kN/m³)", min_value=1.0, value=9.81, step=0.01, format="%.2f", key="pipe_gamma_w")
+        def_n = st.number_input("n - 指数", min_value=0.01, value=0.25, step=0.01, format="%.2f", key="pipe_n")
+
+    ws_path = st.text_input(
+        "工程工作区（可选）",
+        placeholder="服务器上的 .sqlite 文件路径，不存在时新建；填写后断面与结果保存在工作区中",
+        key="pipe_ws_path",
+    ).strip()
+    defaults = {"gamma_s": def_gamma_s, "gamma_w": def_gamma_w, "n": def_n}
+
+    if ws_path:
+        render_workspace_panel(ws_path, sections_file, defaults)
+    elif sections_file is not None and st.button("🚀 批量计算", type="primary", use_container_width=True, key="calc_pipeline_btn"):
+        def _run_pipeline() -> tuple[str, int]:
+            # 包络逐块流式写入结果目录下的文件，内存中不保留整份 CSV
+            path = pipeline_result_path(key)
+            text = io.TextIOWrapper(io.BytesIO(sections_file.getvalue()), encoding="utf-8-sig", newline="")
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp, "w", encoding="utf-8-sig", newline="") as out:
+                n = write_envelope_csv(run_reach_pipeline(read_sections_csv(text), defaults=defaults), out)
+            os.replace(tmp, path)
+            return path, n
+
+        try:
+            # 共享缓存只存 (结果文件路径, 断面数)，同一断面表+缺省参数跨会话复用；session_state 仅保存路径
+            key = make_key("pipeline", sections_file.getvalue(), defaults)
+            path, n_sections = get_shared_cache().get_or_compute(key, _run_pipeline, session=session_id())
+            if not os.path.exists(path):        # 文件已按保留期清理，缓存条目仍在
+                get_shared_cache().discard(key)
+                path, n_sections = get_shared_cache().get_or_compute(key, _run_pipeline, session=session_id())
+            st.session_state.pipeline_result = (path, n_sections)
+            st.success(f"✅ 完成 {n_sections} 个断面")
+        except Exception as e:
+            st.error(f"❌ 计算错误：{str(e)}")
+
+    pipeline = None if ws_path else st.session_state.get("pipeline_result")
+    if pipeline is not None and not os.path.exists(pipeline[0]):
+        st.warning("批量结果文件已过保留期被清理，请重新计算。")
+        st.session_state.pop("pipeline_result", None)
+        pipeline = None
+    if pipeline is not None:
+        path, n_rows = pipeline
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = list(islice(read_sections_csv(f), PIPELINE_PREVIEW_ROWS))
+        st.dataframe(rows, use_container_width=True)
+        if n_rows > len(rows):
+            st.caption(f"仅显示前 {len(rows)} 个断面，共 {n_rows} 个，完整结果请下载。")
+        with open(path, "rb") as f:
+            st.download_button(
+                label="💾 下载包络 CSV",
+                data=f,
+                file_name=f"河段冲刷包络_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv",
+                use_container_width=True,
+            )
 
 # 页脚
 st.markdown("---")
@@ -0,0 +1,519 @@
+"""本机压测：按设定并发与请求配比驱动计算/导出流程，统计延迟分位数、吞吐与内存增长。
+
+两种压测对象：
+
+- `service`：`scour_service.py` 的 HTTP 接口（与页面共用结果缓存与计算书渲染），
+  `--launch` 时自动在本机空闲端口启动一个服务进程，压测结束后关闭；
+- `app`：Streamlit 页面 `app.py`，每个虚拟用户一个 `streamlit.testing` 的 AppTest 会话，
+  真实执行脚本重绘、填参数、点“开始计算”/“生成 Word 计算书”并轮询到可下载。
+  AppTest 在本进程内运行（不经浏览器 websocket），测的是服务端每次重绘的开销。
+
+    python scour_service.py --port 8600 &
+    python loadtest.py service --url http://127.0.0.1:8600 -c 16 -d 30 --mix calc_d21=6,calc_d22=3,report_d21=1
+    python loadtest.py service --launch -c 32 -n 5000 --distinct 20 --json 结果.json
+    python loadtest.py app -c 8 -d 60 --mix calc_d21=3,report_d21=1
+
+请求为闭环：每个虚拟用户发完一个请求、收到响应（再等 `--think-ms`）后才发下一个；
+`--distinct` 控制输入组合个数，越小缓存命中越多。内存按 /proc/<pid>/status 的 VmRSS 每 0.2 s
+采样一次（`service --launch` 采服务进程，`--url` 时读服务 /stats 的 rss_bytes，`app` 采本进程）。
+负载由线程产生，受 GIL 限制；客户端本身成为瓶颈时可同时开多个 loadtest 进程。
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from urllib.parse import urlsplit
+
+from scour_calc import K1Code, UcCode, calc_d21, calc_d22
+from scour_service import process_rss
+
+
+OPS = ("calc_d21", "calc_d22", "report_d21", "report_d22")
+DEFAULT_MIX = "calc_d21=6,calc_d22=3,report_d21=1"
+
+
+def _require_apptest():
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError as e:
+        raise ImportError("压测 Streamlit 页面需要 streamlit>=1.28：pip install streamlit") from e
+    return AppTest
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """"calc_d21=6,report_d21=1" -> {"calc_d21": 6.0, "report_d21": 1.0}"""
+    mix: dict[str, float] = {}
+    for item in text.split(","):
+        op, sep, w = item.partition("=")
+        op = op.strip()
+        if op not in OPS:
+            raise ValueError(f"未知操作：{op}（可选 {', '.join(OPS)}）")
+        weight = float(w) if sep else 1.0
+        if weight < 0:
+            raise ValueError(f"权重不能为负：{item}")
+        mix[op] = mix.get(op, 0.0) + weight
+    if not any(mix.values()):
+        raise ValueError("请求配比为空")
+    return mix
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """线性插值分位数（q 取 0~100），`sorted_values` 须已升序。"""
+    if not sorted_values:
+        return float("nan")
+    pos = (len(sorted_values) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+# ---------------- 输入 ----------------
+def make_inputs(distinct: int, *, seed: int = 0) -> dict[str, list[dict]]:
+    """生成 `distinct` 组有效的 D.2.1/D.2.2 输入（数值按页面输入框精度取整）。"""
+    if distinct <= 0:
+        raise ValueError("distinct 必须为正")
+    rng = random.Random(seed)
+    d21: list[dict] = []
+    while len(d21) < distinct:
+        inputs = {
+            "H0": round(rng.uniform(1.0, 10.0), 2),
+            "d50": round(rng.uniform(0.001, 0.05), 4),
+            "U": round(rng.uniform(1.0, 4.0), 2),
+            "L0": round(rng.uniform(5.0, 80.0), 1),
+            "B": round(rng.uniform(80.0, 400.0), 1),
+            "theta_deg": round(rng.uniform(15.0, 90.0), 1),
+            "m": round(rng.uniform(0.5, 3.0), 1),
+            "k1_type": rng.randrange(2),
+            "uc_method": rng.choice((int(UcCode.ZHANG), int(UcCode.RUBBLE))),
+            "gamma_s": 26.0,
+            "gamma_w": 9.81,
+        }
+        try:
+            calc_d21(**inputs)
+        except ValueError:
+            continue        # Um≤Uc 等无冲刷组合不作为压测输入
+        d21.append(inputs)
+    d22 = [
+        {
+            "H0": round(rng.uniform(1.0, 10.0), 2),
+            "U": round(rng.uniform(1.0, 4.0), 2),
+            "Uc": round(rng.uniform(0.3, 1.0), 2),
+            "alpha_deg": round(rng.uniform(0.0, 90.0), 1),
+            "n": round(rng.uniform(1.5, 2.5), 1),
+        }
+        for _ in range(distinct)
+    ]
+    for inputs in d22:
+        calc_d22(**inputs)
+    return {"d21": d21, "d22": d22}
+
+
+# ---------------- 客户端 ----------------
+class ServiceClient:
+    """一个虚拟用户：一条保持的 HTTP 连接。"""
+
+    def __init__(self, url: str, *, session: str, timeout: float) -> None:
+        u = urlsplit(url)
+        self._conn = http.client.HTTPConnection(u.hostname, u.port or 80, timeout=timeout)
+        self._headers = {"Content-Type": "application/json", "X-Session-Id": session}
+
+    def request(self, op: str, inputs: dict, *, name: str) -> int:
+        """执行一次操作，返回响应字节数；失败抛异常。"""
+        action, kind = op.split("_")
+        body = json.dumps({"inputs": inputs, "name": name}).encode("utf-8")
+        try:
+            self._conn.request("POST", f"/{action}/{kind}", body=body, headers=self._headers)
+            resp = self._conn.getresponse()
+            data = resp.read()
+        except (OSError, http.client.HTTPException):
+            self._conn.close()      # 下次请求自动重连
+            raise
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}: {data[:200].decode('utf-8', 'replace')}")
+        return len(data)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class AppClient:
+    """一个虚拟用户：一个独立 session_state 的 Streamlit AppTest 会话。"""
+
+    _D21_KEYS = {"H0": "H0_d21", "d50": "d50_d21", "U": "U_d21", "L0": "L0_d21", "B": "B_d21",
+                 "theta_deg": "theta_d21", "m": "m_d21", "gamma_s": "gamma_s_d21", "gamma_w": "gamma_w_d21"}
+    _D22_KEYS = {"H0": "H0_d22", "U": "U_d22", "Uc": "Uc_d22", "alpha_deg": "alpha_d22", "n": "n_d22"}
+
+    def __init__(self, script: str, *, timeout: float, poll_s: float = 0.1) -> None:
+        AppTest = _require_apptest()
+        self._at = AppTest.from_file(script, default_timeout=timeout)
+        self._timeout = timeout
+        self._poll_s = poll_s
+        self._run()
+
+    def _run(self) -> None:
+        self._at.run()
+        if self._at.exception:
+            raise RuntimeError(self._at.exception[0].value)
+        if self._at.error:
+            raise RuntimeError(self._at.error[0].value)
+
+    def _click(self, key: str) -> None:
+        self._at.button(key=key).click()
+        self._run()
+
+    def _fill(self, kind: str, inputs: dict, name: str) -> None:
+        at = self._at
+        at.text_input(key=f"name_{kind}").set_value(name)
+        if kind == "d21":
+            at.selectbox(key="k1_type_d21").set_value(K1Code(inputs["k1_type"]))
+            at.selectbox(key="uc_method_d21").set_value(UcCode(inputs["uc_method"]))
+            self._run()     # Uc 方法决定 γs/γ 输入框是否出现
+            keys = self._D21_KEYS
+        else:
+            keys = self._D22_KEYS
+        for k, widget in keys.items():
+            if k in inputs:
+                at.number_input(key=widget).set_value(inputs[k])
+
+    def request(self, op: str, inputs: dict, *, name: str) -> int:
+        action, kind = op.split("_")
+        self._fill(kind, inputs, name)
+        self._click(f"calc_{kind}_btn")
+        if action == "calc":
+            return 0
+        self._click(f"export_{kind}_btn")
+        deadline = time.monotonic() + self._timeout
+        while not self._at.get("download_button"):
+            if time.monotonic() > deadline:
+                raise TimeoutError("计算书导出超时")
+            time.sleep(self._poll_s)
+            self._click(f"refresh_{kind}_btn")
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+# ---------------- 统计 ----------------
+@dataclass
+class OpStats:
+    count: int = 0
+    errors: int = 0
+    bytes: int = 0
+    p50_ms: float = float("nan")
+    p95_ms: float = float("nan")
+    p99_ms: float = float("nan")
+    max_ms: float = float("nan")
+    mean_ms: float = float("nan")
+
+
+@dataclass
+class LoadReport:
+    target: str
+    concurrency: int
+    elapsed_s: float
+    requests: int
+    errors: int
+    throughput_rps: float
+    ops: dict[str, OpStats]
+    rss_start: int | None = None
+    rss_peak: int | None = None
+    rss_end: int | None = None
+    error_samples: list[str] = field(default_factory=list)
+
+    @property
+    def rss_growth(self) -> int | None:
+        if self.rss_start is None or self.rss_end is None:
+            return None
+        return self.rss_end - self.rss_start
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["rss_growth"] = self.rss_growth
+        return d
+
+
+def _op_stats(latencies: list[float], errors: int, nbytes: int) -> OpStats:
+    lat = sorted(x * 1000.0 for x in latencies)
+    s = OpStats(count=len(lat) + errors, errors=errors, bytes=nbytes)
+    if lat:
+        s.p50_ms, s.p95_ms, s.p99_ms = (percentile(lat, q) for q in (50, 95, 99))
+        s.max_ms = lat[-1]
+        s.mean_ms = sum(lat) / len(lat)
+    return s
+
+
+class RssSampler(threading.Thread):
+    """后台周期采样内存，记录起始/峰值/结束。`read()` 返回字节数或 None。"""
+
+    def __init__(self, read, *, interval_s: float = 0.2) -> None:
+        super().__init__(daemon=True)
+        self._read = read
+        self._interval_s = interval_s
+        self._stop_event = threading.Event()
+        self.start_rss = self.peak_rss = self.end_rss = read()
+
+    def _sample(self) -> None:
+        rss = self._read()
+        if rss is not None:
+            self.end_rss = rss
+            self.peak_rss = rss if self.peak_rss is None else max(self.peak_rss, rss)
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self._interval_s):
+            self._sample()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+        self._sample()
+
+
+def run_load(
+    make_client,
+    *,
+    target: str,
+    mix: dict[str, float],
+    inputs: dict[str, list[dict]],
+    concurrency: int,
+    requests: int | None = None,
+    duration_s: float | None = None,
+    warmup: int = 0,
+    think_ms: float = 0.0,
+    read_rss=None,
+    seed: int = 0,
+) -> LoadReport:
+    """闭环压测：`concurrency` 个虚拟用户，共发 `requests` 个请求或持续 `duration_s` 秒。
+
+    `make_client(i)` 返回第 i 个虚拟用户的客户端（有 `request(op, inputs, name=)` 与 `close()`）；
+    每个用户先发 `warmup` 个不计入统计的请求。
+    """
+    if concurrency <= 0:
+        raise ValueError("并发数必须为正")
+    if (requests is None) == (duration_s is None):
+        raise ValueError("requests 与 duration_s 须且只能给一个")
+    ops = [op for op, w in mix.items() if w > 0]
+    weights = [mix[op] for op in ops]
+
+    lock = threading.Lock()
+    latencies: dict[str, list[float]] = {op: [] for op in ops}
+    errors = dict.fromkeys(ops, 0)
+    nbytes = dict.fromkeys(ops, 0)
+    samples: list[str] = []
+    remaining = [requests or 0]
+    clock: list[float] = [0.0]
+    # 全部用户建好会话、预热完后同时开始计时
+    ready = threading.Barrier(concurrency + 1, action=lambda: clock.__setitem__(0, time.perf_counter()))
+
+    def take() -> bool:
+        if requests is None:
+            return time.perf_counter() - clock[0] < duration_s
+        with lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def worker(i: int) -> None:
+        rng = random.Random(seed * 1000 + i)
+        client = None
+        try:
+            client = make_client(i)
+            for _ in range(warmup):
+                op = rng.choices(ops, weights)[0]
+                client.request(op, rng.choice(inputs[op[-3:]]), name=f"压测{i}")
+        except Exception as e:
+            with lock:
+                samples.append(f"初始化：{e}")
+        finally:
+            ready.wait()
+        if client is None:
+            return
+        try:
+            while take():
+                op = rng.choices(ops, weights)[0]
+                t0 = time.perf_counter()
+                try:
+                    n = client.request(op, rng.choice(inputs[op[-3:]]), name=f"压测{i}")
+                except Exception as e:
+                    with lock:
+                        errors[op] += 1
+                        if len(samples) < 10:
+                            samples.append(f"{op}：{e}")
+                else:
+                    dt = time.perf_counter() - t0
+                    with lock:
+                        latencies[op].append(dt)
+                        nbytes[op] += n
+                if think_ms:
+                    time.sleep(think_ms / 1000.0)
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    ready.wait()
+    sampler = RssSampler(read_rss or (lambda: None))
+    sampler.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - clock[0]
+    sampler.stop()
+
+    stats = {op: _op_stats(latencies[op], errors[op], nbytes[op]) for op in ops}
+    n_ok = sum(len(v) for v in latencies.values())
+    n_err = sum(errors.values())
+    return LoadReport(
+        target=target,
+        concurrency=concurrency,
+        elapsed_s=elapsed,
+        requests=n_ok + n_err,
+        errors=n_err,
+        throughput_rps=n_ok / elapsed if elapsed > 0 else 0.0,
+        ops=stats,
+        rss_start=sampler.start_rss,
+        rss_peak=sampler.peak_rss,
+        rss_end=sampler.end_rss,
+        error_samples=samples,
+    )
+
+
+def format_report(r: LoadReport) -> str:
+    def mb(v: int | None) -> str:
+        return "-" if v is None else f"{v / 2**20:.1f} MB"
+
+    lines = [
+        f"目标：{r.target}  并发 {r.concurrency}  用时 {r.elapsed_s:.2f} s",
+        f"{'操作':<12}{'次数':>8}{'失败':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'最大(ms)':>10}",
+    ]
+    for op, s in r.ops.items():
+        lines.append(
+            f"{op:<12}{s.count:>8}{s.errors:>6}{s.p50_ms:>10.2f}{s.p95_ms:>10.2f}{s.p99_ms:>10.2f}{s.max_ms:>10.2f}"
+        )
+    lines.append(f"合计 {r.requests} 次，失败 {r.errors} 次，吞吐 {r.throughput_rps:.1f} 次/s")
+    growth = r.rss_growth
+    lines.append(
+        f"内存（RSS）：起始 {mb(r.rss_start)}，峰值 {mb(r.rss_peak)}，结束 {mb(r.rss_end)}，"
+        f"增长 {'-' if growth is None else f'{growth / 2**20:+.1f} MB'}"
+    )
+    lines.extend(f"  错误示例：{s}" for s in r.error_samples)
+    return "\n".join(lines)
+
+
+# ---------------- 命令行 ----------------
+def _launch_service(cache_mb: int) -> tuple[subprocess.Popen, str]:
+    proc = subprocess.Popen(
+        [sys.executable, "scour_service.py", "--port", "0", "--cache-mb", str(cache_mb)],
+        stdout=subprocess.PIPE, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    line = proc.stdout.readline().strip()
+    if "http://" not in line:
+        proc.kill()
+        raise OSError(f"计算服务启动失败：{line or proc.wait()}")
+    return proc, line[line.index("http://"):]
+
+
+def _remote_rss(url: str):
+    u = urlsplit(url)
+
+    def read() -> int | None:
+        conn = http.client.HTTPConnection(u.hostname, u.port or 80, timeout=5)
+        try:
+            conn.request("GET", "/stats")
+            return json.loads(conn.getresponse().read()).get("rss_bytes")
+        except (OSError, ValueError, http.client.HTTPException):
+            return None
+        finally:
+            conn.close()
+
+    return read
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="冲刷计算本机压测")
+    p.add_argument("target", choices=("service", "app"), help="压测对象：HTTP 计算服务或 Streamlit 页面")
+    p.add_argument("--url", help="service：已启动服务的地址，如 http://127.0.0.1:8600")
+    p.add_argument("--launch", action="store_true", help="service：自动在本机启动服务进程")
+    p.add_argument("--cache-mb", type=int, default=256, help="--launch 时服务的缓存上限（MB）")
+    p.add_argument("--script", default="app.py", help="app：Streamlit 脚本路径")
+    p.add_argument("-c", "--concurrency", type=int, default=8, help="并发虚拟用户数")
+    g = p.add_mutually_exclusive_group()
+    g.add_argument("-n", "--requests", type=int, help="总请求数")
+    g.add_argument("-d", "--duration", type=float, help="持续时间（秒）")
+    p.add_argument("--mix", default=DEFAULT_MIX, help=f"请求配比，默认 {DEFAULT_MIX}")
+    p.add_argument("--distinct", type=int, default=50, help="不同输入组合个数（控制缓存命中率）")
+    p.add_argument("--warmup", type=int, default=1, help="每个用户预热请求数（不计入统计）")
+    p.add_argument("--think-ms", type=float, default=0.0, help="每个用户两次请求间的停顿（毫秒）")
+    p.add_argument("--timeout", type=float, default=60.0, help="单次请求超时（秒）")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", help="另存 JSON 报告")
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+        inputs = make_inputs(args.distinct, seed=args.seed)
+        if args.requests is None and args.duration is None:
+            args.duration = 10.0
+
+        proc = None
+        if args.target == "service":
+            if args.launch == bool(args.url):
+                raise ValueError("service 须给出 --url 或 --launch 之一")
+            if args.launch:
+                proc, url = _launch_service(args.cache_mb)
+                read_rss = lambda: process_rss(proc.pid)
+            else:
+                url = args.url
+                read_rss = _remote_rss(url)
+            target = f"service {url}"
+            make_client = lambda i: ServiceClient(url, session=f"loadtest-{i}", timeout=args.timeout)
+        else:
+            _require_apptest()
+            target = f"app {args.script}"
+            read_rss = process_rss
+            make_client = lambda i: AppClient(args.script, timeout=args.timeout)
+
+        try:
+            report = run_load(
+                make_client,
+                target=target,
+                mix=mix,
+                inputs=inputs,
+                concurrency=args.concurrency,
+                requests=args.requests,
+                duration_s=args.duration if args.requests is None else None,
+                warmup=args.warmup,
+                think_ms=args.think_ms,
+                read_rss=read_rss,
+                seed=args.seed,
+            )
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+    except (ValueError, ImportError, OSError) as e:
+        print(f"错误：{e}", file=sys.stderr)
+        return 1
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+    return 0 if report.errors == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""计算书的直接 OOXML 写出（高吞吐后端）。
+
+`word_export` 经 python-docx 逐段逐 run 构建 lxml 元素树再序列化，批量导出成千上万份
+计算书时 CPU 成为瓶颈。本模块在进程内只用 python-docx 生成一次“参考文档”，从中截取
+预编译的 XML 片段（文档头、标题/小标题/正文各级段落、上下标 run、附图与页面设置尾部），
+其余部件（样式、主题、附图等，约占 1 MB）预先压缩好；之后每份计算书只需拼接正文段落、
+压缩 document.xml（约 8 KB），连同预压缩部件顺序写入 zip：
+
+    from ooxml_export import export_d21_docx   # 与 word_export 同名同参数，可直接替换
+    export_d21_docx(path="out.docx", name="XX丁坝", inputs=inputs, result=calc_d21(**inputs))
+
+正文内容与 `word_export` 共用 `report_model` 的内容模型，生成的各部件（含 document.xml）与
+`word_export` 的输出逐字节相同（“生成时间”除外），样式完全一致。
+仍需安装 python-docx（仅用于首次编译片段）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from report_model import Block, Report, _format_runs, build_d21_report, build_d22_report, figure_blocks
+from scour_calc import D21Result, D22Result
+from word_export import _build_doc_base, _ensure_docx_suffix
+
+
+DOCUMENT_PART = "word/document.xml"
+
+# 参考文档中的占位文本（不含需转义的字符）
+_MARK_TITLE = "@@TITLE@@"
+_MARK_H = "@@H@@"
+_MARK_LINE = "@@LINE{level}@@"
+_MARK_RUN = "@@RUN{vert}@@"
+_MARK_END = "@@END@@"
+
+_LEVELS = (0, 1)
+_VERTS = (None, "subscript", "superscript")
+
+
+@dataclass(frozen=True)
+class _Part:
+    name: bytes
+    crc: int
+    size: int
+    data: bytes | None     # 已压缩（raw deflate）的字节；document.xml 为 None
+
+
+@dataclass(frozen=True)
+class _Fragments:
+    parts: tuple[_Part, ...]                    # 按参考文档中的顺序
+    head: str                                   # 至 <w:body>
+    title: tuple[str, str]                      # (段落+run 开头, run+段落结尾)
+    h: tuple[str, str]
+    line: dict                                  # level -> 段落开头（含 pPr）
+    run: dict                                   # vert -> run 开头（含 rPr）
+    tail: str                                   # 附图段落 + sectPr + 结尾
+    figures: tuple[Block, ...]                  # tail 中已包含的附图
+    template_id: str
+
+    @property
+    def head_bytes(self) -> bytes:
+        return self.head.encode("utf-8")
+
+    @property
+    def tail_bytes(self) -> bytes:
+        return self.tail.encode("utf-8")
+
+
+_fragments: _Fragments | None = None
+_fragments_lock = threading.Lock()
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _t(text: str) -> str:
+    """run 的文字内容，规则同 python-docx：\\t → <w:tab/>，\\n/\\r → <w:br/>，首尾空白加 xml:space。"""
+    out = []
+    buf = []
+
+    def flush():
+        if buf:
+            s = "".join(buf)
+            buf.clear()
+            if len(s.strip()) < len(s):
+                out.append(f'<w:t xml:space="preserve">{_escape(s)}</w:t>')
+            else:
+                out.append(f"<w:t>{_escape(s)}</w:t>")
+
+    for ch in text:
+        if ch == "\t":
+            flush()
+            out.append("<w:tab/>")
+        elif ch in "\r\n":
+            flush()
+            out.append("<w:br/>")
+        else:
+            buf.append(ch)
+    flush()
+    return "".join(out)
+
+
+def _paragraph_of(xml: str, marker: str) -> tuple[int, int]:
+    i = xml.index(f"<w:t>{marker}</w:t>")
+    return xml.rindex("<w:p>", 0, i), xml.index("</w:p>", i) + len("</w:p>")
+
+
+def _split_single_run(xml: str, marker: str) -> tuple[str, str]:
+    """单 run 段落 → (段落开头…run 开头, run 结尾…段落结尾)。"""
+    start, end = _paragraph_of(xml, marker)
+    para = xml[start:end]
+    text = f"<w:t>{marker}</w:t>"
+    i = para.index(text)
+    return para[:i], para[i + len(text):]
+
+
+def _compile() -> _Fragments:
+    doc, add_title, add_h, add_line, Cm = _build_doc_base()
+    add_title(_MARK_TITLE)
+    add_h(_MARK_H)
+    for level in _LEVELS:
+        add_line(_MARK_LINE.format(level=level), level=level, use_format=False)
+    p = doc.add_paragraph()
+    for vert in _VERTS:
+        r = p.add_run(_MARK_RUN.format(vert=vert))
+        if vert == "subscript":
+            r.font.subscript = True
+        elif vert == "superscript":
+            r.font.superscript = True
+    add_line(_MARK_END, use_format=False)
+    figures = tuple(figure_blocks())
+    for b in figures:
+        add_h(b.text)
+        doc.add_picture(b.image, width=Cm(14))
+
+    buf = io.BytesIO()
+    doc.save(buf)
+    with zipfile.ZipFile(buf) as zf:
+        parts = tuple(
+            _Part(info.filename.encode("ascii"), 0, 0, None)
+            if info.filename == DOCUMENT_PART
+            else _precompress(info.filename, zf.read(info.filename))
+            for info in zf.infolist()
+        )
+        xml = zf.read(DOCUMENT_PART).decode("utf-8")
+
+    body = xml.index("<w:body>") + len("<w:body>")
+    line = {}
+    for level in _LEVELS:
+        pre, post = _split_single_run(xml, _MARK_LINE.format(level=level))
+        line[level] = pre[: pre.rindex("<w:r>")]
+    run = {}
+    for vert in _VERTS:
+        pre, _ = _split_single_run(xml, _MARK_RUN.format(vert=vert))
+        run[vert] = pre[pre.rindex("<w:r>"):]
+    _, end = _paragraph_of(xml, _MARK_END)
+    h = hashlib.sha256(xml.encode("utf-8"))
+    for p in parts:
+        h.update(p.name + p.crc.to_bytes(4, "little"))
+    return _Fragments(
+        parts=parts,
+        head=xml[:body],
+        title=_split_single_run(xml, _MARK_TITLE),
+        h=_split_single_run(xml, _MARK_H),
+        line=line,
+        run=run,
+        tail=xml[end:],
+        figures=figures,
+        template_id=h.hexdigest()[:16],
+    )
+
+
+def _get_fragments() -> _Fragments:
+    global _fragments
+    if _fragments is None:
+        with _fragments_lock:
+            if _fragments is None:
+                _fragments = _compile()
+    return _fragments
+
+
+def _paragraph(frags: _Fragments, b: Block) -> str:
+    """标题/小标题/正文段落的 XML（排版同 `_build_doc_base` 的 add_title/add_h/add_line）。"""
+    if b.kind == "title":
+        pre, post = frags.title
+        return pre + _t(b.text) + post
+    if b.kind == "heading":
+        pre, post = frags.h
+        return pre + _t(b.text) + post
+    try:
+        out = [frags.line[b.level]]
+    except KeyError:
+        raise ValueError(f"不支持的缩进层级：{b.level}") from None
+    run = frags.run
+    if b.use_format:
+        out.extend(run[vert] + _t(t) + "</w:r>" for t, vert in _format_runs(b.text))
+    else:
+        out.append(run[None] + _t(b.text) + "</w:r>")
+    out.append("</w:p>")
+    return "".join(out)
+
+
+def _deflate(chunks) -> tuple[bytes, int, int]:
+    """raw deflate（zipfile 的 ZIP_DEFLATED 默认参数），返回 (压缩字节, crc32, 原长度)。"""
+    comp = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    out = []
+    crc = size = 0
+    for chunk in chunks:
+        crc = zlib.crc32(chunk, crc)
+        size += len(chunk)
+        out.append(comp.compress(chunk))
+    out.append(comp.flush())
+    return b"".join(out), crc, size
+
+
+def _precompress(name: str, blob: bytes) -> _Part:
+    data, crc, size = _deflate([blob])
+    return _Part(name.encode("ascii"), crc, size, data)
+
+
+def _dos_time(t: float) -> tuple[int, int]:
+    lt = time.localtime(t)
+    return (
+        (lt.tm_hour << 11) | (lt.tm_min << 5) | (lt.tm_sec // 2),
+        ((lt.tm_year - 1980) << 9) | (lt.tm_mon << 4) | lt.tm_mday,
+    )
+
+
+def _write_zip(out: BinaryIO, parts) -> None:
+    """按顺序写出 [(_Part, 压缩字节)] 的 zip 容器（deflate，无 zip64，逐部件顺序写入）。"""
+    dtime, ddate = _dos_time(time.time())
+    offset = 0
+    central = []
+    for p, data in parts:
+        common = struct.pack("<HHHHHIII", 20, 0, zipfile.ZIP_DEFLATED, dtime, ddate, p.crc, len(data), p.size)
+        local = b"PK\x03\x04" + common + struct.pack("<HH", len(p.name), 0) + p.name
+        out.write(local)
+        out.write(data)
+        central.append(
+            b"PK\x01\x02"
+            + struct.pack("<H", (3 << 8) | 20)
+            + common
+            + struct.pack("<HHHHHII", len(p.name), 0, 0, 0, 0, 0o600 << 16, offset)
+            + p.name
+        )
+        offset += len(local) + len(data)
+    cd = b"".join(central)
+    out.write(cd)
+    out.write(b"PK\x05\x06" + struct.pack("<HHHHIIH", 0, 0, len(central), len(central), len(cd), offset, 0))
+
+
+def render_blocks(blocks, *, figures: bool = True) -> bytes:
+    """段落的 document.xml 片段。
+
+    附图已在预编译尾部中：`figures=True` 时这些段落位于文末，所带附图须与模板一致；
+    `figures=False` 用于文中片段（如标题），不得含附图。
+    """
+    frags = _get_fragments()
+    if tuple(b for b in blocks if b.kind == "figure") != (frags.figures if figures else ()):
+        raise ValueError("计算书附图与预编译片段不一致")
+    return "".join(_paragraph(frags, b) for b in blocks if b.kind != "figure").encode("utf-8")
+
+
+def template_id() -> str:
+    """预编译模板（样式、附图、全部部件）的内容哈希；模板变化时随之变化。"""
+    return _get_fragments().template_id
+
+
+def write_body_docx(f: str | BinaryIO, body: list[bytes]) -> None:
+    """把已渲染好的正文片段（`render_blocks` 的输出，按顺序）包装成 docx 写出。"""
+    frags = _get_fragments()
+    doc_data, doc_crc, doc_size = _deflate([frags.head_bytes, *body, frags.tail_bytes])
+    parts = [
+        (p, p.data) if p.data is not None else (_Part(p.name, doc_crc, doc_size, None), doc_data)
+        for p in frags.parts
+    ]
+    if isinstance(f, str):
+        with open(f, "wb") as out:
+            _write_zip(out, parts)
+    else:
+        _write_zip(f, parts)
+
+
+def write_report_docx(f: str | BinaryIO, report: Report) -> None:
+    """把计算书写入路径或可写二进制文件对象（如批量打包时的 zip 成员）。"""
+    write_body_docx(f, [render_blocks(report.blocks)])
+
+
+def write_d21_docx(f: str | BinaryIO, *, name: str | None, inputs: dict, result: D21Result) -> None:
+    write_report_docx(f, build_d21_report(name=name, inputs=inputs, result=result))
+
+
+def write_d22_docx(f: str | BinaryIO, *, name: str | None, inputs: dict, result: D22Result) -> None:
+    write_report_docx(f, build_d22_report(name=name, inputs=inputs, result=result))
+
+
+def export_d21_docx(
+    *,
+    path: str,
+    name: str | None,
+    inputs: dict,
+    result: D21Result,
+) -> str:
+    path = _ensure_docx_suffix(path)
+    write_d21_docx(path, name=name, inputs=inputs, result=result)
+    return path
+
+
+def export_d22_docx(
+    *,
+    path: str,
+    name: str | None,
+    inputs: dict,
+    result: D22Result,
+) -> str:
+    path = _ensure_docx_suffix(path)
+    write_d22_docx(path, name=name, inputs=inputs, result=result)
+    return path
@@ -0,0 +1,158 @@
+"""按内容哈希去重的计算书缓存。
+
+同一工况（输入、结果、模板都相同）的计算书除标题中的工程名称与“生成时间”外完全一样。
+本模块把计算书拆成两部分：
+
+- 正文（计算依据至附图）：按 (类型, 输入, 结果, 模板) 的内容哈希缓存已渲染的 XML 片段；
+- 开头（标题、生成时间）：每次导出时现生成，拼在缓存的正文前。
+
+    cache = ReportCache(max_bytes=64 << 20)
+    cache.export(path="a.docx", kind="d21", name="1#丁坝", inputs=inputs, result=res)
+    data = cache.render("d21", name="2#丁坝", inputs=inputs, result=res)   # 命中，只补标题和时间
+
+缓存按占用字节数做 LRU 淘汰；线程安全。输出与 `ooxml_export`（亦即 `word_export`）逐字节相同。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from datetime import datetime
+from enum import Enum
+from numbers import Real
+
+from ooxml_export import render_blocks, template_id, write_body_docx
+from report_model import report_body, report_header
+from scour_calc import k1_code, uc_code
+from word_export import _ensure_docx_suffix
+
+
+DEFAULT_MAX_BYTES = 64 << 20
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        n = self.hits + self.misses
+        return self.hits / n if n else 0.0
+
+
+def _jsonable(v):
+    if isinstance(v, Enum):
+        return v.value
+    if isinstance(v, Real) and not isinstance(v, bool):
+        return repr(float(v))   # 4 与 4.0、NumPy 标量取同一写法；区分 0.1 与 0.1000000001，nan/inf 也能序列化
+    return v
+
+
+_CATEGORY_CODES = {"k1_type": k1_code, "uc_method": uc_code}
+
+
+def _input_value(k: str, v):
+    """输入值规范化：类别列的显示文字与整数编码取同一编码（计算书按编码渲染，二者内容相同）。"""
+    to_code = _CATEGORY_CODES.get(k)
+    if to_code is not None:
+        try:
+            return int(to_code(v))
+        except ValueError:
+            return v
+    return _jsonable(v)
+
+
+def content_key(kind: str, inputs: dict, result) -> str:
+    """(类型, 输入, 结果, 模板) 的内容哈希；数值与类别输入先规范化，等价写法得到同一键。"""
+    doc = {
+        "kind": kind,
+        "inputs": {str(k): _input_value(str(k), v) for k, v in inputs.items()},
+        "result": [(f.name, _jsonable(getattr(result, f.name))) for f in fields(result)],
+        "template": template_id(),
+    }
+    raw = json.dumps(doc, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """计算书正文的内容寻址缓存（LRU，按字节数限容）。"""
+
+    def __init__(self, *, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes 必须为正")
+        self.max_bytes = int(max_bytes)
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def _body(self, kind: str, inputs: dict, result) -> bytes:
+        key = content_key(kind, inputs, result)
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return body
+            self._stats.misses += 1
+
+        body = render_blocks(report_body(kind, inputs=inputs, result=result))
+        if len(body) > self.max_bytes:
+            return body
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = body
+                self._stats.bytes += len(body)
+                while self._stats.bytes > self.max_bytes:
+                    _, old = self._entries.popitem(last=False)
+                    self._stats.bytes -= len(old)
+                    self._stats.evictions += 1
+        return body
+
+    def write(self, f, kind: str, *, name: str | None, inputs: dict, result, now: datetime | None = None) -> None:
+        """把计算书写入路径或可写二进制文件对象。"""
+        body = self._body(kind, inputs, result)
+        head = render_blocks(report_header(kind, name=name, now=now), figures=False)
+        write_body_docx(f, [head, body])
+
+    def render(self, kind: str, *, name: str | None, inputs: dict, result, now: datetime | None = None) -> bytes:
+        buf = io.BytesIO()
+        self.write(buf, kind, name=name, inputs=inputs, result=result, now=now)
+        return buf.getvalue()
+
+    def export(self, *, path: str, kind: str, name: str | None, inputs: dict, result) -> str:
+        """同 `export_d21_docx`/`export_d22_docx`，`kind` 为 "d21"/"d22"。"""
+        path = _ensure_docx_suffix(path)
+        self.write(path, kind, name=name, inputs=inputs, result=result)
+        return path
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            s = self._stats
+            return CacheStats(s.hits, s.misses, s.evictions, len(self._entries), s.bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.bytes = 0
+
+
+_default: ReportCache | None = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> ReportCache:
+    """进程内共享的缓存（后台导出任务使用）。"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = ReportCache()
+    return _default
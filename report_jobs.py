@@ -0,0 +1,364 @@
+"""计算书导出后台任务队列。
+
+Word 计算书生成较慢，放在 Streamlit 请求里会阻塞当前会话并占用服务线程。
+本模块提供本地任务队列：
+- 有界工作线程池（`max_workers`）执行单份及批量导出（经 `report_cache` 去重、`ooxml_export` 直接写出 docx）；
+- 任务状态/进度可轮询；
+- 任务记录与产物落盘（每个任务一个 JSON 文件），进程重启后未完成的任务会重新排队；
+- 已完成任务按 `retention_s` 保留，过期后清理文件。
+
+Web 端与命令行（`scour_cli.py jobs ...`）共用同一存储目录即可互相提交/领取任务。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Literal
+
+
+JobKind = Literal["d21", "d22", "batch"]
+JobStatus = Literal["queued", "running", "done", "failed"]
+
+DEFAULT_JOB_ROOT = os.path.join(tempfile.gettempdir(), "scour_report_jobs")
+
+# 已完成任务的默认保留时长（秒）
+DEFAULT_RETENTION_S = 24 * 3600.0
+
+# 读不出进程号的锁文件在此时长内仍视为有效（秒）
+CLAIM_GRACE_S = 60.0
+
+
+@dataclass
+class ReportJob:
+    job_id: str
+    kind: JobKind
+    payload: dict
+    status: JobStatus = "queued"
+    progress: float = 0.0
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    output: str | None = None
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class ReportJobStore:
+    """任务记录的文件存储：`<root>/jobs/<id>.json` + `<root>/files/<id>/` 产物目录。
+
+    写入采用“临时文件 + os.replace”保证原子性；运行中的任务持有 `<id>.lock`
+    （内容为进程号），供多个进程共用同一目录时避免重复执行。
+    """
+
+    def __init__(self, root: str = DEFAULT_JOB_ROOT) -> None:
+        self.root = str(root)
+        self.jobs_dir = os.path.join(self.root, "jobs")
+        self.files_dir = os.path.join(self.root, "files")
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        os.makedirs(self.files_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _record_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _claim_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.lock")
+
+    def output_dir(self, job_id: str) -> str:
+        d = os.path.join(self.files_dir, job_id)
+        os.makedirs(d, exist_ok=True)
+        return d
+
+    def save(self, job: ReportJob) -> None:
+        path = self._record_path(job.job_id)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(asdict(job), f, ensure_ascii=False)
+            os.replace(tmp, path)
+
+    def load(self, job_id: str) -> ReportJob | None:
+        try:
+            with open(self._record_path(job_id), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return ReportJob(**data)
+
+    def all(self) -> list[ReportJob]:
+        jobs = []
+        for fn in os.listdir(self.jobs_dir):
+            if fn.endswith(".json"):
+                job = self.load(fn[: -len(".json")])
+                if job is not None:
+                    jobs.append(job)
+        jobs.sort(key=lambda j: j.created_at)
+        return jobs
+
+    def claim(self, job_id: str) -> bool:
+        """尝试独占任务；锁文件属于已退出的进程时视为失效并接管。
+
+        锁文件先写好进程号再以硬链接放到位，出现时即带内容；读不出进程号的锁
+        （其他写法留下的或已损坏）在 `CLAIM_GRACE_S` 内仍视为有效。
+        """
+        path = self._claim_path(job_id)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(os.getpid()))
+        try:
+            for _ in range(2):
+                try:
+                    os.link(tmp, path)
+                    return True
+                except FileExistsError:
+                    pass
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        text = f.read().strip()
+                    age = time.time() - os.path.getmtime(path)
+                except FileNotFoundError:
+                    continue
+                except OSError:
+                    return False
+                try:
+                    owner = int(text)
+                except ValueError:
+                    owner = None
+                if owner is None and age < CLAIM_GRACE_S:
+                    return False
+                if owner is not None and _pid_alive(owner):
+                    return False
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            return False
+        finally:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+
+    def release(self, job_id: str) -> None:
+        try:
+            os.unlink(self._claim_path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, job_id: str) -> None:
+        for p in (self._record_path(job_id), self._claim_path(job_id)):
+            try:
+                os.unlink(p)
+            except FileNotFoundError:
+                pass
+        shutil.rmtree(os.path.join(self.files_dir, job_id), ignore_errors=True)
+
+
+def _calc(kind: str, inputs: dict):
+    from scour_calc import calc_d21, calc_d22
+
+    if kind == "d21":
+        return calc_d21(**inputs)
+    if kind == "d22":
+        return calc_d22(**inputs)
+    raise ValueError(f"未知计算书类型：{kind}")
+
+
+def _export_one(kind: str, inputs: dict, name: str | None, path: str) -> str:
+    from report_cache import default_cache
+
+    return default_cache().export(path=path, kind=kind, name=name, inputs=inputs, result=_calc(kind, inputs))
+
+
+def _render_one(kind: str, inputs: dict, name: str | None) -> bytes:
+    """生成单份计算书的 docx 字节（批量打包用，不落临时文件）；相同工况只渲染一次正文。"""
+    from report_cache import default_cache
+
+    return default_cache().render(kind, name=name, inputs=inputs, result=_calc(kind, inputs))
+
+
+class ReportJobQueue:
+    """有界线程池 + 文件存储的计算书导出队列。
+
+    - `max_workers`：同时生成的计算书数量上限；
+    - `retention_s`：已完成任务的保留时长，超时后由 `purge_expired()` 清理；
+    - `start=False` 时只写入任务记录不执行（命令行提交后由 `scour_cli.py jobs work` 处理）。
+    """
+
+    def __init__(
+        self,
+        root: str = DEFAULT_JOB_ROOT,
+        *,
+        max_workers: int = 2,
+        retention_s: float = DEFAULT_RETENTION_S,
+        start: bool = True,
+    ) -> None:
+        if max_workers <= 0:
+            raise ValueError("max_workers 必须为正")
+        self.store = ReportJobStore(root)
+        self.retention_s = float(retention_s)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-job") if start else None
+        self._inflight: set[str] = set()
+        self._inflight_lock = threading.Lock()
+        if self._executor is not None:
+            self.resume()
+
+    # ---------------- 提交 ----------------
+    def submit(self, kind: Literal["d21", "d22"], inputs: dict, name: str | None = None) -> str:
+        """提交单份计算书导出，返回任务 id。"""
+        if kind not in ("d21", "d22"):
+            raise ValueError(f"未知计算书类型：{kind}")
+        return self._enqueue(kind, {"inputs": dict(inputs), "name": name})
+
+    def submit_batch(self, items: list[dict], *, archive_name: str = "计算书.zip") -> str:
+        """批量导出：`items` 每项为 {"kind": "d21"/"d22", "inputs": {...}, "name": 可选}。
+
+        产物为打包所有计算书的 zip；单项失败不会中断其他项，错误写入 zip 内的“错误清单.txt”。
+        """
+        if not items:
+            raise ValueError("批量导出列表不能为空")
+        norm = []
+        for it in items:
+            kind = it.get("kind")
+            if kind not in ("d21", "d22"):
+                raise ValueError(f"未知计算书类型：{kind}")
+            norm.append({"kind": kind, "inputs": dict(it["inputs"]), "name": it.get("name")})
+        return self._enqueue("batch", {"items": norm, "archive_name": archive_name})
+
+    def _enqueue(self, kind: JobKind, payload: dict) -> str:
+        self.purge_expired()
+        job = ReportJob(job_id=uuid.uuid4().hex, kind=kind, payload=payload)
+        self.store.save(job)
+        self._dispatch(job.job_id)
+        return job.job_id
+
+    def _dispatch(self, job_id: str) -> None:
+        if self._executor is None:
+            return
+        with self._inflight_lock:
+            if job_id in self._inflight:
+                return
+            self._inflight.add(job_id)
+        self._executor.submit(self._run, job_id)
+
+    def resume(self) -> int:
+        """把存储中未完成的任务重新排队（用于进程重启后恢复），返回数量。"""
+        n = 0
+        for job in self.store.all():
+            if not job.finished:
+                self._dispatch(job.job_id)
+                n += 1
+        return n
+
+    # ---------------- 查询 ----------------
+    def get(self, job_id: str) -> ReportJob | None:
+        """查询任务；不存在或已过期清理时返回 None。"""
+        return self.store.load(job_id)
+
+    def list_jobs(self) -> list[ReportJob]:
+        return self.store.all()
+
+    def wait(self, job_id: str, *, timeout: float | None = None, poll_s: float = 0.2) -> ReportJob:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                raise KeyError(f"任务不存在或已过期：{job_id}")
+            if job.finished:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"等待任务超时：{job_id}")
+            time.sleep(poll_s)
+
+    def purge_expired(self, now: float | None = None) -> int:
+        """删除超过保留时长的已完成任务及其文件，返回删除数量。"""
+        now = time.time() if now is None else now
+        n = 0
+        for job in self.store.all():
+            if job.finished and job.finished_at is not None and now - job.finished_at > self.retention_s:
+                self.store.delete(job.job_id)
+                n += 1
+        return n
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    # ---------------- 执行 ----------------
+    def _run(self, job_id: str) -> None:
+        try:
+            if not self.store.claim(job_id):
+                return
+            try:
+                job = self.store.load(job_id)
+                if job is None or job.finished:
+                    return
+                job.status = "running"
+                job.started_at = time.time()
+                job.progress = 0.0
+                self.store.save(job)
+                try:
+                    job.output = self._execute(job)
+                    job.status = "done"
+                    job.progress = 1.0
+                except Exception as e:
+                    job.status = "failed"
+                    job.error = str(e)
+                job.finished_at = time.time()
+                self.store.save(job)
+            finally:
+                self.store.release(job_id)
+        finally:
+            with self._inflight_lock:
+                self._inflight.discard(job_id)
+
+    def _execute(self, job: ReportJob) -> str:
+        out_dir = self.store.output_dir(job.job_id)
+        p = job.payload
+        if job.kind in ("d21", "d22"):
+            path = os.path.join(out_dir, f"冲刷计算书_{job.kind.upper()}.docx")
+            return _export_one(job.kind, p["inputs"], p.get("name"), path)
+
+        items = p["items"]
+        archive = os.path.join(out_dir, p.get("archive_name") or "计算书.zip")
+        errors: list[str] = []
+        with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for i, it in enumerate(items, start=1):
+                label = (it.get("name") or "").strip() or f"{i:04d}"
+                arcname = f"{i:04d}_{it['kind'].upper()}_{label}.docx"
+                try:
+                    data = _render_one(it["kind"], it["inputs"], it.get("name"))
+                except Exception as e:
+                    errors.append(f"{arcname}: {e}")
+                else:
+                    # docx 本身已是压缩包，外层直接存储
+                    zf.writestr(arcname, data, compress_type=zipfile.ZIP_STORED)
+                job.progress = i / len(items)
+                self.store.save(job)
+            if errors:
+                zf.writestr("错误清单.txt", "\n".join(errors))
+        return archive
@@ -0,0 +1,368 @@
+"""计算书内容模型与轻量预览（HTML / Markdown）。
+
+计算书的内容（标题、已知条件、计算过程、计算结果、中间量、附图）只在这里组织一次，
+得到按顺序排列的 `Block` 列表；各输出端只负责排版：
+
+- `word_export`：python-docx 生成 Word；
+- `ooxml_export`：预编译片段直接写 docx；
+- `render_html` / `render_markdown`：页面内即时预览，无需生成 docx。
+
+    report = build_d21_report(name="XX丁坝", inputs=inputs, result=calc_d21(**inputs))
+    html = render_html(report)
+"""
+
+from __future__ import annotations
+
+import base64
+import html
+import os
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Literal
+
+from scour_calc import D21Result, D22Result, D21_VELOCITY_EXPONENT, K1_LABELS, UC_LABELS, UcCode, k1_code, uc_code
+
+
+BlockKind = Literal["title", "heading", "line", "figure"]
+
+
+@dataclass(frozen=True)
+class Block:
+    """计算书中的一段。
+
+    - title / heading：标题、小标题；
+    - line：正文，`level` 为缩进层级（0 为首行缩进），`use_format` 时按 `_format_runs` 排上下标；
+    - figure：附图，`text` 为图题，`image` 为图片路径。
+    """
+
+    kind: BlockKind
+    text: str
+    level: int = 0
+    use_format: bool = True
+    image: str | None = None
+
+
+@dataclass
+class Report:
+    blocks: list[Block]
+
+    @property
+    def title(self) -> str:
+        return next((b.text for b in self.blocks if b.kind == "title"), "")
+
+
+def _fmt(x, nd: int = 6) -> str:
+    try:
+        v = float(x)
+        if abs(v) >= 1e4 or (abs(v) > 0 and abs(v) < 1e-3):
+            return f"{v:.{nd}e}"
+        return f"{v:.{nd}f}".rstrip("0").rstrip(".")
+    except Exception:
+        return str(x)
+
+
+def _result_items(result) -> list[tuple[str, float]]:
+    """按字段顺序取结果记录的 (名称, 值)，不像 asdict() 那样逐个深拷贝。"""
+    return [(f.name, getattr(result, f.name)) for f in fields(result)]
+
+
+def _format_runs(text: str) -> list[tuple[str, str | None]]:
+    """把文本拆成带上下标格式的片段 [(文字, None/"subscript"/"superscript")]
+
+    支持的格式：
+    - H0, d50 等数字下标
+    - m³, m² 等上标
+    - γs, γw 等希腊字母+下标
+    """
+    import re
+
+    # 将 m³ 临时替换以便处理
+    text = text.replace('m³', '<<m3>>')
+    text = text.replace('m²', '<<m2>>')
+    text = text.replace('kN/m³', '<<kNm3>>')
+
+    # 正则匹配变量名+数字（如H0, d50, k1, L0, B等）
+    pattern = r'([A-Za-zγαθ]+)(\d+)'
+    parts = re.split(r'(<<.*?>>)', text)  # 先分割特殊标记
+
+    runs: list[tuple[str, str | None]] = []
+    for part in parts:
+        if part.startswith('<<') and part.endswith('>>'):
+            # 处理特殊标记
+            if part == '<<m3>>':
+                runs.append(('m', None))
+                runs.append(('3', 'superscript'))
+            elif part == '<<m2>>':
+                runs.append(('m', None))
+                runs.append(('2', 'superscript'))
+            elif part == '<<kNm3>>':
+                runs.append(('kN/m', None))
+                runs.append(('3', 'superscript'))
+        else:
+            # 处理普通文本和下标
+            last_end = 0
+            for match in re.finditer(pattern, part):
+                # 添加匹配前的文本
+                if match.start() > last_end:
+                    runs.append((part[last_end:match.start()], None))
+
+                # 添加变量名
+                runs.append((match.group(1), None))
+                runs.append((match.group(2), 'subscript'))
+
+                last_end = match.end()
+
+            # 添加剩余文本
+            if last_end < len(part):
+                runs.append((part[last_end:], None))
+    return runs
+
+
+def figure_blocks() -> list[Block]:
+    """计算书附图（只含存在的图片文件）。"""
+    base_dir = os.path.dirname(__file__)
+    out = []
+    for i, fn in enumerate(("1.png", "2.png"), start=1):
+        p = os.path.join(base_dir, fn)
+        if os.path.exists(p):
+            out.append(Block("figure", f"附图{i}", image=p))
+    return out
+
+
+_KINDS = {
+    "d21": ("D.2.1 丁坝一般冲刷", "规范 D.2.1（非淹没丁坝一般冲刷深度）。"),
+    "d22": ("D.2.2 护岸局部冲刷", "规范 D.2.2（顺坡及平顺护岸局部冲刷深度）。"),
+}
+
+
+def _kind(kind: str) -> tuple[str, str]:
+    try:
+        return _KINDS[kind]
+    except KeyError:
+        raise ValueError(f"未知计算书类型：{kind}") from None
+
+
+def report_header(kind: str, *, name: str | None, now: datetime | None = None) -> list[Block]:
+    """计算书开头随每次导出变化的部分：标题（含工程名称）与生成时间。"""
+    title_name = (name or "").strip()
+    suffix = f" - {title_name}" if title_name else ""
+    now = now or datetime.now()
+    return [
+        Block("title", f"冲刷深度计算书 - {_kind(kind)[0]}{suffix}"),
+        Block("line", f"生成时间：{now.strftime('%Y-%m-%d %H:%M:%S')}"),
+    ]
+
+
+def report_body(kind: str, *, inputs: dict, result) -> list[Block]:
+    """计算书其余部分（计算依据至附图），只取决于输入与结果。"""
+    _kind(kind)
+    return _BODIES[kind](inputs, result)
+
+
+def _intermediates(result) -> list[Block]:
+    out = [Block("heading", "附  中间量")]
+    for k, v in _result_items(result):
+        # 格式化变量名的下标
+        k_formatted = k.replace("_", "₋")
+        out.append(Block("line", f"{k_formatted} = {_fmt(v, 12)}", level=1, use_format=False))
+    return out
+
+
+def _d21_body(inputs: dict, result: D21Result) -> list[Block]:
+    b = [Block("line", f"计算依据：{_KINDS['d21'][1]}")]
+
+    def line(text: str) -> None:
+        b.append(Block("line", text, use_format=False))
+
+    b.append(Block("heading", "1  已知条件"))
+    line(
+        "H₀={H0} m，d₅₀={d50} m，U={U} m/s，L₀={L0} m，B={B} m".format(
+            H0=_fmt(inputs.get("H0"), 6),
+            d50=_fmt(inputs.get("d50"), 6),
+            U=_fmt(inputs.get("U"), 6),
+            L0=_fmt(inputs.get("L0"), 6),
+            B=_fmt(inputs.get("B"), 6),
+        )
+    )
+    line(
+        "θ={theta}°，m={m}，k₁类型={k1_type}".format(
+            theta=_fmt(inputs.get("theta_deg"), 6),
+            m=_fmt(inputs.get("m"), 6),
+            k1_type=K1_LABELS[k1_code(inputs.get("k1_type"))],
+        )
+    )
+
+    uc_method = uc_code(inputs.get("uc_method"))
+    if uc_method is UcCode.MANUAL:
+        line(f"Uᴄ 取值：手动输入，Uᴄ={_fmt(inputs.get('uc_manual'), 6)} m/s")
+    else:
+        line(
+            "Uᴄ 取值：{mth}，γₛ={gs} kN/m³，γ={gw} kN/m³".format(
+                mth=UC_LABELS[uc_method],
+                gs=_fmt(inputs.get("gamma_s"), 6),
+                gw=_fmt(inputs.get("gamma_w"), 6),
+            )
+        )
+
+    b.append(Block("heading", "2  计算过程"))
+    line(f"速度项指数 a 固定为 {D21_VELOCITY_EXPONENT:.2f}。")
+    line(f"k₁={_fmt(result.k1, 6)}，k₂={_fmt(result.k2, 6)}，k₃={_fmt(result.k3, 6)}")
+    line(f"Uₘ={_fmt(result.Um, 6)} m/s，Uᴄ={_fmt(result.Uc, 6)} m/s")
+
+    # 速度项 v = (Um-Uc)/sqrt(g*d50)
+    try:
+        v_term = (float(result.Um) - float(result.Uc)) / ((9.81 * float(inputs.get("d50"))) ** 0.5)
+    except Exception:
+        v_term = None
+    if v_term is not None:
+        line(f"v = (Uₘ − Uᴄ) / √(g·d₅₀) = {_fmt(v_term, 6)}")
+
+    line(f"hₛ/H₀ = {_fmt(result.hs_over_H0, 6)}")
+
+    b.append(Block("heading", "3  计算结果"))
+    line(f"hₛ = {_fmt(result.hs, 6)} m")
+
+    b.extend(_intermediates(result))
+    b.extend(figure_blocks())
+    return b
+
+
+def _d22_body(inputs: dict, result: D22Result) -> list[Block]:
+    b = [Block("line", f"计算依据：{_KINDS['d22'][1]}")]
+
+    def line(text: str) -> None:
+        b.append(Block("line", text, use_format=False))
+
+    b.append(Block("heading", "1  已知条件"))
+    line(
+        "H₀={H0} m，U={U} m/s，Uᴄ={Uc} m/s，α={alpha}°，n={n}".format(
+            H0=_fmt(inputs.get("H0"), 6),
+            U=_fmt(inputs.get("U"), 6),
+            Uc=_fmt(inputs.get("Uc"), 6),
+            alpha=_fmt(inputs.get("alpha_deg"), 6),
+            n=_fmt(inputs.get("n"), 6),
+        )
+    )
+
+    b.append(Block("heading", "2  计算过程"))
+    line(f"η（表 D.2.2）= {_fmt(result.eta, 6)}")
+    line(f"Uₑₚ = U · (2η/(1+η)) = {_fmt(result.Uep, 6)} m/s")
+    line(f"hₛ = H₀ · [(Uₑₚ/Uᴄ)ⁿ − 1] = {_fmt(result.hs_local, 6)} m")
+
+    b.append(Block("heading", "3  计算结果"))
+    line(f"hₛ(局部) = {_fmt(result.hs_local, 6)} m")
+
+    b.extend(_intermediates(result))
+    b.extend(figure_blocks())
+    return b
+
+
+_BODIES = {"d21": _d21_body, "d22": _d22_body}
+
+
+def build_report(kind: str, *, name: str | None, inputs: dict, result, now: datetime | None = None) -> Report:
+    return Report(report_header(kind, name=name, now=now) + report_body(kind, inputs=inputs, result=result))
+
+
+def build_d21_report(*, name: str | None, inputs: dict, result: D21Result, now: datetime | None = None) -> Report:
+    """D.2.1 丁坝一般冲刷计算书内容。"""
+    return build_report("d21", name=name, inputs=inputs, result=result, now=now)
+
+
+def build_d22_report(*, name: str | None, inputs: dict, result: D22Result, now: datetime | None = None) -> Report:
+    """D.2.2 护岸局部冲刷计算书内容。"""
+    return build_report("d22", name=name, inputs=inputs, result=result, now=now)
+
+
+# ---------------- 预览 ----------------
+
+_HTML_STYLE = (
+    ".scour-report{font-family:'Times New Roman','宋体',serif;font-size:14pt;line-height:1.5;}"
+    ".scour-report p{margin:0;}"
+    ".scour-report .title{text-align:center;font-family:'黑体',sans-serif;font-weight:bold;font-size:16pt;}"
+    ".scour-report .heading{font-family:'黑体',sans-serif;font-weight:bold;}"
+    ".scour-report .line0{text-indent:2em;}"
+    ".scour-report img{width:14cm;max-width:100%;}"
+)
+
+_image_uri_cache: dict[str, str] = {}
+
+
+def _image_uri(path: str) -> str:
+    uri = _image_uri_cache.get(path)
+    if uri is None:
+        with open(path, "rb") as f:
+            data = base64.b64encode(f.read()).decode("ascii")
+        ext = os.path.splitext(path)[1].lstrip(".").lower() or "png"
+        uri = _image_uri_cache[path] = f"data:image/{ext};base64,{data}"
+    return uri
+
+
+def _html_text(b: Block) -> str:
+    if not b.use_format:
+        return html.escape(b.text)
+    out = []
+    for t, vert in _format_runs(b.text):
+        t = html.escape(t)
+        if vert == "subscript":
+            t = f"<sub>{t}</sub>"
+        elif vert == "superscript":
+            t = f"<sup>{t}</sup>"
+        out.append(t)
+    return "".join(out)
+
+
+def render_html(report: Report, *, images: bool = True) -> str:
+    """渲染为自带样式的 HTML 片段；`images=True` 时附图以 data URI 内嵌，否则只列图题。"""
+    out = [f"<style>{_HTML_STYLE}</style>", '<div class="scour-report">']
+    for b in report.blocks:
+        if b.kind == "title":
+            out.append(f'<p class="title">{_html_text(b)}</p>')
+        elif b.kind == "heading":
+            out.append(f'<p class="heading">{_html_text(b)}</p>')
+        elif b.kind == "line":
+            if b.level <= 0:
+                out.append(f'<p class="line0">{_html_text(b)}</p>')
+            else:
+                out.append(f'<p style="margin-left:{2 * b.level}em">{_html_text(b)}</p>')
+        elif b.kind == "figure":
+            out.append(f'<p class="heading">{html.escape(b.text)}</p>')
+            if images and b.image:
+                out.append(f'<p><img src="{_image_uri(b.image)}" alt="{html.escape(b.text)}"></p>')
+    out.append("</div>")
+    return "\n".join(out)
+
+
+_MD_SPECIAL = str.maketrans({c: "\\" + c for c in "\\`*_[]<>#|"})
+
+
+def _md_text(b: Block) -> str:
+    if not b.use_format:
+        return b.text.translate(_MD_SPECIAL)
+    out = []
+    for t, vert in _format_runs(b.text):
+        t = t.translate(_MD_SPECIAL)
+        if vert == "subscript":
+            t = f"<sub>{t}</sub>"
+        elif vert == "superscript":
+            t = f"<sup>{t}</sup>"
+        out.append(t)
+    return "".join(out)
+
+
+def render_markdown(report: Report, *, images: bool = True) -> str:
+    """渲染为 Markdown；附图按本地路径引用（`images=False` 时只列图题）。"""
+    out = []
+    for b in report.blocks:
+        if b.kind == "title":
+            out.append(f"# {_md_text(b)}")
+        elif b.kind == "heading":
+            out.append(f"## {_md_text(b)}")
+        elif b.kind == "line":
+            out.append(_md_text(b) if b.level <= 0 else "  " * (b.level - 1) + f"- {_md_text(b)}")
+        elif b.kind == "figure":
+            out.append(f"## {b.text.translate(_MD_SPECIAL)}")
+            if images and b.image:
+                out.append(f"![{b.text}]({b.image.replace(os.sep, '/')})")
+        out.append("")
+    return "\n".join(out)
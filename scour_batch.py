@@ -0,0 +1,638 @@
+"""D.2.1 / D.2.2 批量（向量化）计算与列式结果容器。
+
+- `calc_d21_batch` / `calc_d22_batch`：输入可为标量或数组（按 NumPy 规则广播），
+  与 `scour_calc.calc_d21` / `calc_d22` 逐行等价；无效行不抛异常，而是记录错误码，
+  结果列填 NaN，错误文字与标量接口的 ValueError 一致。
+- `D21Batch` / `D22Batch`：结构化数组（struct-of-arrays）结果容器，所有字段共用一块
+  连续的 float64 缓冲区（每个字段一行），列访问与切片均为零拷贝视图；
+  `batch[i]` 仍返回 `D21Result`/`D22Result`，原有标量接口不受影响。
+- `calc_d21_all_uc_batch`：一次算出全部 Uc 取值方法的结果，返回宽表 `D21UcCompareBatch`。
+- `precision="float32"`：以单精度计算并存储（内存与带宽减半），供大规模扫描/蒙特卡洛筛选；
+  误差界与 Um≈Uc 附近的自动标记见 `F32_HS_RTOL` / `F32_MIN_GAP`。
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Iterator, Sequence
+
+from scour_calc import (
+    D21_VELOCITY_EXPONENT,
+    D21Result,
+    D22Result,
+    ETA_TABLE,
+    G,
+    K1_VALUES,
+    UcCode,
+    k1_code,
+    uc_code,
+)
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+
+        return np
+    except Exception as e:
+        raise ImportError("缺少依赖：numpy（请先 pip install numpy）") from e
+
+
+# 错误码 -> 错误文字（0 表示正常；文字与 scour_calc 中的 ValueError 保持一致，按校验顺序排列）
+D21_ERRORS: tuple[str, ...] = (
+    "",
+    "H0 与 d50 必须为正",
+    "未知 k1 类型",
+    "θ 应在 (0, 90]° 范围内",
+    "m(丁坝头坡率) 必须为正",
+    "U、L0、B 必须为正",
+    "手动 Uc 必须为正",
+    "选择公式计算 Uc 时必须提供 γs 与 γ",
+    "γs 应大于 γ",
+    "未知 Uc 计算方法",
+    "Um 必须大于 Uc，否则按该式无法产生冲刷",
+    "Um 与 Uc 过于接近，float32 精度不足，请用 float64 计算",
+)
+
+D22_ERRORS: tuple[str, ...] = (
+    "",
+    "H0 必须为正",
+    "U 与 Uc 必须为正",
+    "n 必须为正",
+)
+
+# ---------------- 单精度（float32）模式 ----------------
+# 与 float64 参考路径（即标量接口）相比，单精度 D.2.1 结果的相对误差满足
+#
+#     |hs32 - hs64| / hs64 ≤ (F32_BASE_ULPS + F32_GAP_ULPS / gap) · 2⁻²⁴,   gap = (Um - Uc) / Um
+#
+# 第一项来自输入舍入与 k2、k3、(L0/H0)^0.08 等乘积，第二项来自 Um - Uc 相减时的抵消，
+# 经速度项 0.75 次方后仍随 1/gap 放大。gap < F32_MIN_GAP 的行（含 float32 下判为 Um ≤ Uc、
+# 但可能只是舍入所致的行）记错误码 11，结果置 NaN，其余行保证相对误差不超过 F32_HS_RTOL。
+# k1~k3、Um、Uc 各列的相对误差均在 F32_BASE_ULPS 个单位舍入以内，hs_over_H0 同 hs。
+#
+# D.2.2 没有类似的奇点：记 r = Uep/Uc，hs_local = H0·(r^n - 1) 的绝对误差不超过
+# F32_BASE_ULPS · 2⁻²⁴ · H0 · (1 + r^n·(1 + n·|ln r|))；r^n ≈ 1 时 hs_local 接近 0，相对误差会变大，
+# 但绝对误差仍很小。
+#
+# 以上常数由 2×10⁶ 组覆盖规范适用范围的随机输入与 float64 对比标定（实测最大值约为界限的一半）。
+F32_UNIT_ROUNDOFF = 2.0 ** -24
+F32_BASE_ULPS = 16.0
+F32_GAP_ULPS = 8.0
+F32_HS_RTOL = 1e-4
+F32_MIN_GAP = F32_GAP_ULPS * F32_UNIT_ROUNDOFF / (F32_HS_RTOL - F32_BASE_ULPS * F32_UNIT_ROUNDOFF)
+
+PRECISIONS = ("float64", "float32")
+
+
+def _dtype(np, precision: str):
+    if precision not in PRECISIONS:
+        raise ValueError("precision 只能为 'float64' 或 'float32'")
+    return np.dtype(precision)
+
+
+class _ResultBatch:
+    """列式结果容器基类。
+
+    `data` 形状为 (字段数, 行数)，每个字段是一段连续内存；`err` 为逐行 int8 错误码。
+    `data` 为 float32 时保持单精度（见 `precision`），其余一律转为 float64。
+    """
+
+    __slots__ = ("data", "err")
+
+    FIELDS: tuple[str, ...] = ()
+    ERRORS: tuple[str, ...] = ("",)
+    RECORD: type = object
+
+    def __init__(self, data, err=None) -> None:
+        np = _require_numpy()
+        data = np.asarray(data)
+        data = data.astype(np.float64, copy=False) if data.dtype != np.float32 else data
+        if data.ndim != 2 or data.shape[0] != len(self.FIELDS):
+            raise ValueError(f"data 形状应为 ({len(self.FIELDS)}, n)")
+        if err is None:
+            err = np.zeros(data.shape[1], dtype=np.int8)
+        else:
+            err = np.asarray(err, dtype=np.int8)
+            if err.shape != (data.shape[1],):
+                raise ValueError("err 长度应与行数一致")
+        self.data = data
+        self.err = err
+
+    @classmethod
+    def empty(cls, n: int, *, precision: str = "float64"):
+        np = _require_numpy()
+        data = np.full((len(cls.FIELDS), int(n)), np.nan, dtype=_dtype(np, precision))
+        return cls(data, np.zeros(int(n), dtype=np.int8))
+
+    @classmethod
+    def from_records(cls, records: Iterable):
+        """由标量结果记录构造；None 视为错误行（错误码取 -1，文字为“未知错误”）。"""
+        np = _require_numpy()
+        rows = list(records)
+        out = cls.empty(len(rows))
+        for i, r in enumerate(rows):
+            if r is None:
+                out.err[i] = -1
+                continue
+            out.data[:, i] = [getattr(r, k) for k in cls.FIELDS]
+        return out
+
+    @classmethod
+    def concat(cls, batches: Sequence):
+        np = _require_numpy()
+        if not batches:
+            return cls.empty(0)
+        return cls(
+            np.concatenate([b.data for b in batches], axis=1),
+            np.concatenate([b.err for b in batches]),
+        )
+
+    def __len__(self) -> int:
+        return int(self.data.shape[1])
+
+    @property
+    def precision(self) -> str:
+        """"float64" 或 "float32"。"""
+        return self.data.dtype.name
+
+    def astype(self, precision: str):
+        """转换精度（总是复制）。float64 → float32 只是舍入存储，不做 Um≈Uc 标记。"""
+        np = _require_numpy()
+        out = self[:]
+        out.data = self.data.astype(_dtype(np, precision))
+        out.err = self.err.copy()
+        return out
+
+    def __getattr__(self, name: str):
+        fields = type(self).FIELDS
+        if name not in fields:
+            raise AttributeError(name)
+        return self.data[fields.index(name)]
+
+    def column(self, name: str):
+        """字段列（零拷贝视图）。"""
+        return self.data[self.FIELDS.index(name)]
+
+    def __getitem__(self, key):
+        np = _require_numpy()
+        if isinstance(key, (int, np.integer)):
+            return self.record(int(key))
+        return type(self)(self.data[:, key], self.err[key])
+
+    def record(self, i: int):
+        """第 i 行的标量结果；该行无效时按标量接口的习惯抛 ValueError。"""
+        code = int(self.err[i])
+        if code != 0:
+            raise ValueError(self.error_message(code))
+        col = self.data[:, i]
+        return self.RECORD(*(float(v) for v in col))
+
+    def records(self) -> Iterator:
+        """逐行产生标量结果；无效行产生 None。"""
+        for i in range(len(self)):
+            yield None if self.err[i] != 0 else self.record(i)
+
+    __iter__ = records
+
+    @property
+    def ok(self):
+        return self.err == 0
+
+    def error_message(self, code: int) -> str:
+        if 0 <= code < len(self.ERRORS):
+            return self.ERRORS[code]
+        return "未知错误"
+
+    def errors(self) -> list[str]:
+        """逐行错误文字（正常行为空串）。"""
+        return [self.error_message(int(c)) for c in self.err]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.data.nbytes + self.err.nbytes)
+
+    def to_dict(self, *, include_errors: bool = True) -> dict:
+        out = {k: self.data[i] for i, k in enumerate(self.FIELDS)}
+        if include_errors:
+            out["error"] = self.errors()
+        return out
+
+    def to_dataframe(self, *, include_errors: bool = True):
+        """转为 pandas.DataFrame（数值列直接引用本容器的缓冲区，不复制）。"""
+        try:
+            import pandas as pd
+        except Exception as e:
+            raise ImportError("缺少依赖：pandas（请先 pip install pandas）") from e
+        df = pd.DataFrame(self.data.T, columns=list(self.FIELDS), copy=False)
+        if include_errors:
+            df["error"] = self.errors()
+        return df
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(n={len(self)}, ok={int(self.ok.sum())})"
+
+
+class D21Batch(_ResultBatch):
+    __slots__ = ()
+    FIELDS = ("hs", "hs_over_H0", "k1", "k2", "k3", "Um", "Uc")
+    ERRORS = D21_ERRORS
+    RECORD = D21Result
+
+
+class D22Batch(_ResultBatch):
+    __slots__ = ()
+    FIELDS = ("hs_local", "Uep", "eta")
+    ERRORS = D22_ERRORS
+    RECORD = D22Result
+
+
+class D21UcCompareBatch(_ResultBatch):
+    """D.2.1 各 Uc 取值方法并列的宽表结果。
+
+    共用列 k1、k2、k3、Um 只算一次；每种方法各有 Uc_<方法>、hs_over_H0_<方法>、hs_<方法> 三列
+    （方法后缀为 `UcCode` 名称的小写：zhang / rubble / manual）。
+    `err` 为与方法无关的错误码（1~5），`method_err[j]` 为按第 j 种方法计算时的错误码，
+    与 `calc_d21_batch(uc_method=j)` 的 `err` 相同；某方法不适用（如未给手动 Uc）时该方法各列为 NaN。
+    """
+
+    __slots__ = ("method_err",)
+
+    SHARED = ("k1", "k2", "k3", "Um")
+    METHODS = tuple(UcCode)
+    FIELDS = SHARED + tuple(f"{f}_{c.name.lower()}" for c in METHODS for f in ("Uc", "hs_over_H0", "hs"))
+    ERRORS = D21_ERRORS
+    RECORD = D21Result
+
+    def __init__(self, data, err=None, method_err=None) -> None:
+        super().__init__(data, err)
+        np = _require_numpy()
+        if method_err is None:
+            method_err = np.repeat(self.err[None, :], len(self.METHODS), axis=0)
+        else:
+            method_err = np.asarray(method_err, dtype=np.int8)
+            if method_err.shape != (len(self.METHODS), self.data.shape[1]):
+                raise ValueError("method_err 形状应为 (方法数, 行数)")
+        self.method_err = method_err
+
+    def astype(self, precision: str):
+        out = super().astype(precision)
+        out.method_err = self.method_err.copy()
+        return out
+
+    @classmethod
+    def from_records(cls, records: Iterable):
+        raise TypeError("D21UcCompareBatch 不能由单个方法的结果记录构造")
+
+    @classmethod
+    def concat(cls, batches: Sequence):
+        np = _require_numpy()
+        if not batches:
+            return cls.empty(0)
+        return cls(
+            np.concatenate([b.data for b in batches], axis=1),
+            np.concatenate([b.err for b in batches]),
+            np.concatenate([b.method_err for b in batches], axis=1),
+        )
+
+    def __getitem__(self, key):
+        np = _require_numpy()
+        if isinstance(key, (int, np.integer)):
+            return self.record(int(key))
+        return type(self)(self.data[:, key], self.err[key], self.method_err[:, key])
+
+    def _method_rows(self, code) -> tuple[int, int, int]:
+        j = self.METHODS.index(uc_code(code))
+        base = len(self.SHARED) + 3 * j
+        return base, base + 1, base + 2
+
+    def method(self, uc_method) -> D21Batch:
+        """取出某一方法的结果，与 `calc_d21_batch(uc_method=...)` 的结果相同。"""
+        np = _require_numpy()
+        j = self.METHODS.index(uc_code(uc_method))
+        r_uc, r_ratio, r_hs = self._method_rows(uc_method)
+        data = self.data[[r_hs, r_ratio, 0, 1, 2, 3, r_uc]]
+        err = self.method_err[j].copy()
+        data[:, err != 0] = np.nan
+        return D21Batch(data, err)
+
+    def hs_by_method(self):
+        """(方法数, 行数) 的 hs 数组（副本）。"""
+        return self.data[[self._method_rows(c)[2] for c in self.METHODS]]
+
+    def governing(self):
+        """逐行 hs 最大的方法编码（int8）；所有方法均无效的行为 -1。"""
+        np = _require_numpy()
+        hs = self.hs_by_method()
+        valid = ~np.isnan(hs)
+        best = np.argmax(np.where(valid, hs, -np.inf), axis=0).astype(np.int8)
+        return np.where(valid.any(axis=0), best, np.int8(-1)).astype(np.int8)
+
+    def method_errors(self, uc_method) -> list[str]:
+        """某一方法的逐行错误文字。"""
+        j = self.METHODS.index(uc_code(uc_method))
+        return [self.error_message(int(c)) for c in self.method_err[j]]
+
+    def record(self, i: int) -> dict:
+        """第 i 行：{UcCode: D21Result 或 None（该方法无效）}；共用项无效时抛 ValueError。"""
+        code = int(self.err[i])
+        if code != 0:
+            raise ValueError(self.error_message(code))
+        out = {}
+        for j, c in enumerate(self.METHODS):
+            if self.method_err[j, i] != 0:
+                out[c] = None
+                continue
+            r_uc, r_ratio, r_hs = self._method_rows(c)
+            col = self.data[:, i]
+            out[c] = D21Result(*(float(col[r]) for r in (r_hs, r_ratio, 0, 1, 2, 3, r_uc)))
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.data.nbytes + self.err.nbytes + self.method_err.nbytes)
+
+    def to_dict(self, *, include_errors: bool = True) -> dict:
+        out = super().to_dict(include_errors=include_errors)
+        out["governing"] = self.governing()
+        if include_errors:
+            for c in self.METHODS:
+                out[f"error_{c.name.lower()}"] = self.method_errors(c)
+        return out
+
+    def to_dataframe(self, *, include_errors: bool = True):
+        df = super().to_dataframe(include_errors=include_errors)
+        df["governing"] = self.governing()
+        if include_errors:
+            for c in self.METHODS:
+                df[f"error_{c.name.lower()}"] = self.method_errors(c)
+        return df
+
+
+def _as_float(np, x, dtype=None):
+    dtype = np.float64 if dtype is None else dtype
+    if x is None:
+        return np.asarray(np.nan, dtype=dtype)
+    return np.asarray(x, dtype=dtype)
+
+
+def _to_codes(np, values, lookup, n_codes: int):
+    """把类别（显示文字、枚举或整数编码；标量或序列）映射为 int8 编码；无法识别的为 -1。
+
+    整数数组直接按编码使用（批量引擎推荐的形式），其余逐个查表并缓存。
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu":
+        return np.where((arr >= 0) & (arr < n_codes), arr, -1).astype(np.int8)
+    arr = np.asarray(values, dtype=object)
+    cache: dict = {}
+
+    def one(v) -> int:
+        key = (type(v), v)
+        code = cache.get(key)
+        if code is None:
+            try:
+                code = int(lookup(v))
+            except ValueError:
+                code = -1
+            cache[key] = code
+        return code
+
+    if arr.ndim == 0:
+        return np.asarray(one(arr.item()), dtype=np.int8)
+    return np.fromiter((one(v) for v in arr.ravel()), dtype=np.int8, count=arr.size).reshape(arr.shape)
+
+
+def k1_codes(k1_type):
+    """k1 类型（显示文字或编码，标量或序列）-> int8 编码数组，未知为 -1。"""
+    np = _require_numpy()
+    return _to_codes(np, k1_type, k1_code, len(K1_VALUES))
+
+
+def uc_codes(uc_method):
+    """Uc 取值方法（显示文字或编码，标量或序列）-> int8 编码数组，未知为 -1。"""
+    np = _require_numpy()
+    return _to_codes(np, uc_method, uc_code, len(UcCode))
+
+
+def _flag(np, err, cond, code: int) -> None:
+    """仅在尚无错误的行上记录错误码（保持与标量接口相同的校验先后顺序）。"""
+    np.copyto(err, np.int8(code), where=(err == 0) & cond)
+
+
+def uc_zhang_batch(H0, d50, gamma_s, gamma_w):
+    """D.2.1-5 张瑞瑾公式的向量化形式（不做校验，无效输入得到 NaN）。"""
+    np = _require_numpy()
+    with np.errstate(all="ignore"):
+        term1 = 17.6 * ((gamma_s - gamma_w) / gamma_w) * d50
+        term2 = 6.05e-7 * (10.0 + H0) / (d50 ** 1.72)
+        return (H0 / d50) ** 0.14 * np.sqrt(np.maximum(term1 + term2, 0.0))
+
+
+def uc_rubble_batch(H0, d50, gamma_s, gamma_w):
+    """D.2.1-6 卵石起动流速公式的向量化形式（不做校验）。"""
+    np = _require_numpy()
+    with np.errstate(all="ignore"):
+        base = 1.08 * np.sqrt(G * d50 * ((gamma_s - gamma_w) / gamma_w))
+        return base * (H0 / d50) ** (1.0 / 6.0)
+
+
+def eta_from_angle_batch(alpha_deg):
+    """表 D.2.2 η 的向量化查表（两端取端点值，中间线性插值）。"""
+    np = _require_numpy()
+    xs = [p[0] for p in ETA_TABLE]
+    ys = [p[1] for p in ETA_TABLE]
+    return np.interp(np.abs(np.asarray(alpha_deg, dtype=np.float64)), xs, ys)
+
+
+def calc_d21_batch(
+    *,
+    H0,
+    d50,
+    U,
+    L0,
+    B,
+    theta_deg,
+    m,
+    k1_type,
+    uc_method,
+    gamma_s=None,
+    gamma_w=None,
+    uc_manual=None,
+    precision: str = "float64",
+) -> D21Batch:
+    """D.2.1 丁坝一般冲刷深度的批量计算。
+
+    数值参数可为标量或数组（广播后按 C 顺序展平为行）；`k1_type`/`uc_method` 可为单个
+    显示文字/编码，或与行对应的序列（整数编码数组最快，见 `K1Code`/`UcCode`）；`gamma_s`/`gamma_w`/`uc_manual` 缺省时按 NaN（未提供）处理。
+    `precision="float32"` 时全程单精度，Um≈Uc 的行记错误码 11（见 `F32_MIN_GAP`）。
+    """
+    np = _require_numpy()
+    dt = _dtype(np, precision)
+
+    k1c = k1_codes(k1_type)
+    ucc = uc_codes(uc_method)
+    arrays = np.broadcast_arrays(
+        _as_float(np, H0, dt),
+        _as_float(np, d50, dt),
+        _as_float(np, U, dt),
+        _as_float(np, L0, dt),
+        _as_float(np, B, dt),
+        _as_float(np, theta_deg, dt),
+        _as_float(np, m, dt),
+        _as_float(np, gamma_s, dt),
+        _as_float(np, gamma_w, dt),
+        _as_float(np, uc_manual, dt),
+        k1c,
+        ucc,
+    )
+    H0, d50, U, L0, B, theta, m, gs, gw, ucm, k1c, ucc = (a.ravel() for a in arrays)
+    n = H0.shape[0]
+
+    err = np.zeros(n, dtype=np.int8)
+    out = D21Batch.empty(n, precision=precision)
+    data = out.data
+    data[2], data[3], data[4], data[5] = _d21_shared(np, err, H0, d50, U, L0, B, theta, m, k1c)
+    manual = ucc == UcCode.MANUAL
+    _flag(np, err, manual & ~(ucm > 0), 6)
+    _flag(np, err, ~manual & (np.isnan(gs) | np.isnan(gw)), 7)
+    _flag(np, err, ((ucc == UcCode.ZHANG) | (ucc == UcCode.RUBBLE)) & ~(gs > gw), 8)
+    _flag(np, err, ucc < 0, 9)
+
+    data[6] = np.where(
+        ucc == UcCode.ZHANG,
+        uc_zhang_batch(H0, d50, gs, gw),
+        np.where(ucc == UcCode.RUBBLE, uc_rubble_batch(H0, d50, gs, gw), ucm),
+    )
+    data[1], data[0] = _d21_hs(np, err, H0, d50, L0, data[2], data[3], data[4], data[5], data[6])
+
+    data[:, err != 0] = np.nan
+    out.err = err
+    return out
+
+
+def _d21_shared(np, err, H0, d50, U, L0, B, theta, m, k1c):
+    """D.2.1 中与 Uc 取值方法无关的部分：校验（错误码 1~5）并求 k1、k2、k3、Um。"""
+    _flag(np, err, ~((H0 > 0) & (d50 > 0)), 1)
+    _flag(np, err, k1c < 0, 2)
+    _flag(np, err, ~((theta > 0) & (theta <= 90)), 3)
+    _flag(np, err, ~(m > 0), 4)
+    _flag(np, err, ~((U > 0) & (L0 > 0) & (B > 0)), 5)
+    with np.errstate(all="ignore"):
+        k1 = np.take(np.asarray(K1_VALUES, dtype=H0.dtype), np.clip(k1c, 0, len(K1_VALUES) - 1))
+        k2 = (theta / 90.0) ** 0.26
+        k3 = np.exp(-0.07 * m)
+        Um = (1.0 + 4.8 * (L0 / B)) * U
+    return k1, k2, k3, Um
+
+
+def _d21_hs(np, err, H0, d50, L0, k1, k2, k3, Um, Uc):
+    """由共用项与 Uc 求 hs/H0 与 hs（Um ≤ Uc 记错误码 10；单精度下 Um≈Uc 记 11）。"""
+    _flag(np, err, ~(Um > Uc), 10)
+    if Um.dtype == np.float32:
+        # 二者过近时 Um - Uc 的相对误差失控，Um ≤ Uc 的判断本身也可能只是舍入所致
+        with np.errstate(all="ignore"):
+            near = np.abs(Um - Uc) < F32_MIN_GAP * np.maximum(Um, Uc)
+        np.copyto(err, np.int8(11), where=near & ((err == 0) | (err == 10)))
+    with np.errstate(all="ignore"):
+        v_term = (Um - Uc) / np.sqrt(G * d50)
+        hs_over_H0 = 2.80 * k1 * k2 * k3 * (v_term ** D21_VELOCITY_EXPONENT) * ((L0 / H0) ** 0.08)
+    return hs_over_H0, hs_over_H0 * H0
+
+
+def calc_d21_all_uc_batch(
+    *,
+    H0,
+    d50,
+    U,
+    L0,
+    B,
+    theta_deg,
+    m,
+    k1_type,
+    gamma_s=None,
+    gamma_w=None,
+    uc_manual=None,
+    precision: str = "float64",
+) -> D21UcCompareBatch:
+    """一次向量化计算 D.2.1 全部 Uc 取值方法（张瑞瑾公式、卵石起动流速、手动输入）的结果。
+
+    参数同 `calc_d21_batch`（无 `uc_method`）；k1、k2、k3、Um 只算一次，各方法只另算 Uc 与 hs。
+    未提供 γs/γ 时两种公式法记错误码 7，未提供手动 Uc 时手动方法记错误码 6，其余方法不受影响。
+    """
+    np = _require_numpy()
+    dt = _dtype(np, precision)
+
+    k1c = k1_codes(k1_type)
+    arrays = np.broadcast_arrays(
+        _as_float(np, H0, dt),
+        _as_float(np, d50, dt),
+        _as_float(np, U, dt),
+        _as_float(np, L0, dt),
+        _as_float(np, B, dt),
+        _as_float(np, theta_deg, dt),
+        _as_float(np, m, dt),
+        _as_float(np, gamma_s, dt),
+        _as_float(np, gamma_w, dt),
+        _as_float(np, uc_manual, dt),
+        k1c,
+    )
+    H0, d50, U, L0, B, theta, m, gs, gw, ucm, k1c = (a.ravel() for a in arrays)
+    n = H0.shape[0]
+
+    err = np.zeros(n, dtype=np.int8)
+    out = D21UcCompareBatch.empty(n, precision=precision)
+    data = out.data
+    data[0], data[1], data[2], data[3] = _d21_shared(np, err, H0, d50, U, L0, B, theta, m, k1c)
+
+    no_gamma = np.isnan(gs) | np.isnan(gw)
+    for j, code in enumerate(D21UcCompareBatch.METHODS):
+        e = err.copy()
+        if code == UcCode.MANUAL:
+            _flag(np, e, ~(ucm > 0), 6)
+            Uc = ucm
+        else:
+            _flag(np, e, no_gamma, 7)
+            _flag(np, e, ~(gs > gw), 8)
+            Uc = uc_zhang_batch(H0, d50, gs, gw) if code == UcCode.ZHANG else uc_rubble_batch(H0, d50, gs, gw)
+        r_uc, r_ratio, r_hs = out._method_rows(code)
+        data[r_uc] = Uc
+        data[r_ratio], data[r_hs] = _d21_hs(np, e, H0, d50, L0, data[0], data[1], data[2], data[3], Uc)
+        bad = e != 0
+        for r in (r_uc, r_ratio, r_hs):
+            data[r, bad] = np.nan
+        out.method_err[j] = e
+
+    data[:, err != 0] = np.nan
+    out.err = err
+    return out
+
+
+def calc_d22_batch(*, H0, U, Uc, alpha_deg, n, precision: str = "float64") -> D22Batch:
+    """D.2.2 护岸局部冲刷深度的批量计算（参数可为标量或数组，按广播规则展开）。"""
+    np = _require_numpy()
+    dt = _dtype(np, precision)
+
+    arrays = np.broadcast_arrays(
+        _as_float(np, H0, dt),
+        _as_float(np, U, dt),
+        _as_float(np, Uc, dt),
+        _as_float(np, alpha_deg, dt),
+        _as_float(np, n, dt),
+    )
+    H0, U, Uc, alpha, nn = (a.ravel() for a in arrays)
+
+    err = np.zeros(H0.shape[0], dtype=np.int8)
+    _flag(np, err, ~(H0 > 0), 1)
+    _flag(np, err, ~((U > 0) & (Uc > 0)), 2)
+    _flag(np, err, ~(nn > 0), 3)
+
+    out = D22Batch.empty(H0.shape[0], precision=precision)
+    data = out.data
+    with np.errstate(all="ignore"):
+        data[2] = eta_from_angle_batch(alpha)
+        data[1] = U * (2.0 * data[2] / (1.0 + data[2]))
+        data[0] = H0 * (((data[1] / Uc) ** nn) - 1.0)
+
+    data[:, err != 0] = np.nan
+    out.err = err
+    return out
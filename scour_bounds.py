@@ -0,0 +1,283 @@
+"""输入取值区间上的冲刷深度上下界（不取样）。
+
+输入给成区间时（如 d50 ∈ [0.01, 0.03]、U ∈ [1.2, 1.8]），利用各项的单调性直接求出
+hs 在整个区间盒上的最小、最大值，每个盒子的计算量为常数，可对成千上万个盒子向量化：
+
+    b = d21_bounds(H0=4.0, d50=Interval(0.01, 0.03), U=Interval(1.2, 1.8), L0=30, B=150,
+                   theta_deg=Interval(30, 60), m=1.5, k1_type=0, uc_method=0,
+                   gamma_s=26.0, gamma_w=9.81)
+    b.hs_min, b.hs_max
+
+D.2.1 中 hs 关于 θ、L0、U 单调增，关于 m、B、γs、手动 Uc 单调减，关于 γ 单调增（经 Uc）；
+卵石公式与手动输入下关于 d50 单调减、关于 H0 先增后减（极值点可解析求出），上下界精确可达。
+张瑞瑾公式中 H0、d50 同时出现在 Uc 与其余因子中且 Uc 关于 d50 先减后增，
+此时把 H0×d50 剖分为 `splits`×`splits` 个子盒逐一用区间算术求外包界（保证包含真实范围），
+并在剖分节点上求实际可达值，二者之差随 `splits` 增大而减小。
+
+D.2.1 中盒内存在 Um ≤ Uc 的点时，按“不产生冲刷”计 hs=0（可达下界为 0，`no_scour` 标出）；
+整个盒子都不产生冲刷时记错误码 10。其余错误码与 `scour_batch.D21_ERRORS` 相同，
+以区间端点校验（如 θ 的上限不得超过 90°）。
+D.2.2 的 hs = H0·((Uep/Uc)^n − 1) 中各输入互相独立，上下界总是精确可达。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from scour_batch import (
+    D21_ERRORS,
+    D22_ERRORS,
+    _as_float,
+    _flag,
+    _require_numpy,
+    calc_d21_batch,
+    k1_codes,
+    uc_codes,
+    uc_rubble_batch,
+    uc_zhang_batch,
+)
+from scour_calc import ETA_TABLE, G, K1_VALUES, UcCode
+
+
+_D21_NO_SCOUR = 10
+
+
+@dataclass(frozen=True)
+class Interval:
+    """闭区间 [lo, hi]；lo、hi 可为标量或数组（每个盒子一个区间）。"""
+
+    lo: object
+    hi: object
+
+
+@dataclass
+class HsBounds:
+    """各盒子的 hs 范围。
+
+    真实范围 ⊆ [hs_min, hs_max]（保证的外包界），且 ⊇ [hs_min_attained, hs_max_attained]
+    （盒内实际取到的值）；`exact` 表示两者相同。无效盒子各值为 NaN，错误码见 `err`。
+    """
+
+    hs_min: object
+    hs_max: object
+    hs_min_attained: object
+    hs_max_attained: object
+    exact: object
+    no_scour: object
+    err: object
+    ERRORS: tuple[str, ...] = D21_ERRORS
+
+    def __len__(self) -> int:
+        return int(self.err.shape[0])
+
+    @property
+    def ok(self):
+        return self.err == 0
+
+    def errors(self) -> list[str]:
+        return [self.ERRORS[c] if 0 <= c < len(self.ERRORS) else "未知错误" for c in self.err.tolist()]
+
+
+def _lohi(np, v):
+    if isinstance(v, Interval):
+        return _as_float(np, v.lo), _as_float(np, v.hi)
+    a = _as_float(np, v)
+    return a, a
+
+
+def _boxes(np, names, values, *extra):
+    """把各参数的 (下限, 上限) 与附加数组一起广播成一维，返回 (lo, hi, extra)。"""
+    pairs = [_lohi(np, values[k]) for k in names]
+    arrays = np.broadcast_arrays(*(x for p in pairs for x in p), *extra)
+    arrays = [a.ravel() for a in arrays]
+    lo = {k: arrays[2 * i] for i, k in enumerate(names)}
+    hi = {k: arrays[2 * i + 1] for i, k in enumerate(names)}
+    for k in names:
+        if np.any(lo[k] > hi[k]):
+            raise ValueError(f"{k} 的区间下限大于上限")
+    return lo, hi, arrays[2 * len(names):]
+
+
+def _uc_r(np, ucc, H0, d50, r, ucm):
+    """按方法编码求 Uc；两个公式只依赖 r = (γs−γ)/γ，故以 γs=1+r、γ=1 代入。"""
+    return np.where(
+        ucc == UcCode.ZHANG,
+        uc_zhang_batch(H0, d50, 1.0 + r, 1.0),
+        np.where(ucc == UcCode.RUBBLE, uc_rubble_batch(H0, d50, 1.0 + r, 1.0), ucm),
+    )
+
+
+def _zhang_d_star(np, H0, r):
+    """张瑞瑾公式中 Uc 关于 d50 的极小点：Uc² ∝ 17.6·r·d^0.72 + 6.05e-7·(10+H0)·d^-2。"""
+    return (2.0 * 6.05e-7 * (10.0 + H0) / (0.72 * 17.6 * r)) ** (1.0 / 2.72)
+
+
+def d21_bounds(
+    *,
+    H0,
+    d50,
+    U,
+    L0,
+    B,
+    theta_deg,
+    m,
+    k1_type,
+    uc_method,
+    gamma_s=None,
+    gamma_w=None,
+    uc_manual=None,
+    splits: int = 4,
+) -> HsBounds:
+    """D.2.1 hs 在输入区间盒上的上下界。
+
+    数值参数可为标量/数组（定值）或 `Interval`（区间）；各参数按广播规则展开为一维的盒子序列。
+    `splits` 仅影响张瑞瑾公式的外包界精度（每盒计算量约为 splits²）。
+    """
+    np = _require_numpy()
+    if splits < 1:
+        raise ValueError("splits 至少为 1")
+    names = ("H0", "d50", "U", "L0", "B", "theta_deg", "m", "gamma_s", "gamma_w", "uc_manual")
+    values = dict(H0=H0, d50=d50, U=U, L0=L0, B=B, theta_deg=theta_deg, m=m, gamma_s=gamma_s, gamma_w=gamma_w, uc_manual=uc_manual)
+    lo, hi, (k1c, ucc) = _boxes(np, names, values, k1_codes(k1_type), uc_codes(uc_method))
+    n = k1c.shape[0]
+
+    err = np.zeros(n, dtype=np.int8)
+    _flag(np, err, ~((lo["H0"] > 0) & (lo["d50"] > 0)), 1)
+    _flag(np, err, k1c < 0, 2)
+    _flag(np, err, ~((lo["theta_deg"] > 0) & (hi["theta_deg"] <= 90)), 3)
+    _flag(np, err, ~(lo["m"] > 0), 4)
+    _flag(np, err, ~((lo["U"] > 0) & (lo["L0"] > 0) & (lo["B"] > 0)), 5)
+    manual = ucc == UcCode.MANUAL
+    formula = (ucc == UcCode.ZHANG) | (ucc == UcCode.RUBBLE)
+    _flag(np, err, manual & ~(lo["uc_manual"] > 0), 6)
+    no_gamma = np.isnan(lo["gamma_s"]) | np.isnan(hi["gamma_s"]) | np.isnan(lo["gamma_w"]) | np.isnan(hi["gamma_w"])
+    _flag(np, err, ~manual & no_gamma, 7)
+    _flag(np, err, formula & ~(lo["gamma_s"] > hi["gamma_w"]), 8)
+    _flag(np, err, ucc < 0, 9)
+
+    # 各输入取使 hs 最大 / 最小的端点（H0、d50 另行处理）
+    up = dict(theta_deg=hi["theta_deg"], m=lo["m"], U=hi["U"], L0=hi["L0"], B=lo["B"], gamma_s=lo["gamma_s"], gamma_w=hi["gamma_w"], uc_manual=lo["uc_manual"])
+    dn = dict(theta_deg=lo["theta_deg"], m=hi["m"], U=lo["U"], L0=lo["L0"], B=hi["B"], gamma_s=hi["gamma_s"], gamma_w=lo["gamma_w"], uc_manual=hi["uc_manual"])
+
+    with np.errstate(all="ignore"):
+        k1 = np.take(np.asarray(K1_VALUES), np.clip(k1c, 0, len(K1_VALUES) - 1))
+        C_up = 2.80 * k1 * (up["theta_deg"] / 90.0) ** 0.26 * np.exp(-0.07 * up["m"]) * up["L0"] ** 0.08
+        C_dn = 2.80 * k1 * (dn["theta_deg"] / 90.0) ** 0.26 * np.exp(-0.07 * dn["m"]) * dn["L0"] ** 0.08
+        Um_up = (1.0 + 4.8 * up["L0"] / up["B"]) * up["U"]
+        Um_dn = (1.0 + 4.8 * dn["L0"] / dn["B"]) * dn["U"]
+        r_up = (up["gamma_s"] - up["gamma_w"]) / up["gamma_w"]
+        r_dn = (dn["gamma_s"] - dn["gamma_w"]) / dn["gamma_w"]
+
+        # H0×d50 按几何级数剖分
+        h_ratio = hi["H0"] / lo["H0"]
+        d_ratio = hi["d50"] / lo["d50"]
+        h_nodes = [lo["H0"] * h_ratio ** (i / splits) for i in range(splits + 1)]
+        d_nodes = [lo["d50"] * d_ratio ** (j / splits) for j in range(splits + 1)]
+        h_nodes[-1], d_nodes[-1] = hi["H0"], hi["d50"]
+
+        outer_max = np.full(n, -np.inf)
+        outer_min = np.full(n, np.inf)
+        can_scour = np.zeros(n, dtype=bool)
+        for i in range(splits):
+            ha, hb = h_nodes[i], h_nodes[i + 1]
+            for j in range(splits):
+                da, db = d_nodes[j], d_nodes[j + 1]
+                # Uc 关于 H0、r 单调增；卵石公式关于 d50 单调增，张瑞瑾公式关于 d50 先减后增
+                d_min = np.where(ucc == UcCode.ZHANG, np.clip(_zhang_d_star(np, ha, r_up), da, db), da)
+                uc_min = _uc_r(np, ucc, ha, d_min, r_up, up["uc_manual"])
+                uc_max = np.where(
+                    ucc == UcCode.ZHANG,
+                    np.maximum(_uc_r(np, ucc, hb, da, r_dn, 0.0), _uc_r(np, ucc, hb, db, r_dn, 0.0)),
+                    _uc_r(np, ucc, hb, db, r_dn, dn["uc_manual"]),
+                )
+                v_up = np.maximum(Um_up - uc_min, 0.0)
+                v_dn = np.maximum(Um_dn - uc_max, 0.0)
+                can_scour |= v_up > 0
+                hi_sub = C_up * v_up ** 0.75 * (G * da) ** -0.375 * hb ** 0.92
+                lo_sub = C_dn * v_dn ** 0.75 * (G * db) ** -0.375 * ha ** 0.92
+                outer_max = np.maximum(outer_max, hi_sub)
+                outer_min = np.minimum(outer_min, lo_sub)
+
+        # 盒内实际可达值：剖分节点（及卵石公式 H0 方向的极大点）上的精确计算
+        def hs_at(side, H0_pts, d50_pts):
+            res = calc_d21_batch(H0=H0_pts, d50=d50_pts, k1_type=k1c, uc_method=ucc, **side)
+            return np.where(res.err == _D21_NO_SCOUR, 0.0, res.hs)
+
+        att_max = np.full(n, -np.inf)
+        att_min = np.full(n, np.inf)
+        for hp in h_nodes:
+            for dp in d_nodes:
+                att_max = np.fmax(att_max, hs_at(up, hp, dp))
+                att_min = np.fmin(att_min, hs_at(dn, hp, dp))
+        # 卵石公式：d50 取下限，H0 取 d ln hs/dH0 = 0 处，即 0.92·(Um − Uc) = Uc/8
+        uc_star = 0.92 * Um_up / 1.045
+        h_star = lo["d50"] * (uc_star / (1.08 * np.sqrt(G * lo["d50"] * r_up))) ** 6
+        h_star = np.clip(np.where(ucc == UcCode.RUBBLE, h_star, hi["H0"]), lo["H0"], hi["H0"])
+        att_max = np.fmax(att_max, hs_at(up, h_star, lo["d50"]))
+
+    # 卵石公式、手动输入下可达值即为精确范围
+    exact_method = (ucc == UcCode.RUBBLE) | manual
+    hs_max = np.where(exact_method, att_max, np.maximum(outer_max, att_max))
+    hs_min = np.where(exact_method, att_min, np.minimum(outer_min, att_min))
+    _flag(np, err, ~can_scour, _D21_NO_SCOUR)
+
+    bad = err != 0
+    out = [np.where(bad, np.nan, a) for a in (hs_min, hs_max, att_min, att_max)]
+    exact = ~bad & np.isclose(out[0], out[2], rtol=1e-12, atol=0) & np.isclose(out[1], out[3], rtol=1e-12, atol=0)
+    return HsBounds(
+        hs_min=out[0],
+        hs_max=out[1],
+        hs_min_attained=out[2],
+        hs_max_attained=out[3],
+        exact=exact,
+        no_scour=~bad & (out[2] == 0),
+        err=err,
+        ERRORS=D21_ERRORS,
+    )
+
+
+def _eta_range(np, alo, ahi):
+    """η 关于 |α| 单调不减：区间跨过 0 时 |α| 的最小值为 0。"""
+    xs = [p[0] for p in ETA_TABLE]
+    ys = [p[1] for p in ETA_TABLE]
+    a_min = np.where((alo <= 0) & (ahi >= 0), 0.0, np.minimum(np.abs(alo), np.abs(ahi)))
+    a_max = np.maximum(np.abs(alo), np.abs(ahi))
+    return np.interp(a_min, xs, ys), np.interp(a_max, xs, ys)
+
+
+def d22_bounds(*, H0, U, Uc, alpha_deg, n) -> HsBounds:
+    """D.2.2 hs 在输入区间盒上的上下界（精确可达）。参数可为定值或 `Interval`。"""
+    np = _require_numpy()
+    names = ("H0", "U", "Uc", "alpha_deg", "n")
+    lo, hi, _ = _boxes(np, names, dict(H0=H0, U=U, Uc=Uc, alpha_deg=alpha_deg, n=n))
+    count = lo["H0"].shape[0]
+
+    err = np.zeros(count, dtype=np.int8)
+    _flag(np, err, ~(lo["H0"] > 0), 1)
+    _flag(np, err, ~((lo["U"] > 0) & (lo["Uc"] > 0)), 2)
+    _flag(np, err, ~(lo["n"] > 0), 3)
+
+    with np.errstate(all="ignore"):
+        eta_lo, eta_hi = _eta_range(np, lo["alpha_deg"], hi["alpha_deg"])
+        # Uep/Uc 关于 U、η 增，关于 Uc 减；(Uep/Uc)^n 在比值 ≥1 时关于 n 增，否则减
+        r_lo = lo["U"] * (2.0 * eta_lo / (1.0 + eta_lo)) / hi["Uc"]
+        r_hi = hi["U"] * (2.0 * eta_hi / (1.0 + eta_hi)) / lo["Uc"]
+        w_hi = r_hi ** np.where(r_hi >= 1.0, hi["n"], lo["n"]) - 1.0
+        w_lo = r_lo ** np.where(r_lo >= 1.0, lo["n"], hi["n"]) - 1.0
+        # hs = H0·w，H0 > 0 与 w 相互独立
+        hs_max = np.where(w_hi >= 0, hi["H0"] * w_hi, lo["H0"] * w_hi)
+        hs_min = np.where(w_lo >= 0, lo["H0"] * w_lo, hi["H0"] * w_lo)
+
+    bad = err != 0
+    hs_min = np.where(bad, np.nan, hs_min)
+    hs_max = np.where(bad, np.nan, hs_max)
+    return HsBounds(
+        hs_min=hs_min,
+        hs_max=hs_max,
+        hs_min_attained=hs_min,
+        hs_max_attained=hs_max,
+        exact=~bad,
+        no_scour=~bad & (hs_min <= 0),
+        err=err,
+        ERRORS=D22_ERRORS,
+    )
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass
-from typing import Literal
+from enum import IntEnum
+from typing import Literal, Union
 
 
 G = 9.81
@@ -18,12 +19,37 @@ K1Type = Literal[
 ]
 
 
-def k1_from_type(k1_type: K1Type) -> float:
-    if k1_type == "弯曲河段凹岸单丁坝(k1=1.34)":
-        return 1.34
-    if k1_type == "过渡段/顺直段单丁坝(k1=1.00)":
-        return 1.00
-    raise ValueError("未知 k1 类型")
+class K1Code(IntEnum):
+    """k1 类型编码（核心计算按编码分派，显示文字只在界面层映射）。"""
+
+    CONCAVE_BEND = 0
+    STRAIGHT = 1
+
+
+K1_VALUES: tuple[float, ...] = (1.34, 1.00)  # 按 K1Code 取值
+
+K1_LABELS: dict[K1Code, str] = {
+    K1Code.CONCAVE_BEND: "弯曲河段凹岸单丁坝(k1=1.34)",
+    K1Code.STRAIGHT: "过渡段/顺直段单丁坝(k1=1.00)",
+}
+_K1_BY_LABEL = {v: k for k, v in K1_LABELS.items()}
+
+
+def k1_code(k1_type: K1Type | K1Code | int) -> K1Code:
+    """显示文字或整数编码 -> K1Code。"""
+    if isinstance(k1_type, str):
+        code = _K1_BY_LABEL.get(k1_type)
+        if code is None:
+            raise ValueError("未知 k1 类型")
+        return code
+    try:
+        return K1Code(k1_type)
+    except (ValueError, TypeError):
+        raise ValueError("未知 k1 类型") from None
+
+
+def k1_from_type(k1_type: K1Type | K1Code | int) -> float:
+    return K1_VALUES[k1_code(k1_type)]
 
 
 def k2_from_theta(theta_deg: float) -> float:
@@ -47,6 +73,37 @@ def um_from_u(U: float, L0: float, B: float) -> float:
 UcMethod = Literal["张瑞瑾公式(D.2.1-5)", "卵石起动流速(D.2.1-6)", "手动输入"]
 
 
+class UcCode(IntEnum):
+    """Uc 取值方法编码。"""
+
+    ZHANG = 0
+    RUBBLE = 1
+    MANUAL = 2
+
+
+UC_LABELS: dict[UcCode, str] = {
+    UcCode.ZHANG: "张瑞瑾公式(D.2.1-5)",
+    UcCode.RUBBLE: "卵石起动流速(D.2.1-6)",
+    UcCode.MANUAL: "手动输入",
+}
+_UC_BY_LABEL = {v: k for k, v in UC_LABELS.items()}
+
+UcSpec = Union[UcMethod, UcCode, int]
+
+
+def uc_code(uc_method: UcSpec) -> UcCode:
+    """显示文字或整数编码 -> UcCode。"""
+    if isinstance(uc_method, str):
+        code = _UC_BY_LABEL.get(uc_method)
+        if code is None:
+            raise ValueError("未知 Uc 计算方法")
+        return code
+    try:
+        return UcCode(uc_method)
+    except (ValueError, TypeError):
+        raise ValueError("未知 Uc 计算方法") from None
+
+
 def uc_zhang(
     *,
     H0: float,
@@ -88,8 +145,60 @@ def uc_rubble(
     return base * (H0 / d50) ** (1.0 / 6.0)
 
 
+class _SlottedResult:
+    """结果记录基类：`__slots__` 无实例 `__dict__`，大批量保存时内存占用更小。
+
+    冻结 dataclass 配合 `__slots__` 时默认的 pickle/copy 会因赋值被拒绝而失败，
+    这里按字段顺序重新构造。
+    """
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, k) for k in self.__slots__))
+
+
+def uc_from_method(
+    *,
+    uc_method: UcSpec,
+    H0: float,
+    d50: float,
+    gamma_s: float | None,
+    gamma_w: float | None,
+    uc_manual: float | None,
+) -> float:
+    """按所选方法取起动流速 Uc（公式计算或手动输入）。"""
+    try:
+        code: UcCode | None = uc_code(uc_method)
+    except ValueError:
+        code = None  # 与原校验顺序一致：先检查 γs/γ，再报未知方法
+    if code is UcCode.MANUAL:
+        if uc_manual is None or uc_manual <= 0:
+            raise ValueError("手动 Uc 必须为正")
+        return float(uc_manual)
+    if gamma_s is None or gamma_w is None:
+        raise ValueError("选择公式计算 Uc 时必须提供 γs 与 γ")
+    if code is UcCode.ZHANG:
+        return uc_zhang(H0=H0, d50=d50, gamma_s=gamma_s, gamma_w=gamma_w)
+    if code is UcCode.RUBBLE:
+        return uc_rubble(H0=H0, d50=d50, gamma_s=gamma_s, gamma_w=gamma_w)
+    raise ValueError("未知 Uc 计算方法")
+
+
+def velocity_term(*, Um: float, Uc: float, d50: float) -> float:
+    """速度项 (Um-Uc)/sqrt(g*d50)。"""
+    if Um <= Uc:
+        raise ValueError("Um 必须大于 Uc，否则按该式无法产生冲刷")
+    v_term = (Um - Uc) / math.sqrt(G * d50)
+    if v_term <= 0:
+        raise ValueError("速度项为非正，检查输入")
+    return v_term
+
+
 @dataclass(frozen=True)
-class D21Result:
+class D21Result(_SlottedResult):
+    __slots__ = ("hs", "hs_over_H0", "k1", "k2", "k3", "Um", "Uc")
+
     hs: float
     hs_over_H0: float
     k1: float
@@ -108,8 +217,8 @@ def calc_d21(
     B: float,
     theta_deg: float,
     m: float,
-    k1_type: K1Type,
-    uc_method: UcMethod,
+    k1_type: K1Type | K1Code | int,
+    uc_method: UcSpec,
     gamma_s: float | None = None,
     gamma_w: float | None = None,
     uc_manual: float | None = None,
@@ -117,6 +226,7 @@ def calc_d21(
     """D.2.1 丁坝一般冲刷深度（非淹没丁坝）。
 
     速度项指数按规范固定为 0.75（见常量 `D21_VELOCITY_EXPONENT`）。
+    `k1_type`/`uc_method` 可传显示文字或编码（`K1Code`/`UcCode`）。
     """
     if H0 <= 0 or d50 <= 0:
         raise ValueError("H0 与 d50 必须为正")
@@ -126,27 +236,15 @@ def calc_d21(
     k3 = k3_from_m(m)
     Um = um_from_u(U=U, L0=L0, B=B)
 
-    if uc_method == "手动输入":
-        if uc_manual is None or uc_manual <= 0:
-            raise ValueError("手动 Uc 必须为正")
-        Uc = float(uc_manual)
-    else:
-        if gamma_s is None or gamma_w is None:
-            raise ValueError("选择公式计算 Uc 时必须提供 γs 与 γ")
-        if uc_method == "张瑞瑾公式(D.2.1-5)":
-            Uc = uc_zhang(H0=H0, d50=d50, gamma_s=gamma_s, gamma_w=gamma_w)
-        elif uc_method == "卵石起动流速(D.2.1-6)":
-            Uc = uc_rubble(H0=H0, d50=d50, gamma_s=gamma_s, gamma_w=gamma_w)
-        else:
-            raise ValueError("未知 Uc 计算方法")
-
-    if Um <= Uc:
-        raise ValueError("Um 必须大于 Uc，否则按该式无法产生冲刷")
-
-    # (Um-Uc)/sqrt(g*d50)
-    v_term = (Um - Uc) / math.sqrt(G * d50)
-    if v_term <= 0:
-        raise ValueError("速度项为非正，检查输入")
+    Uc = uc_from_method(
+        uc_method=uc_method,
+        H0=H0,
+        d50=d50,
+        gamma_s=gamma_s,
+        gamma_w=gamma_w,
+        uc_manual=uc_manual,
+    )
+    v_term = velocity_term(Um=Um, Uc=Uc, d50=d50)
 
     # hs/H0 = 2.80*k1*k2*k3 * v_term^0.75 * (L0/H0)^0.08
     hs_over_H0 = 2.80 * k1 * k2 * k3 * (v_term ** D21_VELOCITY_EXPONENT) * ((L0 / H0) ** 0.08)
@@ -164,26 +262,31 @@ def calc_d21(
 
 
 @dataclass(frozen=True)
-class D22Result:
+class D22Result(_SlottedResult):
+    __slots__ = ("hs_local", "Uep", "eta")
+
     hs_local: float
     Uep: float
     eta: float
 
 
+# 表 D.2.2：按常用角度取值；其他角度线性插值
+ETA_TABLE: tuple[tuple[float, float], ...] = (
+    (15.0, 1.00),
+    (20.0, 1.25),
+    (30.0, 1.50),
+    (40.0, 1.75),
+    (50.0, 2.00),
+    (60.0, 2.25),
+    (70.0, 2.50),
+    (80.0, 2.75),
+    (90.0, 3.00),
+)
+
+
 def eta_from_angle(alpha_deg: float) -> float:
     a = abs(float(alpha_deg))
-    # 表 D.2.2：按常用角度取值；其他角度线性插值
-    pts = [
-        (15.0, 1.00),
-        (20.0, 1.25),
-        (30.0, 1.50),
-        (40.0, 1.75),
-        (50.0, 2.00),
-        (60.0, 2.25),
-        (70.0, 2.50),
-        (80.0, 2.75),
-        (90.0, 3.00),
-    ]
+    pts = ETA_TABLE
     if a <= pts[0][0]:
         return pts[0][1]
     if a >= pts[-1][0]:
@@ -0,0 +1,364 @@
+"""冲刷深度计算器 - 命令行入口。
+
+示例：
+    python scour_cli.py jobs submit d21 inputs.json --name "XX丁坝"
+    python scour_cli.py jobs work
+    python scour_cli.py jobs status <job_id>
+    python scour_cli.py jobs fetch <job_id> 输出目录
+    python scour_cli.py sweep 结果目录 --fixed fixed.json --axis U=0.5:3:200 --axis L0=5:60:100
+    python scour_cli.py query 结果目录 --where hs__gt=4 --where theta_deg__lt=45 --top hs:10
+    python scour_cli.py pipeline 断面表.csv 包络.csv --defaults defaults.json
+    python scour_cli.py uc-compare 断面表.csv Uc方法对比.csv --defaults defaults.json
+    python scour_cli.py reach 纵剖面.csv 建筑物.csv 沿程包络.csv --defaults defaults.json
+    python scour_cli.py workspace 工程.sqlite import 断面表.csv --defaults defaults.json
+    python scour_cli.py workspace 工程.sqlite recompute
+    python scour_cli.py workspace 工程.sqlite top --by hs_max --limit 20
+    python scour_cli.py workspace 工程.sqlite export 包络.csv
+    python scour_cli.py golden check --engine batch-float32
+    python scour_cli.py golden generate 大数据集.npz --rows 1000000 --seed 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+from datetime import datetime
+
+
+def _load_json(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _fmt_time(ts: float | None) -> str:
+    return "-" if ts is None else datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _cmd_jobs(args: argparse.Namespace) -> int:
+    from report_jobs import ReportJobQueue
+
+    if args.jobs_cmd == "work":
+        queue = ReportJobQueue(args.root, max_workers=args.workers, retention_s=args.retention)
+        pending = queue.resume()
+        print(f"待处理任务：{pending}")
+        for job in queue.list_jobs():
+            if not job.finished:
+                job = queue.wait(job.job_id)
+                print(f"{job.job_id}  {job.status}  {job.output or job.error or ''}")
+        queue.shutdown()
+        return 0
+
+    queue = ReportJobQueue(args.root, retention_s=args.retention, start=False)
+
+    if args.jobs_cmd == "submit":
+        data = _load_json(args.inputs)
+        if args.kind == "batch":
+            job_id = queue.submit_batch(data)
+        else:
+            job_id = queue.submit(args.kind, data, name=args.name)
+        print(job_id)
+        return 0
+
+    if args.jobs_cmd == "list":
+        for job in queue.list_jobs():
+            print(f"{job.job_id}  {job.kind:<5}  {job.status:<7}  {job.progress:6.1%}  {_fmt_time(job.created_at)}")
+        return 0
+
+    if args.jobs_cmd == "status":
+        job = queue.get(args.job_id)
+        if job is None:
+            print("任务不存在或已过期", file=sys.stderr)
+            return 1
+        print(f"状态：{job.status}\n进度：{job.progress:.1%}\n创建：{_fmt_time(job.created_at)}\n完成：{_fmt_time(job.finished_at)}")
+        if job.output:
+            print(f"产物：{job.output}")
+        if job.error:
+            print(f"错误：{job.error}")
+        return 0
+
+    if args.jobs_cmd == "fetch":
+        job = queue.get(args.job_id)
+        if job is None or job.status != "done" or not job.output:
+            print("任务未完成、失败或已过期", file=sys.stderr)
+            return 1
+        print(shutil.copy(job.output, args.dest))
+        return 0
+
+    if args.jobs_cmd == "purge":
+        print(f"已清理过期任务：{queue.purge_expired()}")
+        return 0
+
+    return 2
+
+
+def _parse_axis(spec: str) -> tuple[str, list[float]]:
+    """解析扫描轴：`名称=起:止:点数`（等间距）或 `名称=v1,v2,...`。"""
+    name, sep, rhs = spec.partition("=")
+    if not sep or not name.strip():
+        raise ValueError(f"扫描轴格式错误：{spec}")
+    if ":" in rhs:
+        lo, hi, num = rhs.split(":")
+        n = int(num)
+        if n < 1:
+            raise ValueError(f"扫描轴点数必须为正：{spec}")
+        lo_f, hi_f = float(lo), float(hi)
+        step = (hi_f - lo_f) / (n - 1) if n > 1 else 0.0
+        return name.strip(), [lo_f + i * step for i in range(n)]
+    return name.strip(), [float(v) for v in rhs.split(",") if v.strip()]
+
+
+def _cmd_sweep(args: argparse.Namespace) -> int:
+    from scour_store import sweep
+
+    axes = dict(_parse_axis(a) for a in args.axis)
+    fixed = _load_json(args.fixed) if args.fixed else {}
+
+    def progress(done: int, total: int) -> None:
+        print(f"\r{done}/{total} ({done / total:.1%})", end="", flush=True)
+
+    store = sweep(
+        args.out, kind=args.kind, axes=axes, fixed=fixed, chunk_rows=args.chunk, precision=args.precision, progress=progress
+    )
+    print(f"\n完成：{store.filled} 行 -> {store.path}")
+    return 0
+
+
+def _cmd_query(args: argparse.Namespace) -> int:
+    from scour_index import ResultIndex
+    from scour_store import ResultStore
+
+    idx = ResultIndex.from_store(ResultStore.open(args.store), indexed=())
+    conds = {}
+    for w in args.where:
+        key, sep, value = w.partition("=")
+        if not sep:
+            raise ValueError(f"条件格式应为 列名__运算符=值：{w}")
+        conds[key.strip()] = float(value)
+    rows = idx.query(**conds)
+    if args.top:
+        name, _, k = args.top.partition(":")
+        rows = idx.top_k(name, int(k or 10), rows=rows)
+    print(f"命中 {len(rows)} 行")
+    cols = list(idx.columns)
+    print("\t".join(["row"] + cols))
+    for r in rows[: args.limit]:
+        print("\t".join([str(int(r))] + [f"{float(idx.columns[c][r]):.6g}" for c in cols]))
+    return 0
+
+
+def _cmd_pipeline(args: argparse.Namespace) -> int:
+    from scour_pipeline import read_sections_csv, run_reach_pipeline, write_envelope_csv
+
+    defaults = _load_json(args.defaults) if args.defaults else {}
+    with open(args.sections, "r", encoding="utf-8-sig", newline="") as fin:
+        chunks = run_reach_pipeline(read_sections_csv(fin), defaults=defaults, chunk_size=args.chunk)
+        if args.out.lower().endswith(".xlsx"):
+            from xlsx_export import export_envelope_xlsx
+
+            n = export_envelope_xlsx(args.out, chunks)
+        else:
+            with open(args.out, "w", encoding="utf-8-sig", newline="") as fout:
+                n = write_envelope_csv(chunks, fout)
+    print(f"完成：{n} 个断面 -> {args.out}")
+    return 0
+
+
+def _cmd_uc_compare(args: argparse.Namespace) -> int:
+    from scour_pipeline import read_sections_csv, run_uc_comparison, write_uc_compare_csv
+
+    defaults = _load_json(args.defaults) if args.defaults else {}
+    with open(args.sections, "r", encoding="utf-8-sig", newline="") as fin, open(args.out, "w", encoding="utf-8-sig", newline="") as fout:
+        chunks = run_uc_comparison(read_sections_csv(fin), defaults=defaults, chunk_size=args.chunk)
+        n = write_uc_compare_csv(chunks, fout)
+    print(f"完成：{n} 个断面 -> {args.out}")
+    return 0
+
+
+def _cmd_reach(args: argparse.Namespace) -> int:
+    from scour_pipeline import read_sections_csv
+    from scour_reach import REACH_COLUMNS, run_reach_profile, write_reach_csv
+
+    defaults = _load_json(args.defaults) if args.defaults else {}
+    with open(args.structures, "r", encoding="utf-8-sig", newline="") as fs:
+        structures = list(read_sections_csv(fs))
+    with open(args.profile, "r", encoding="utf-8-sig", newline="") as fp:
+        chunks = run_reach_profile(read_sections_csv(fp), structures, defaults=defaults, chunk_size=args.chunk)
+        if args.out.lower().endswith(".xlsx"):
+            from xlsx_export import export_envelope_xlsx
+
+            n = export_envelope_xlsx(args.out, chunks, columns=REACH_COLUMNS)
+        else:
+            with open(args.out, "w", encoding="utf-8-sig", newline="") as fout:
+                n = write_reach_csv(chunks, fout)
+    print(f"完成：{n} 个建筑物 -> {args.out}")
+    return 0
+
+
+def _cmd_workspace(args: argparse.Namespace) -> int:
+    from scour_pipeline import read_sections_csv
+    from scour_workspace import Workspace, write_workspace_csv
+
+    with Workspace(args.db) as ws:
+        if args.ws_cmd == "import":
+            defaults = _load_json(args.defaults) if args.defaults else {}
+            with open(args.sections, "r", encoding="utf-8-sig", newline="") as fin:
+                n = ws.upsert_sections(read_sections_csv(fin), defaults=defaults, chunk_size=args.chunk)
+            print(f"导入 {n} 个断面，待计算 {ws.stale_count()} 个")
+            return 0
+        if args.ws_cmd == "recompute":
+            n = ws.recompute(force=args.force, chunk_size=args.chunk)
+            print(f"计算 {n} 个断面（共 {ws.count()} 个）")
+            return 0
+        if args.ws_cmd == "top":
+            for r in ws.top(args.by, args.limit):
+                flag = "（输入已改，待重算）" if r["stale"] else ""
+                print(f"{r['section_id']}\t{args.by}={r[args.by]:.6g}\t{r['governing']}{flag}")
+            return 0
+        if args.ws_cmd == "export":
+            if args.out.lower().endswith(".xlsx"):
+                from scour_pipeline import ENVELOPE_COLUMNS
+                from xlsx_export import XlsxStreamWriter
+
+                with XlsxStreamWriter(args.out, columns=ENVELOPE_COLUMNS, sheet_name="包络") as w:
+                    n = w.write_rows([r[k] for k in ENVELOPE_COLUMNS] for r in ws.iter_results(min_hs=args.min_hs))
+            else:
+                with open(args.out, "w", encoding="utf-8-sig", newline="") as fout:
+                    n = write_workspace_csv(ws, fout, min_hs=args.min_hs)
+            print(f"完成：{n} 个断面 -> {args.out}")
+            return 0
+    return 1
+
+
+def _cmd_golden(args: argparse.Namespace) -> int:
+    from scour_golden import DEFAULT_PATH, check_golden, failing_cases, format_golden_report, generate_golden
+
+    if args.golden_cmd == "generate":
+        meta = generate_golden(args.path, n=args.rows, seed=args.seed, progress=lambda f: print(f"生成 {f} ...", flush=True))
+        print(f"完成：每个函数 {meta['rows']} 行 -> {args.path}")
+        return 0
+    path = args.path or DEFAULT_PATH
+    report = check_golden(path, engine=args.engine, rtol=args.rtol, atol=args.atol)
+    print(format_golden_report(report))
+    if args.show:
+        for r in report.functions.values():
+            for case in failing_cases(path, r.func, r.failing_rows[: args.show]):
+                print(f"{r.func}: {json.dumps(case, ensure_ascii=False)}")
+    return 0 if report.ok else 2
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from report_jobs import DEFAULT_JOB_ROOT, DEFAULT_RETENTION_S
+
+    parser = argparse.ArgumentParser(prog="scour_cli", description="冲刷深度计算器（D.2）命令行工具")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_jobs = sub.add_parser("jobs", help="计算书导出后台任务")
+    p_jobs.add_argument("--root", default=DEFAULT_JOB_ROOT, help="任务存储目录（与 Web 端共用）")
+    p_jobs.add_argument("--retention", type=float, default=DEFAULT_RETENTION_S, help="已完成任务保留时长（秒）")
+    jobs_sub = p_jobs.add_subparsers(dest="jobs_cmd", required=True)
+
+    p_submit = jobs_sub.add_parser("submit", help="提交导出任务")
+    p_submit.add_argument("kind", choices=["d21", "d22", "batch"])
+    p_submit.add_argument("inputs", help="输入 JSON；batch 时为 [{kind, inputs, name}, ...] 列表")
+    p_submit.add_argument("--name", default=None, help="项目名称（写入计算书标题）")
+
+    p_work = jobs_sub.add_parser("work", help="执行所有排队中的任务直至完成")
+    p_work.add_argument("--workers", type=int, default=2)
+
+    jobs_sub.add_parser("list", help="列出任务")
+    p_status = jobs_sub.add_parser("status", help="查询任务状态")
+    p_status.add_argument("job_id")
+    p_fetch = jobs_sub.add_parser("fetch", help="取回已完成任务的产物")
+    p_fetch.add_argument("job_id")
+    p_fetch.add_argument("dest", help="目标文件或目录")
+    jobs_sub.add_parser("purge", help="清理过期任务")
+
+    p_jobs.set_defaults(func=_cmd_jobs)
+
+    p_sweep = sub.add_parser("sweep", help="网格扫描并写入内存映射结果存储（可断点续算）")
+    p_sweep.add_argument("out", help="结果存储目录")
+    p_sweep.add_argument("--kind", choices=["d21", "d22"], default="d21")
+    p_sweep.add_argument("--axis", action="append", required=True, help="扫描轴，如 U=0.5:3:200 或 theta_deg=15,30,45")
+    p_sweep.add_argument("--fixed", default=None, help="固定参数 JSON 文件")
+    p_sweep.add_argument("--chunk", type=int, default=1 << 20, help="每块计算行数")
+    p_sweep.add_argument("--precision", choices=["float64", "float32"], default="float64",
+                         help="计算与存储精度；float32 占用减半，Um≈Uc 的行记为错误码 11")
+    p_sweep.set_defaults(func=_cmd_sweep)
+
+    p_query = sub.add_parser("query", help="按条件查询扫描结果")
+    p_query.add_argument("store", help="结果存储目录")
+    p_query.add_argument("--where", action="append", default=[], help="条件，如 hs__gt=4、theta_deg__lt=45")
+    p_query.add_argument("--top", default=None, help="按列取前 k 个最大值，如 hs:10")
+    p_query.add_argument("--limit", type=int, default=50, help="最多显示行数")
+    p_query.set_defaults(func=_cmd_query)
+
+    p_pipe = sub.add_parser("pipeline", help="断面表批量计算 D.2.1 → D.2.2 并输出包络")
+    p_pipe.add_argument("sections", help="断面表 CSV")
+    p_pipe.add_argument("out", help="输出包络 CSV（扩展名为 .xlsx 时写 Excel）")
+    p_pipe.add_argument("--defaults", default=None, help="缺省列取值 JSON（如 gamma_s/gamma_w/n）")
+    p_pipe.add_argument("--chunk", type=int, default=10000, help="每块断面数")
+    p_pipe.set_defaults(func=_cmd_pipeline)
+
+    p_ucc = sub.add_parser("uc-compare", help="断面表按全部 Uc 取值方法计算 D.2.1 并输出对比表")
+    p_ucc.add_argument("sections", help="断面表 CSV")
+    p_ucc.add_argument("out", help="输出对比表 CSV")
+    p_ucc.add_argument("--defaults", default=None, help="缺省列取值 JSON（如 gamma_s/gamma_w）")
+    p_ucc.add_argument("--chunk", type=int, default=10000, help="每块断面数")
+    p_ucc.set_defaults(func=_cmd_uc_compare)
+
+    p_reach = sub.add_parser("reach", help="沿纵剖面按桩号插值水力参数并计算各建筑物冲刷包络（流式）")
+    p_reach.add_argument("profile", help="纵剖面 CSV（chainage, H0, U, B, d50，按桩号递增）")
+    p_reach.add_argument("structures", help="建筑物表 CSV（structure_id, chainage 及断面表其余列）")
+    p_reach.add_argument("out", help="输出沿程包络 CSV（扩展名为 .xlsx 时写 Excel）")
+    p_reach.add_argument("--defaults", default=None, help="缺省列取值 JSON（如 gamma_s/gamma_w/n）")
+    p_reach.add_argument("--chunk", type=int, default=10000, help="每块建筑物数")
+    p_reach.set_defaults(func=_cmd_reach)
+
+    p_ws = sub.add_parser("workspace", help="SQLite 工程工作区（断面、结果、计算书记录）")
+    p_ws.add_argument("db", help="工作区数据库文件（不存在时新建）")
+    ws_sub = p_ws.add_subparsers(dest="ws_cmd", required=True)
+    p_wsi = ws_sub.add_parser("import", help="导入/更新断面表")
+    p_wsi.add_argument("sections", help="断面表 CSV")
+    p_wsi.add_argument("--defaults", default=None, help="缺省列取值 JSON")
+    p_wsi.add_argument("--chunk", type=int, default=10000, help="每块断面数")
+    p_wsr = ws_sub.add_parser("recompute", help="重算输入有变化的断面")
+    p_wsr.add_argument("--force", action="store_true", help="全部重算")
+    p_wsr.add_argument("--chunk", type=int, default=10000, help="每块断面数")
+    p_wst = ws_sub.add_parser("top", help="按结果列列出最大的断面")
+    p_wst.add_argument("--by", default="hs_max", help="结果列，如 hs_max、hs_d21、hs_d22")
+    p_wst.add_argument("--limit", type=int, default=20)
+    p_wse = ws_sub.add_parser("export", help="导出包络结果 CSV")
+    p_wse.add_argument("out", help="输出包络 CSV（扩展名为 .xlsx 时写 Excel）")
+    p_wse.add_argument("--min-hs", type=float, default=None, help="只导出 hs_max 不小于该值的断面")
+    p_ws.set_defaults(func=_cmd_workspace)
+
+    # 选项取值与 scour_golden 中一致；不在此处导入该模块，避免其他子命令也依赖 NumPy
+    p_gold = sub.add_parser("golden", help="金标准数据集：生成，或比对计算引擎（有差异时退出码为 2）")
+    gold_sub = p_gold.add_subparsers(dest="golden_cmd", required=True)
+    p_gg = gold_sub.add_parser("generate", help="逐行调用标量接口生成数据集")
+    p_gg.add_argument("path", help="输出 .npz 文件")
+    p_gg.add_argument("--rows", type=int, default=10_000, help="每个函数的行数")
+    p_gg.add_argument("--seed", type=int, default=0)
+    p_gc = gold_sub.add_parser("check", help="用数据集比对计算引擎")
+    p_gc.add_argument("path", nargs="?", default=None, help="数据集文件（默认为随仓库提交的 golden/scour_golden.npz）")
+    p_gc.add_argument("--engine", choices=("batch", "batch-float32", "scalar"), default="batch")
+    p_gc.add_argument("--rtol", type=float, default=None, help="相对容差（缺省按引擎取值）")
+    p_gc.add_argument("--atol", type=float, default=0.0, help="绝对容差")
+    p_gc.add_argument("--show", type=int, default=0, help="每个函数打印前若干个失败用例的输入与参考结果")
+    p_gold.set_defaults(func=_cmd_golden)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (ValueError, KeyError, OSError) as e:
+        print(f"错误：{e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""两参数平面上冲刷深度等值线（安全设计边界）的自适应搜索。
+
+在 (L0, θ)、(U, α) 等平面上找 hs = 允许冲刷深度 的边界。先在粗网格上计算，
+只细分角点跨越阈值的单元格（并补上与其共享跨越边的相邻单元格，保证等值线连续），
+直到单元格尺寸小于容差，再用 marching squares 在最细一层提取等值线并连成折线：
+
+    c = find_contour(
+        "d21", x=("L0", 5.0, 60.0), y=("theta_deg", 10.0, 90.0), level=6.0,
+        fixed={"H0": 4.0, "d50": 0.02, "U": 2.0, "B": 150.0, "m": 1.5,
+               "k1_type": 0, "uc_method": 1, "gamma_s": 26.0, "gamma_w": 9.81},
+        tol=1e-3,
+    )
+    for line in c.polylines:   # (点数, 2) 数组，列为 (x, y)
+        ...
+
+计算次数约与边界长度成正比，远少于同分辨率均匀网格（见 `n_evals` 与 `grid_evals`）。
+折线方向约定：hs 大于阈值（不安全）的一侧在行进方向左边。
+D.2.1 中 Um ≤ Uc 的点按 hs=0 处理；其他无效输入的点不参与判断。
+尺寸小于初始网格（`initial`）且与主边界不相连的孤立区域可能漏检。
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Mapping
+
+from scour_batch import _require_numpy, calc_d21_batch, calc_d22_batch
+
+
+_D21_NO_SCOUR = 10
+
+
+@dataclass
+class Contour:
+    x_name: str
+    y_name: str
+    level: float
+    polylines: list          # 每条为 (点数, 2) 数组
+    closed: list[bool]       # 各折线是否闭合
+    n_evals: int             # 实际计算点数
+    grid_evals: int          # 同分辨率均匀网格所需点数
+    cell_size: tuple[float, float]
+
+    @property
+    def savings(self) -> float:
+        """均匀网格计算次数 / 实际计算次数。"""
+        return self.grid_evals / max(self.n_evals, 1)
+
+
+def _make_func(kind: str, x_name: str, y_name: str, fixed: Mapping, level: float):
+    np = _require_numpy()
+    if kind == "d21":
+        def f(X, Y):
+            res = calc_d21_batch(**{**fixed, x_name: X, y_name: Y})
+            hs = np.where(res.err == _D21_NO_SCOUR, 0.0, res.hs)
+            return hs - level
+    elif kind == "d22":
+        def f(X, Y):
+            return calc_d22_batch(**{**fixed, x_name: X, y_name: Y}).hs_local - level
+    else:
+        raise ValueError(f"未知计算类型：{kind}")
+    return f
+
+
+class _Lattice:
+    """最细一层整数格点上的函数值缓存；按批向量化计算未缓存的点。"""
+
+    def __init__(self, f, x0, y0, hx, hy) -> None:
+        self.f = f
+        self.x0, self.y0, self.hx, self.hy = x0, y0, hx, hy
+        self.values: dict[tuple[int, int], float] = {}
+
+    def ensure(self, points) -> None:
+        np = _require_numpy()
+        todo = [p for p in set(points) if p not in self.values]
+        if not todo:
+            return
+        ij = np.asarray(todo, dtype=np.float64)
+        vals = self.f(self.x0 + ij[:, 0] * self.hx, self.y0 + ij[:, 1] * self.hy)
+        self.values.update(zip(todo, vals.tolist()))
+
+
+def _corners(i: int, j: int, s: int):
+    return ((i, j), (i + s, j), (i + s, j + s), (i, j + s))
+
+
+def _straddles(vals) -> bool:
+    finite = [v for v in vals if v == v]
+    return any(v >= 0 for v in finite) and any(v < 0 for v in finite)
+
+
+def _crossing(a: float, b: float) -> bool:
+    return a == a and b == b and (a >= 0) != (b >= 0)
+
+
+def find_contour(
+    kind: str,
+    *,
+    x: tuple[str, float, float],
+    y: tuple[str, float, float],
+    level: float,
+    fixed: Mapping[str, object],
+    tol: float = 1e-3,
+    initial: int = 16,
+    max_depth: int = 16,
+) -> Contour:
+    """自适应搜索 hs = level 的等值线。
+
+    `x`、`y` 为 (参数名, 下限, 上限)；`tol` 为最细单元格边长占各轴范围的比例；
+    `initial` 为初始粗网格每轴单元数。
+    """
+    np = _require_numpy()
+    x_name, x_lo, x_hi = x[0], float(x[1]), float(x[2])
+    y_name, y_lo, y_hi = y[0], float(y[1]), float(y[2])
+    if not (x_hi > x_lo and y_hi > y_lo):
+        raise ValueError("坐标轴上限须大于下限")
+    if x_name == y_name:
+        raise ValueError("两个坐标轴不能是同一参数")
+    if x_name in fixed or y_name in fixed:
+        raise ValueError("坐标轴参数不能同时出现在固定参数中")
+    if initial < 1:
+        raise ValueError("initial 至少为 1")
+    if not 0 < tol < 1:
+        raise ValueError("tol 应在 (0, 1) 范围内")
+
+    depth = max(0, min(max_depth, math.ceil(math.log2(1.0 / (tol * initial)))))
+    scale = 1 << depth                      # 每个初始单元格在最细一层的格点跨度
+    n_fine = initial * scale
+    hx = (x_hi - x_lo) / n_fine
+    hy = (y_hi - y_lo) / n_fine
+    lat = _Lattice(_make_func(kind, x_name, y_name, fixed, float(level)), x_lo, y_lo, hx, hy)
+    vals = lat.values
+
+    # 初始粗网格
+    lat.ensure([(i * scale, j * scale) for i in range(initial + 1) for j in range(initial + 1)])
+    active = {
+        (i * scale, j * scale)
+        for i in range(initial)
+        for j in range(initial)
+        if _straddles([vals[c] for c in _corners(i * scale, j * scale, scale)])
+    }
+
+    s = scale
+    while True:
+        active = _close(lat, active, s, n_fine)
+        if s == 1:
+            break
+        h = s // 2
+        children = {(i + di, j + dj) for i, j in active for di in (0, h) for dj in (0, h)}
+        lat.ensure([c for i, j in children for c in _corners(i, j, h)])
+        active = {(i, j) for i, j in children if _straddles([vals[c] for c in _corners(i, j, h)])}
+        s = h
+
+    polylines, closed = _trace(np, vals, active)
+    to_xy = np.array([hx, hy])
+    origin = np.array([x_lo, y_lo])
+    return Contour(
+        x_name=x_name,
+        y_name=y_name,
+        level=float(level),
+        polylines=[origin + p * to_xy for p in polylines],
+        closed=closed,
+        n_evals=len(vals),
+        grid_evals=(n_fine + 1) ** 2,
+        cell_size=(hx, hy),
+    )
+
+
+def _close(lat: _Lattice, active: set, s: int, n_fine: int) -> set:
+    """补齐同一层中与已选单元格共享“跨越边”的相邻单元格（沿等值线追踪），直至不再增加。"""
+    vals = lat.values
+    active = set(active)
+    frontier = list(active)
+    while frontier:
+        candidates = set()
+        for i, j in frontier:
+            c0, c1, c2, c3 = _corners(i, j, s)
+            for (a, b), (ni, nj) in (
+                ((c0, c1), (i, j - s)),
+                ((c1, c2), (i + s, j)),
+                ((c2, c3), (i, j + s)),
+                ((c3, c0), (i - s, j)),
+            ):
+                if 0 <= ni < n_fine and 0 <= nj < n_fine and (ni, nj) not in active and _crossing(vals[a], vals[b]):
+                    candidates.add((ni, nj))
+        lat.ensure([c for i, j in candidates for c in _corners(i, j, s)])
+        frontier = [c for c in candidates if c not in active]
+        active.update(frontier)
+    return active
+
+
+def _edge_point(pa, pb, fa: float, fb: float):
+    t = fa / (fa - fb)
+    return (pa[0] + t * (pb[0] - pa[0]), pa[1] + t * (pb[1] - pa[1]))
+
+
+def _segments(vals, i: int, j: int):
+    """单位单元格内的等值线段，每段为 (起点边, 终点边, 起点, 终点)，已按“正值在左”定向。"""
+    cs = _corners(i, j, 1)
+    f = [vals[c] for c in cs]
+    if any(v != v for v in f):
+        return []
+    edges = [(0, 1), (1, 2), (2, 3), (3, 0)]
+    cross = [e for e in edges if (f[e[0]] >= 0) != (f[e[1]] >= 0)]
+    if len(cross) == 2:
+        pairs = [(cross[0], cross[1], max(range(4), key=lambda k: abs(f[k])))]
+    elif len(cross) == 4:
+        # 鞍点：以中心值（角点平均）判断连接方式
+        center = sum(f) / 4.0
+        if (center >= 0) == (f[0] >= 0):
+            pairs = [((0, 1), (1, 2), 1), ((2, 3), (3, 0), 3)]
+        else:
+            pairs = [((3, 0), (0, 1), 0), ((1, 2), (2, 3), 2)]
+    else:
+        return []
+
+    out = []
+    for ea, eb, ref in pairs:
+        p = _edge_point(cs[ea[0]], cs[ea[1]], f[ea[0]], f[ea[1]])
+        q = _edge_point(cs[eb[0]], cs[eb[1]], f[eb[0]], f[eb[1]])
+        ka = tuple(sorted((cs[ea[0]], cs[ea[1]])))
+        kb = tuple(sorted((cs[eb[0]], cs[eb[1]])))
+        c = cs[ref]
+        left = (q[0] - p[0]) * (c[1] - p[1]) - (q[1] - p[1]) * (c[0] - p[0]) > 0
+        if left != (f[ref] >= 0):
+            ka, kb, p, q = kb, ka, q, p
+        out.append((ka, kb, p, q))
+    return out
+
+
+def _trace(np, vals, cells) -> tuple[list, list[bool]]:
+    """把各单元格的有向线段首尾相接为折线（格点坐标）。"""
+    by_start: dict = {}
+    ends = set()
+    for i, j in cells:
+        for ka, kb, p, q in _segments(vals, i, j):
+            by_start[ka] = (kb, p, q)
+            ends.add(kb)
+
+    lines, closed = [], []
+    starts = [k for k in by_start if k not in ends] + list(by_start)
+    for k0 in starts:
+        if k0 not in by_start:
+            continue
+        kb, p, q = by_start.pop(k0)
+        pts = [p, q]
+        k = kb
+        while k in by_start:
+            k, _, q = by_start.pop(k)
+            pts.append(q)
+        lines.append(np.asarray(pts))
+        closed.append(k == k0)
+    return lines, closed
@@ -0,0 +1,538 @@
+"""金标准数据集：标量参考实现的输入/输出快照，以及向量化比对器。
+
+核心算法每次优化（批量引擎、单精度、增量计算等）都可能悄悄改变结果。本模块用
+`scour_calc` 中的标量函数逐行生成参考结果并压缩保存，之后对任意引擎整列比对：
+
+    generate_golden(DEFAULT_PATH, n=10_000)       # 一次性生成（逐行调用标量接口）
+    report = check_golden()                       # 默认数据集，默认比对批量引擎 scour_batch
+    print(format_golden_report(report))
+
+数据集覆盖 `calc_d21`、`calc_d22`、`uc_zhang`、`uc_rubble`、`eta_from_angle` 五个函数：
+常规取值之外，专门构造了各类错误输入（θ 越界、Um ≤ Uc 及 Um≈Uc、m/H0/d50/U/L0/B 非正、
+未知 k1/Uc 编码、缺 γs/γ、γs ≤ γ、手动 Uc 非正等）。错误行保存标量接口抛出的错误码
+（与 `scour_batch.D21_ERRORS`/`D22_ERRORS` 对应），比对时要求引擎给出相同的错误码。
+
+可选引擎：
+- `batch`：`scour_batch` 的向量化实现（默认，容差 1e-10，以 |参考值| 为尺度）；
+- `batch-float32`：单精度批量引擎，容差为 `F32_BASE_ULPS` 个单位舍入（hs、hs_local 按误差界的条件尺度衡量，
+  见 `ERROR_SCALES`），错误码 11（Um≈Uc）的行计为“标记”而非失败；
+- `scalar`：重新逐行调用标量接口（核对标量实现本身是否改变）。
+
+文件为 `np.savez_compressed` 格式，键名为 "<函数>/<列>"，另有 "meta"（JSON 文本）。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Mapping
+
+from scour_batch import (
+    D21_ERRORS,
+    D22_ERRORS,
+    F32_BASE_ULPS,
+    F32_GAP_ULPS,
+    F32_UNIT_ROUNDOFF,
+    _require_numpy,
+    calc_d21_batch,
+    calc_d22_batch,
+    eta_from_angle_batch,
+    uc_rubble_batch,
+    uc_zhang_batch,
+)
+from scour_calc import (
+    D21Result,
+    D22Result,
+    calc_d21,
+    calc_d22,
+    eta_from_angle,
+    uc_rubble,
+    uc_zhang,
+)
+
+
+GOLDEN_VERSION = 1
+# 随仓库提交的数据集；按模块所在目录定位，与当前工作目录无关
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "scour_golden.npz")
+DEFAULT_ROWS = 10_000     # 随仓库提交的数据集每个函数的行数（约 2 MB）；更大的数据集用 CLI 另行生成
+
+# uc_zhang / uc_rubble 的错误码（标量接口的校验顺序）
+UC_ERRORS: tuple[str, ...] = ("", "H0 与 d50 必须为正", "γs 应大于 γ")
+
+D21_INPUTS = ("H0", "d50", "U", "L0", "B", "theta_deg", "m", "k1_type", "uc_method", "gamma_s", "gamma_w", "uc_manual")
+D22_INPUTS = ("H0", "U", "Uc", "alpha_deg", "n")
+UC_INPUTS = ("H0", "d50", "gamma_s", "gamma_w")
+
+# 函数 -> (输入列, 输出列, 错误表)
+FUNCTIONS: dict[str, tuple[tuple[str, ...], tuple[str, ...], tuple[str, ...]]] = {
+    "calc_d21": (D21_INPUTS, D21Result.__slots__, D21_ERRORS),
+    "calc_d22": (D22_INPUTS, D22Result.__slots__, D22_ERRORS),
+    "uc_zhang": (UC_INPUTS, ("Uc",), UC_ERRORS),
+    "uc_rubble": (UC_INPUTS, ("Uc",), UC_ERRORS),
+    "eta_from_angle": (("alpha_deg",), ("eta",), ("",)),
+}
+
+
+def _d21_hs_scale(np, cols, out, j):
+    """hs、hs_over_H0 的误差尺度 |参考|·(1 + (F32_GAP_ULPS/F32_BASE_ULPS)/gap)，gap = (Um - Uc)/Um。
+
+    Um - Uc 相减的抵消使舍入误差随 1/gap 放大（见 `scour_batch` 中单精度误差界的说明），
+    数据集里专门构造了 Um≈Uc 的行，仍按 |参考| 比较会把正常的舍入误差判为失败。
+    """
+    with np.errstate(all="ignore"):
+        gap = (out[5] - out[6]) / out[5]
+        return np.abs(out[j]) * (1.0 + (F32_GAP_ULPS / F32_BASE_ULPS) / gap)
+
+
+def _d22_hs_scale(np, cols, out, j):
+    """hs_local 的误差尺度 H0·(1 + r^n·(1 + n·|ln r|))，r = Uep/Uc。
+
+    r^n ≈ 1 时 hs_local 接近 0，相减抵消使其相对误差失去意义，改与该尺度比较。
+    """
+    with np.errstate(all="ignore"):
+        r = out[1] / cols["Uc"]
+        rn = r ** cols["n"]
+        return cols["H0"] * (1.0 + rn * (1.0 + cols["n"] * np.abs(np.log(r))))
+
+
+# 单精度引擎的误差尺度：函数 -> {输出列: (np, 输入列, 参考输出, 列号) -> 误差尺度}。
+# 只用于 batch-float32（按单精度误差界放宽）；其余引擎及未列出的列一律以 |参考值| 为尺度，
+# 双精度比对不因 Um≈Uc 等病态行而放松。
+ERROR_SCALES: dict[str, dict[str, Callable]] = {
+    "calc_d21": {"hs": _d21_hs_scale, "hs_over_H0": _d21_hs_scale},
+    "calc_d22": {"hs_local": _d22_hs_scale},
+}
+
+
+# ---------------- 输入构造 ----------------
+def _d21_inputs(np, rng, n: int) -> dict:
+    """常规取值约占 80%，其余为逐类构造的错误/边界输入。"""
+    cols = {
+        "H0": rng.uniform(0.2, 30.0, n),
+        "d50": 10.0 ** rng.uniform(-4.0, -0.5, n),
+        "U": rng.uniform(0.1, 6.0, n),
+        "L0": rng.uniform(0.5, 200.0, n),
+        "B": rng.uniform(20.0, 2000.0, n),
+        "theta_deg": rng.uniform(1.0, 90.0, n),
+        "m": rng.uniform(0.1, 5.0, n),
+        "k1_type": rng.integers(0, 2, n).astype(np.int8),
+        "uc_method": rng.integers(0, 3, n).astype(np.int8),
+        "gamma_s": rng.uniform(15.0, 30.0, n),
+        "gamma_w": np.where(rng.random(n) < 0.5, 9.81, rng.uniform(9.0, 11.0, n)),
+        "uc_manual": rng.uniform(0.05, 5.0, n),
+    }
+    Um = (1.0 + 4.8 * (cols["L0"] / cols["B"])) * cols["U"]
+    case = rng.integers(0, 20, n)      # 0~15 常规，16~19 分到下列错误/边界类别
+    sub = rng.integers(0, 16, n)
+    bad = case >= 16
+
+    def put(k: int, name: str, values) -> None:
+        m = bad & (sub == k)
+        cols[name][m] = np.broadcast_to(values, (n,))[m]
+
+    put(0, "theta_deg", rng.uniform(-30.0, 0.0, n))                 # θ ≤ 0
+    put(1, "theta_deg", rng.uniform(90.0 + 1e-9, 180.0, n))         # θ > 90
+    put(2, "theta_deg", 90.0)                                       # 边界：θ = 90 有效
+    put(3, "m", rng.uniform(-2.0, 0.0, n))
+    put(4, "H0", rng.uniform(-5.0, 0.0, n))
+    put(5, "d50", -cols["d50"])
+    put(6, "U", rng.uniform(-2.0, 0.0, n))
+    put(7, "L0", 0.0)
+    put(8, "k1_type", np.int8(5))
+    put(9, "uc_method", np.int8(7))
+    put(10, "gamma_s", np.nan)                                      # 未提供 γs/γ
+    put(11, "gamma_s", cols["gamma_w"] * rng.uniform(0.5, 1.0, n))  # γs ≤ γ
+    put(12, "uc_manual", rng.uniform(-1.0, 0.0, n))
+    # Um ≤ Uc 与 Um≈Uc：手动 Uc 取 Um 本身及其附近
+    m = bad & (sub >= 13)
+    cols["uc_method"][m] = 2
+    put(13, "uc_manual", Um)                                        # Um = Uc（恰好无冲刷）
+    put(14, "uc_manual", Um * (1.0 + rng.uniform(-1e-6, 1e-6, n)))   # 奇点两侧
+    put(15, "uc_manual", Um * rng.uniform(1.0, 3.0, n))              # Um < Uc
+    return cols
+
+
+def _d22_inputs(np, rng, n: int) -> dict:
+    cols = {
+        "H0": rng.uniform(0.2, 30.0, n),
+        "U": rng.uniform(0.1, 6.0, n),
+        "Uc": rng.uniform(0.05, 4.0, n),
+        "alpha_deg": rng.uniform(-100.0, 100.0, n),     # 含负角与超出表范围的角度
+        "n": rng.uniform(0.1, 3.0, n),
+    }
+    bad = rng.random(n) < 0.1
+    sub = rng.integers(0, 4, n)
+    for k, name in enumerate(("H0", "U", "Uc", "n")):
+        m = bad & (sub == k)
+        cols[name][m] = -rng.uniform(0.0, 2.0, int(m.sum()))
+    # 表 D.2.2 节点角度本身
+    nodes = rng.random(n) < 0.05
+    cols["alpha_deg"][nodes] = rng.choice([15.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0, 80.0, 90.0], int(nodes.sum()))
+    return cols
+
+
+def _uc_inputs(np, rng, n: int) -> dict:
+    cols = {
+        "H0": rng.uniform(0.2, 30.0, n),
+        "d50": 10.0 ** rng.uniform(-4.5, 0.0, n),
+        "gamma_s": rng.uniform(15.0, 30.0, n),
+        "gamma_w": np.full(n, 9.81),
+    }
+    bad = rng.random(n) < 0.1
+    sub = rng.integers(0, 3, n)
+    cols["H0"][bad & (sub == 0)] *= -1.0
+    cols["d50"][bad & (sub == 1)] = 0.0
+    m = bad & (sub == 2)
+    cols["gamma_s"][m] = cols["gamma_w"][m] * rng.uniform(0.5, 1.0, int(m.sum()))
+    return cols
+
+
+def _eta_inputs(np, rng, n: int) -> dict:
+    alpha = rng.uniform(-120.0, 120.0, n)
+    nodes = rng.random(n) < 0.1
+    alpha[nodes] = rng.choice([0.0, 15.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0, 80.0, 90.0], int(nodes.sum()))
+    return {"alpha_deg": alpha}
+
+
+_MAKERS = {
+    "calc_d21": _d21_inputs,
+    "calc_d22": _d22_inputs,
+    "uc_zhang": _uc_inputs,
+    "uc_rubble": _uc_inputs,
+    "eta_from_angle": _eta_inputs,
+}
+
+
+# ---------------- 标量参考 ----------------
+def _opt(v: float):
+    return None if v != v else v
+
+
+def _scalar_calls() -> dict[str, Callable[[dict], object]]:
+    return {
+        "calc_d21": lambda r: calc_d21(
+            H0=r["H0"], d50=r["d50"], U=r["U"], L0=r["L0"], B=r["B"], theta_deg=r["theta_deg"], m=r["m"],
+            k1_type=r["k1_type"], uc_method=r["uc_method"],
+            gamma_s=_opt(r["gamma_s"]), gamma_w=_opt(r["gamma_w"]), uc_manual=_opt(r["uc_manual"]),
+        ),
+        "calc_d22": lambda r: calc_d22(**r),
+        "uc_zhang": lambda r: uc_zhang(**r),
+        "uc_rubble": lambda r: uc_rubble(**r),
+        "eta_from_angle": lambda r: eta_from_angle(r["alpha_deg"]),
+    }
+
+
+def scalar_reference(func: str, cols: Mapping[str, object]) -> tuple[object, object]:
+    """逐行调用标量接口，返回 (输出 (列数, 行数) float64，错误码 int8)；错误行输出为 NaN。
+
+    ValueError 的文字按该函数的错误表转为错误码，表中没有的记 -1。
+    """
+    np = _require_numpy()
+    names, outputs, errors = FUNCTIONS[func]
+    call = _scalar_calls()[func]
+    n = len(cols[names[0]])
+    out = np.full((len(outputs), n), np.nan)
+    err = np.zeros(n, dtype=np.int8)
+    lists = [np.asarray(cols[k]).tolist() for k in names]
+    for i, row in enumerate(zip(*lists)):
+        try:
+            res = call(dict(zip(names, row)))
+        except ValueError as e:
+            msg = str(e)
+            err[i] = errors.index(msg) if msg in errors else -1
+            continue
+        if len(outputs) == 1:
+            out[0, i] = res
+        else:
+            out[:, i] = [getattr(res, k) for k in outputs]
+    return out, err
+
+
+def generate_golden(path: str = DEFAULT_PATH, *, n: int = DEFAULT_ROWS, seed: int = 0, progress=None) -> dict:
+    """生成数据集并写入 `path`（各函数各 `n` 行），返回元数据。
+
+    `progress(函数名)` 为可选回调，每开始一个函数调用一次。
+    """
+    np = _require_numpy()
+    if n <= 0:
+        raise ValueError("n 必须为正")
+    rng = np.random.default_rng(seed)
+    arrays: dict[str, object] = {}
+    counts = {}
+    for func, make in _MAKERS.items():
+        if progress is not None:
+            progress(func)
+        cols = make(np, rng, n)
+        out, err = scalar_reference(func, cols)
+        for k, v in cols.items():
+            arrays[f"{func}/{k}"] = v
+        arrays[f"{func}/out"] = out
+        arrays[f"{func}/err"] = err
+        counts[func] = {"rows": n, "errors": int((err != 0).sum())}
+    meta = {
+        "version": GOLDEN_VERSION,
+        "seed": seed,
+        "rows": n,
+        "counts": counts,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "numpy": np.__version__,
+    }
+    arrays["meta"] = np.asarray(json.dumps(meta, ensure_ascii=False))
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    return meta
+
+
+def load_golden(path: str = DEFAULT_PATH) -> tuple[dict, dict]:
+    """读取数据集，返回 (元数据, {函数: {列名: 数组, "out": ..., "err": ...}})。"""
+    np = _require_numpy()
+    with np.load(path, allow_pickle=False) as z:
+        meta = json.loads(str(z["meta"]))
+        if meta.get("version") != GOLDEN_VERSION:
+            raise ValueError(f"不支持的金标准数据集版本：{meta.get('version')}")
+        data: dict[str, dict] = {}
+        for key in z.files:
+            if key == "meta":
+                continue
+            func, _, col = key.partition("/")
+            data.setdefault(func, {})[col] = z[key]
+    return meta, data
+
+
+# ---------------- 待测引擎 ----------------
+def _batch_engine(precision: str) -> dict[str, Callable[[dict], tuple[object, object | None]]]:
+    """批量引擎适配：返回 {函数: cols -> (输出 (列数, 行数), 错误码 或 None)}。
+
+    uc_zhang_batch / uc_rubble_batch / eta_from_angle_batch 不做校验，错误码为 None（错误行不比对）。
+    """
+    np = _require_numpy()
+
+    def d21(c):
+        k = {name: c[name] for name in D21_INPUTS}
+        r = calc_d21_batch(**k, precision=precision)
+        return r.data, r.err
+
+    def d22(c):
+        r = calc_d22_batch(**{name: c[name] for name in D22_INPUTS}, precision=precision)
+        return r.data, r.err
+
+    def cast(v):
+        return np.asarray(v, dtype=precision)
+
+    return {
+        "calc_d21": d21,
+        "calc_d22": d22,
+        "uc_zhang": lambda c: (uc_zhang_batch(*(cast(c[k]) for k in UC_INPUTS))[None, :], None),
+        "uc_rubble": lambda c: (uc_rubble_batch(*(cast(c[k]) for k in UC_INPUTS))[None, :], None),
+        "eta_from_angle": lambda c: (np.asarray(eta_from_angle_batch(c["alpha_deg"]), dtype=precision)[None, :], None),
+    }
+
+
+def _scalar_engine() -> dict[str, Callable[[dict], tuple[object, object | None]]]:
+    return {func: (lambda c, f=func: scalar_reference(f, c)) for func in FUNCTIONS}
+
+
+ENGINES = ("batch", "batch-float32", "scalar")
+# 双精度批量引擎与标量接口的 pow 等函数差 1 个单位舍入，Um≈Uc、r^n≈1 的病态行相对误差可达 1e-11；
+# 单精度引擎的误差以条件尺度（ERROR_SCALES）衡量后，应在 F32_BASE_ULPS 个单位舍入以内
+DEFAULT_RTOL = {"batch": 1e-10, "batch-float32": F32_BASE_ULPS * F32_UNIT_ROUNDOFF, "scalar": 0.0}
+
+
+# ---------------- 比对 ----------------
+@dataclass
+class FunctionReport:
+    func: str
+    rows: int
+    checked: int                 # 参与数值比对的行（参考与引擎均无错误）
+    error_rows: int              # 参考结果为错误的行
+    failed: int
+    error_mismatch: int
+    flagged: int                 # 单精度引擎标记为精度不足（错误码 11）的行
+    max_abs: dict[str, float]
+    max_rel: dict[str, float]
+    failing_rows: list[int] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.failed == 0
+
+
+@dataclass
+class GoldenReport:
+    engine: str
+    rtol: float
+    atol: float
+    elapsed_s: float
+    functions: dict[str, FunctionReport]
+
+    @property
+    def ok(self) -> bool:
+        return all(r.ok for r in self.functions.values())
+
+    @property
+    def rows(self) -> int:
+        return sum(r.rows for r in self.functions.values())
+
+
+def compare_outputs(
+    func: str,
+    expected,
+    expected_err,
+    actual,
+    actual_err,
+    *,
+    rtol: float,
+    atol: float = 0.0,
+    flag_code: int | None = None,
+    scale=None,
+    max_rows: int = 20,
+) -> FunctionReport:
+    """整列比对一个函数的结果。
+
+    某行失败的条件：错误码不同（`actual_err` 为 None 时不比对错误码，参考错误行也不比对数值），
+    或任一输出列 |实际 - 参考| > atol + rtol·尺度（含一方为 NaN、另一方不是）。
+    `scale` 为与 `expected` 同形的误差尺度，缺省取 |参考|；报告中的相对误差也按该尺度计。
+    `flag_code` 为引擎主动标记“精度不足”的错误码，这类行只计数不算失败。
+    """
+    np = _require_numpy()
+    outputs = FUNCTIONS[func][1]
+    expected = np.asarray(expected, dtype=np.float64)
+    actual = np.asarray(actual, dtype=np.float64)
+    scale = np.abs(expected) if scale is None else np.asarray(scale, dtype=np.float64)
+    n = expected.shape[1]
+    ref_ok = expected_err == 0
+
+    if actual_err is None:
+        flagged = np.zeros(n, dtype=bool)
+        err_bad = np.zeros(n, dtype=bool)
+        both = ref_ok
+    else:
+        actual_err = np.asarray(actual_err)
+        flagged = (actual_err == flag_code) if flag_code is not None else np.zeros(n, dtype=bool)
+        err_bad = (actual_err != expected_err) & ~flagged
+        both = ref_ok & (actual_err == 0)
+
+    with np.errstate(all="ignore"):
+        diff = np.abs(actual - expected)
+        rel = np.where(scale > 0, diff / scale, np.where(diff > 0, np.inf, 0.0))
+        nan_bad = np.isnan(actual) != np.isnan(expected)
+        val_bad = ((diff > atol + rtol * scale) | nan_bad).any(axis=0)
+    bad = err_bad | (both & val_bad)
+
+    max_abs, max_rel = {}, {}
+    for j, k in enumerate(outputs):
+        d = diff[j, both]
+        r = rel[j, both]
+        d = d[~np.isnan(d)]
+        r = r[~np.isnan(r)]
+        max_abs[k] = float(d.max()) if d.size else 0.0
+        max_rel[k] = float(r.max()) if r.size else 0.0
+
+    return FunctionReport(
+        func=func,
+        rows=n,
+        checked=int(both.sum()),
+        error_rows=int((~ref_ok).sum()),
+        failed=int(bad.sum()),
+        error_mismatch=int(err_bad.sum()),
+        flagged=int(flagged.sum()),
+        max_abs=max_abs,
+        max_rel=max_rel,
+        failing_rows=np.flatnonzero(bad)[:max_rows].tolist(),
+    )
+
+
+def check_golden(
+    golden: str | tuple[dict, dict] = DEFAULT_PATH,
+    *,
+    engine: str | Mapping[str, Callable] = "batch",
+    rtol: float | None = None,
+    atol: float = 0.0,
+    functions=None,
+    max_rows: int = 20,
+) -> GoldenReport:
+    """用金标准数据集检查引擎。
+
+    `golden` 为文件路径或 `load_golden()` 的返回值；`engine` 为 `ENGINES` 之一，
+    或 {函数: cols -> (输出 (列数, 行数), 错误码 或 None)} 的自定义适配；
+    `rtol` 缺省按引擎取 `DEFAULT_RTOL`（自定义引擎同 batch）。
+    """
+    import time
+
+    np = _require_numpy()
+    _, data = load_golden(golden) if isinstance(golden, str) else golden
+    if isinstance(engine, str):
+        if engine not in ENGINES:
+            raise ValueError(f"未知引擎：{engine}（可选 {', '.join(ENGINES)}）")
+        name = engine
+        adapters = _scalar_engine() if engine == "scalar" else _batch_engine(
+            "float32" if engine == "batch-float32" else "float64"
+        )
+    else:
+        name, adapters = "custom", dict(engine)
+    if rtol is None:
+        rtol = DEFAULT_RTOL.get(name, DEFAULT_RTOL["batch"])
+    flag_code = 11 if name == "batch-float32" else None
+
+    t0 = time.perf_counter()
+    reports = {}
+    for func in functions or FUNCTIONS:
+        if func not in data:
+            raise ValueError(f"数据集中没有 {func}")
+        if func not in adapters:
+            continue
+        cols = data[func]
+        actual, actual_err = adapters[func](cols)
+        scale = np.abs(cols["out"])
+        if name == "batch-float32":
+            for j, k in enumerate(FUNCTIONS[func][1]):
+                if k in ERROR_SCALES.get(func, {}):
+                    scale[j] = ERROR_SCALES[func][k](np, cols, cols["out"], j)
+        reports[func] = compare_outputs(
+            func, cols["out"], cols["err"], actual, actual_err,
+            rtol=rtol, atol=atol, flag_code=flag_code, scale=scale, max_rows=max_rows,
+        )
+    return GoldenReport(engine=name, rtol=rtol, atol=atol, elapsed_s=time.perf_counter() - t0, functions=reports)
+
+
+def failing_cases(golden: str | tuple[dict, dict], func: str, rows) -> list[dict]:
+    """取出若干行的输入与参考结果（便于复现失败用例）。"""
+    _, data = load_golden(golden) if isinstance(golden, str) else golden
+    names, outputs, errors = FUNCTIONS[func]
+    cols = data[func]
+    out = []
+    for i in rows:
+        case = {k: cols[k][i].item() for k in names}
+        code = int(cols["err"][i])
+        case["expected"] = (
+            {k: float(cols["out"][j, i]) for j, k in enumerate(outputs)}
+            if code == 0
+            else {"error": errors[code] if 0 <= code < len(errors) else "未知错误"}
+        )
+        out.append(case)
+    return out
+
+
+def format_golden_report(report: GoldenReport) -> str:
+    lines = [
+        f"引擎：{report.engine}  rtol={report.rtol:g}  atol={report.atol:g}  "
+        f"共 {report.rows} 行，用时 {report.elapsed_s:.2f} s",
+        f"{'函数':<16}{'行数':>10}{'比对':>10}{'错误行':>8}{'失败':>8}{'标记':>8}{'最大绝对误差':>14}{'最大相对误差':>14}",
+    ]
+    for r in report.functions.values():
+        ma = max(r.max_abs.values(), default=0.0)
+        mr = max(r.max_rel.values(), default=0.0)
+        lines.append(
+            f"{r.func:<16}{r.rows:>10}{r.checked:>10}{r.error_rows:>8}{r.failed:>8}{r.flagged:>8}{ma:>14.3e}{mr:>14.3e}"
+        )
+        if r.failed:
+            lines.append(f"  失败行（前 {len(r.failing_rows)} 个）：{r.failing_rows}"
+                         + (f"，其中错误码不一致 {r.error_mismatch} 行" if r.error_mismatch else ""))
+    lines.append("结论：" + ("全部通过" if report.ok else "存在差异"))
+    return "\n".join(lines)
+
@@ -0,0 +1,216 @@
+"""冲刷深度对各输入的解析导数（雅可比矩阵），按批量向量化计算。
+
+    jac = d21_jacobian(H0=H0, d50=d50, U=U, L0=L0, B=B, theta_deg=theta, m=m,
+                       k1_type=0, uc_method=1, gamma_s=26.0, gamma_w=9.81)
+    jac.column("U")          # ∂hs/∂U，逐行
+    jac.data                 # (输入个数, 行数) 全部偏导数
+
+D.2.1 的 hs 为各因子的幂乘积，按对数求导：
+
+    ln hs = ln(2.80·k1) + 0.92·ln H0 + 0.08·ln L0 + 0.26·ln(θ/90) − 0.07·m
+            + 0.75·ln(Um − Uc) − 0.375·ln(g·d50)
+
+Uc 对 H0、d50、γs、γ 的偏导按所选方法（D.2.1-5 / D.2.1-6 / 手动输入）分别给出。
+D.2.2 中 η 为按 |α| 分段线性查表，在表格折点处不可导：导数取单侧值，
+`side="right"` 为 α 增大方向的导数（默认），`side="left"` 为 α 减小方向；
+处于折点的行在 `kink` 中标出。表格两端之外 η 为常数，导数为 0。
+
+导数单位为“hs 的米数 / 输入的单位”（θ、α 按度）。无效行（结果的 err 非 0）导数为 NaN；
+k1 类型、Uc 方法等类别输入没有导数。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from scour_batch import (
+    _as_float,
+    _require_numpy,
+    calc_d21_batch,
+    calc_d22_batch,
+    k1_codes,
+    uc_codes,
+)
+from scour_calc import ETA_TABLE, UcCode
+
+
+D21_WRT = ("H0", "d50", "U", "L0", "B", "theta_deg", "m", "gamma_s", "gamma_w", "uc_manual")
+D22_WRT = ("H0", "U", "Uc", "alpha_deg", "n")
+
+_SIDES = ("right", "left")
+
+
+@dataclass
+class Jacobian:
+    """hs 对各输入的偏导数。"""
+
+    result: object       # D21Batch / D22Batch：函数值
+    wrt: tuple[str, ...]
+    data: object         # (len(wrt), 行数)，data[i] 为 ∂hs/∂wrt[i]
+    kink: object         # (行数,) bool：该行处于分段函数折点，导数为单侧值
+    side: str = "right"
+
+    def __len__(self) -> int:
+        return int(self.data.shape[1])
+
+    def column(self, name: str):
+        """∂hs/∂name（零拷贝视图）。"""
+        try:
+            return self.data[self.wrt.index(name)]
+        except ValueError:
+            raise KeyError(f"没有对 {name} 的导数") from None
+
+    def gradient(self, i: int) -> dict[str, float]:
+        """第 i 行的梯度 {输入名: 偏导数}。"""
+        return {k: float(self.data[j, i]) for j, k in enumerate(self.wrt)}
+
+    def to_dict(self) -> dict:
+        return {f"d_{k}": self.data[j] for j, k in enumerate(self.wrt)}
+
+
+def eta_slope_batch(alpha_deg, *, side: str = "right"):
+    """表 D.2.2 η(α) 对 α 的单侧导数（每度）。
+
+    η 按 |α| 查表，故 α < 0 时符号相反，且 α 的右导数对应 |α| 的左导数。
+    """
+    np = _require_numpy()
+    if side not in _SIDES:
+        raise ValueError("side 应为 right 或 left")
+    alpha = np.asarray(alpha_deg, dtype=np.float64)
+    a = np.abs(alpha)
+    xs = np.array([p[0] for p in ETA_TABLE])
+    ys = np.array([p[1] for p in ETA_TABLE])
+    # 区间斜率：(-∞, x0)、[x0, x1)、……、[x_last, +∞)，两端之外为 0
+    slopes = np.concatenate([[0.0], np.diff(ys) / np.diff(xs), [0.0]])
+    right_a = slopes[np.searchsorted(xs, a, side="right")]
+    left_a = slopes[np.searchsorted(xs, a, side="left")]
+    pos = alpha >= 0
+    if side == "right":
+        return np.where(pos, right_a, -left_a)
+    return np.where(pos, left_a, -right_a)
+
+
+def eta_kink_batch(alpha_deg):
+    """|α| 是否恰好落在 η 表的折点上（左右导数不相等）。"""
+    np = _require_numpy()
+    a = np.abs(np.asarray(alpha_deg, dtype=np.float64))
+    return eta_slope_batch(a, side="right") != eta_slope_batch(a, side="left")
+
+
+def d21_jacobian(
+    *,
+    H0,
+    d50,
+    U,
+    L0,
+    B,
+    theta_deg,
+    m,
+    k1_type,
+    uc_method,
+    gamma_s=None,
+    gamma_w=None,
+    uc_manual=None,
+) -> Jacobian:
+    """D.2.1 hs 对 H0、d50、U、L0、B、θ、m、γs、γ、手动 Uc 的偏导数（参数同 `calc_d21_batch`）。
+
+    与所选 Uc 方法无关的输入导数为 0（如公式法下对手动 Uc、手动输入下对 γs/γ）。
+    """
+    np = _require_numpy()
+
+    k1c = k1_codes(k1_type)
+    ucc = uc_codes(uc_method)
+    arrays = np.broadcast_arrays(
+        _as_float(np, H0),
+        _as_float(np, d50),
+        _as_float(np, U),
+        _as_float(np, L0),
+        _as_float(np, B),
+        _as_float(np, theta_deg),
+        _as_float(np, m),
+        _as_float(np, gamma_s),
+        _as_float(np, gamma_w),
+        _as_float(np, uc_manual),
+        k1c,
+        ucc,
+    )
+    H0, d50, U, L0, B, theta, m, gs, gw, ucm, k1c, ucc = (a.ravel() for a in arrays)
+    res = calc_d21_batch(
+        H0=H0, d50=d50, U=U, L0=L0, B=B, theta_deg=theta, m=m,
+        k1_type=k1c, uc_method=ucc, gamma_s=gs, gamma_w=gw, uc_manual=ucm,
+    )
+    hs, Um, Uc = res.hs, res.Um, res.Uc
+    n = len(res)
+
+    zhang = ucc == UcCode.ZHANG
+    rubble = ucc == UcCode.RUBBLE
+    manual = ucc == UcCode.MANUAL
+    jac = np.empty((len(D21_WRT), n))
+    with np.errstate(all="ignore"):
+        a = 0.75 / (Um - Uc)
+        r = (gs - gw) / gw
+
+        # Uc 对 H0、d50、r=(γs−γ)/γ 的偏导
+        p = (H0 / d50) ** 0.14
+        S = 17.6 * r * d50 + 6.05e-7 * (10.0 + H0) / (d50 ** 1.72)
+        half_inv_sqrt = 0.5 / np.sqrt(S)
+        dUc_dH0 = np.where(
+            zhang,
+            Uc * 0.14 / H0 + p * 6.05e-7 / (d50 ** 1.72) * half_inv_sqrt,
+            np.where(rubble, Uc / (6.0 * H0), 0.0),
+        )
+        dUc_dd50 = np.where(
+            zhang,
+            -Uc * 0.14 / d50 + p * (17.6 * r - 1.72 * 6.05e-7 * (10.0 + H0) / (d50 ** 2.72)) * half_inv_sqrt,
+            np.where(rubble, Uc / (3.0 * d50), 0.0),
+        )
+        dUc_dr = np.where(zhang, p * 17.6 * d50 * half_inv_sqrt, np.where(rubble, Uc / (2.0 * r), 0.0))
+
+        jac[0] = hs * (0.92 / H0 - a * dUc_dH0)
+        jac[1] = hs * (-0.375 / d50 - a * dUc_dd50)
+        jac[2] = hs * a * (1.0 + 4.8 * L0 / B)
+        jac[3] = hs * (0.08 / L0 + a * 4.8 * U / B)
+        jac[4] = -hs * a * 4.8 * L0 * U / (B * B)
+        jac[5] = hs * 0.26 / theta
+        jac[6] = -0.07 * hs
+        jac[7] = np.where(manual, 0.0, -hs * a * dUc_dr / gw)
+        jac[8] = np.where(manual, 0.0, hs * a * dUc_dr * gs / (gw * gw))
+        jac[9] = np.where(manual, -hs * a, 0.0)
+
+    jac[:, res.err != 0] = np.nan
+    return Jacobian(result=res, wrt=D21_WRT, data=jac, kink=np.zeros(n, dtype=bool))
+
+
+def d22_jacobian(*, H0, U, Uc, alpha_deg, n, side: str = "right") -> Jacobian:
+    """D.2.2 hs 对 H0、U、Uc、α、n 的偏导数（参数同 `calc_d22_batch`）。
+
+    η 表折点处对 α 的导数按 `side` 取单侧值（见模块说明）。
+    """
+    np = _require_numpy()
+    if side not in _SIDES:
+        raise ValueError("side 应为 right 或 left")
+
+    arrays = np.broadcast_arrays(
+        _as_float(np, H0),
+        _as_float(np, U),
+        _as_float(np, Uc),
+        _as_float(np, alpha_deg),
+        _as_float(np, n),
+    )
+    H0, U, Uc, alpha, nn = (a.ravel() for a in arrays)
+    res = calc_d22_batch(H0=H0, U=U, Uc=Uc, alpha_deg=alpha, n=nn)
+    eta, Uep = res.eta, res.Uep
+
+    jac = np.empty((len(D22_WRT), len(res)))
+    with np.errstate(all="ignore"):
+        ratio = Uep / Uc
+        q = ratio ** nn
+        jac[0] = q - 1.0
+        jac[1] = H0 * nn * q / U
+        jac[2] = -H0 * nn * q / Uc
+        # Uep = U·2η/(1+η)，∂ln Uep/∂η = 1/(η(1+η))
+        jac[3] = H0 * nn * q * eta_slope_batch(alpha, side=side) / (eta * (1.0 + eta))
+        jac[4] = H0 * q * np.log(ratio)
+
+    jac[:, res.err != 0] = np.nan
+    return Jacobian(result=res, wrt=D22_WRT, data=jac, kink=eta_kink_batch(alpha), side=side)
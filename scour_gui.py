@@ -4,7 +4,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter import filedialog
 
-from scour_calc import calc_d21, calc_d22
+from scour_calc import K1_LABELS, UC_LABELS, K1Code, UcCode, calc_d22, k1_code, uc_code
+from scour_incremental import D21Evaluator
+from scour_pipeline import _to_category
 
 
 def _to_float(s: str) -> float:
@@ -17,6 +19,11 @@ def _to_float(s: str) -> float:
         raise ValueError(f"无法解析为数字：{s}") from e
 
 
+def _opt_float(s: str) -> float | None:
+    """可留空的数值（保存到工作区时使用）。"""
+    return None if str(s).strip() == "" else _to_float(s)
+
+
 def _fmt(x: float, nd: int = 6) -> str:
     try:
         if abs(x) >= 1e4 or (abs(x) > 0 and abs(x) < 1e-3):
@@ -33,8 +40,25 @@ class ScourApp(tk.Tk):
         self.minsize(920, 560)
 
         self._last_d21: dict | None = None
+        # 增量计算：只改一个参数时只重算受影响的中间量
+        self._d21_eval = D21Evaluator()
+        # 工程工作区（SQLite），打开后断面输入与结果可保存、再次载入
+        self._ws = None
 
+        self._build_menu()
         self._build_ui()
+        self.protocol("WM_DELETE_WINDOW", self.on_quit)
+
+    def _build_menu(self) -> None:
+        menubar = tk.Menu(self)
+        ws_menu = tk.Menu(menubar, tearoff=False)
+        ws_menu.add_command(label="打开/新建工作区…", command=self.on_open_workspace)
+        ws_menu.add_command(label="保存当前断面", command=self.on_save_section)
+        ws_menu.add_command(label="载入断面…", command=self.on_load_section)
+        ws_menu.add_separator()
+        ws_menu.add_command(label="关闭工作区", command=self.on_close_workspace)
+        menubar.add_cascade(label="工作区", menu=ws_menu)
+        self.config(menu=menubar)
 
     def _build_ui(self) -> None:
         self.columnconfigure(0, weight=1)
@@ -82,6 +106,8 @@ class ScourApp(tk.Tk):
         ttk.Label(left, text="输入参数", font=("Segoe UI", 10, "bold")).grid(row=r, column=0, columnspan=3, sticky="w", padx=6, pady=(6, 10))
         r += 1
 
+        add_row(r, "断面编号：", "section_id", "", "保存到工作区时使用")
+        r += 1
         add_row(r, "H0 (m)：", "H0", "3.0", "冲刷处水深")
         r += 1
         add_row(r, "d50 (m)：", "d50", "0.02", "床沙中值粒径")
@@ -98,16 +124,13 @@ class ScourApp(tk.Tk):
         r += 1
 
         ttk.Label(left, text="k1：").grid(row=r, column=0, sticky="e", padx=6, pady=4)
-        self.k1_type = tk.StringVar(value="弯曲河段凹岸单丁坝(k1=1.34)")
+        self.k1_type = tk.StringVar(value=K1_LABELS[K1Code.CONCAVE_BEND])
         self.k1_combo = ttk.Combobox(
             left,
             textvariable=self.k1_type,
             state="readonly",
             width=28,
-            values=[
-                "弯曲河段凹岸单丁坝(k1=1.34)",
-                "过渡段/顺直段单丁坝(k1=1.00)",
-            ],
+            values=list(K1_LABELS.values()),
         )
         self.k1_combo.grid(row=r, column=1, columnspan=2, sticky="w", padx=6, pady=4)
         r += 1
@@ -119,13 +142,13 @@ class ScourApp(tk.Tk):
         r += 1
 
         ttk.Label(left, text="Uc 取值：").grid(row=r, column=0, sticky="e", padx=6, pady=4)
-        self.uc_method = tk.StringVar(value="张瑞瑾公式(D.2.1-5)")
+        self.uc_method = tk.StringVar(value=UC_LABELS[UcCode.ZHANG])
         self.uc_combo = ttk.Combobox(
             left,
             textvariable=self.uc_method,
             state="readonly",
             width=28,
-            values=["张瑞瑾公式(D.2.1-5)", "卵石起动流速(D.2.1-6)", "手动输入"],
+            values=list(UC_LABELS.values()),
         )
         self.uc_combo.grid(row=r, column=1, columnspan=2, sticky="w", padx=6, pady=4)
         self.uc_combo.bind("<<ComboboxSelected>>", lambda _e: self._d21_toggle_uc_fields())
@@ -215,7 +238,7 @@ class ScourApp(tk.Tk):
 
     def _d21_toggle_uc_fields(self) -> None:
         method = self.uc_method.get().strip()
-        if method == "手动输入":
+        if method == UC_LABELS[UcCode.MANUAL]:
             self.ent_gamma_s.configure(state="disabled")
             self.ent_gamma_w.configure(state="disabled")
             self.ent_uc_manual.configure(state="normal")
@@ -264,6 +287,11 @@ class ScourApp(tk.Tk):
             messagebox.showerror("计算失败", str(e))
 
     def _calc_d21_from_ui(self):
+        inputs = self._d21_inputs_from_ui()
+        res = self._d21_eval.evaluate(**inputs)
+        return inputs, res
+
+    def _d21_inputs_from_ui(self) -> dict:
         H0 = _to_float(self.d21_vars["H0"].get())
         d50 = _to_float(self.d21_vars["d50"].get())
         U = _to_float(self.d21_vars["U"].get())
@@ -272,11 +300,12 @@ class ScourApp(tk.Tk):
         theta = _to_float(self.d21_vars["theta"].get())
         m = _to_float(self.d21_vars["m"].get())
 
-        k1_type = self.k1_type.get().strip()
-        uc_method = self.uc_method.get().strip()
+        # 显示文字只在界面层使用，传入核心计算前映射为编码
+        k1_type = k1_code(self.k1_type.get().strip())
+        uc_method = uc_code(self.uc_method.get().strip())
 
         gamma_s = gamma_w = uc_manual = None
-        if uc_method == "手动输入":
+        if uc_method is UcCode.MANUAL:
             uc_manual = _to_float(self.d21_vars["uc_manual"].get())
         else:
             gamma_s = _to_float(self.d21_vars["gamma_s"].get())
@@ -296,22 +325,7 @@ class ScourApp(tk.Tk):
             "gamma_w": gamma_w,
             "uc_manual": uc_manual,
         }
-
-        res = calc_d21(
-            H0=H0,
-            d50=d50,
-            U=U,
-            L0=L0,
-            B=B,
-            theta_deg=theta,
-            m=m,
-            k1_type=k1_type,  # type: ignore[arg-type]
-            uc_method=uc_method,  # type: ignore[arg-type]
-            gamma_s=gamma_s,
-            gamma_w=gamma_w,
-            uc_manual=uc_manual,
-        )
-        return inputs, res
+        return inputs
 
     def on_export_d21_word(self) -> None:
         try:
@@ -327,6 +341,7 @@ class ScourApp(tk.Tk):
             if not path:
                 return
             out_path = export_d21_docx(path=path, name=None, inputs=inputs, result=res)
+            self._record_report("d21", out_path)
             messagebox.showinfo("导出完成", f"已导出 Word: {out_path}")
         except ImportError as e:
             messagebox.showerror("缺少依赖", str(e))
@@ -393,12 +408,136 @@ class ScourApp(tk.Tk):
             if not path:
                 return
             out_path = export_d22_docx(path=path, name=None, inputs=inputs, result=res)
+            self._record_report("d22", out_path)
             messagebox.showinfo("导出完成", f"已导出 Word: {out_path}")
         except ImportError as e:
             messagebox.showerror("缺少依赖", str(e))
         except Exception as e:
             messagebox.showerror("导出失败", str(e))
 
+    # ---------------- 工程工作区 ----------------
+    def _update_title(self) -> None:
+        base = "冲刷深度计算器（D.2）"
+        self.title(base if self._ws is None else f"{base} - {self._ws.path}")
+
+    def _require_ws(self) -> bool:
+        if self._ws is None:
+            messagebox.showinfo("提示", "请先在“工作区”菜单中打开或新建工作区。")
+            return False
+        return True
+
+    def on_open_workspace(self) -> None:
+        path = filedialog.asksaveasfilename(
+            title="打开/新建工作区",
+            defaultextension=".sqlite",
+            filetypes=[("工作区", "*.sqlite"), ("所有文件", "*.*")],
+            confirmoverwrite=False,
+        )
+        if not path:
+            return
+        try:
+            from scour_workspace import Workspace
+
+            ws = Workspace(path)
+        except ImportError as e:
+            messagebox.showerror("缺少依赖", str(e))
+            return
+        except Exception as e:
+            messagebox.showerror("打开失败", str(e))
+            return
+        self.on_close_workspace()
+        self._ws = ws
+        self._update_title()
+        messagebox.showinfo("已打开", f"工作区共 {ws.count()} 个断面，其中 {ws.stale_count()} 个待计算。")
+
+    def on_close_workspace(self) -> None:
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+        self._update_title()
+
+    def on_quit(self) -> None:
+        self.on_close_workspace()
+        self.destroy()
+
+    def on_save_section(self) -> None:
+        """把两个标签页的当前输入作为一个断面保存到工作区，并计算 D.2.1 → D.2.2 包络。"""
+        if not self._require_ws():
+            return
+        try:
+            sid = self.d21_vars["section_id"].get().strip()
+            if not sid:
+                raise ValueError("请填写断面编号")
+            row = {"section_id": sid, **self._d21_inputs_from_ui()}
+            row["k1_type"] = int(row["k1_type"])
+            row["uc_method"] = int(row["uc_method"])
+            row["alpha_deg"] = _opt_float(self.d22_vars["alpha"].get())
+            row["n"] = _opt_float(self.d22_vars["n"].get())
+            self._ws.upsert_sections([row])
+            self._ws.recompute()
+            res = self._ws.result(sid)
+        except Exception as e:
+            messagebox.showerror("保存失败", str(e))
+            return
+        if res["error"]:
+            msg = f"已保存断面 {sid}。\n计算未完成：{res['error']}"
+        else:
+            msg = (
+                f"已保存断面 {sid}。\n"
+                f"hs(D.2.1) = {_fmt(res['hs_d21'], 6)} m\n"
+                f"hs(D.2.2) = {_fmt(res['hs_d22'], 6)} m\n"
+                f"包络 hs_max = {_fmt(res['hs_max'], 6)} m（{res['governing']} 控制）"
+            )
+        messagebox.showinfo("已保存", msg)
+
+    def on_load_section(self) -> None:
+        if not self._require_ws():
+            return
+        ids = self._ws.section_ids()
+        if not ids:
+            messagebox.showinfo("提示", "工作区中还没有断面。")
+            return
+        dlg = tk.Toplevel(self)
+        dlg.title("载入断面")
+        dlg.transient(self)
+        lb = tk.Listbox(dlg, height=min(20, len(ids)), width=32)
+        for sid in ids:
+            lb.insert("end", sid)
+        lb.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+
+        def load(_e=None) -> None:
+            sel = lb.curselection()
+            if sel:
+                self._fill_section(self._ws.section(ids[sel[0]]))
+            dlg.destroy()
+
+        lb.bind("<Double-Button-1>", load)
+        ttk.Button(dlg, text="载入", command=load).grid(row=1, column=0, pady=(0, 10))
+
+    def _fill_section(self, sec: dict) -> None:
+        """用工作区中的断面输入填写两个标签页。"""
+
+        def txt(v) -> str:
+            return "" if v is None else str(v)
+
+        self.d21_vars["section_id"].set(sec["section_id"])
+        for key, col in (("H0", "H0"), ("d50", "d50"), ("U", "U"), ("L0", "L0"), ("B", "B"),
+                         ("theta", "theta_deg"), ("m", "m"), ("gamma_s", "gamma_s"),
+                         ("gamma_w", "gamma_w"), ("uc_manual", "uc_manual")):
+            self.d21_vars[key].set(txt(sec[col]))
+        self.k1_type.set(K1_LABELS[k1_code(_to_category(sec["k1_type"]))])
+        self.uc_method.set(UC_LABELS[uc_code(_to_category(sec["uc_method"]))])
+        self._d21_toggle_uc_fields()
+        for key, col in (("H0", "H0"), ("U", "U"), ("alpha", "alpha_deg"), ("n", "n")):
+            self.d22_vars[key].set(txt(sec[col]))
+        self._set_text(self.d21_out, f"已载入断面 {sec['section_id']}，点击“计算 D.2.1”。\n")
+
+    def _record_report(self, kind: str, path: str) -> None:
+        """工作区已打开且断面已保存时，登记导出的计算书（输入改动后可查出过期的计算书）。"""
+        sid = self.d21_vars["section_id"].get().strip()
+        if self._ws is not None and sid and self._ws.section(sid) is not None:
+            self._ws.record_report(sid, kind, path)
+
 
 def main() -> None:
     try:
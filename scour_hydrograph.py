@@ -0,0 +1,193 @@
+"""洪水过程（水位/流速时间序列）冲刷包络。
+
+一次洪水中每个断面的 H0、U 随时间变化，设计校核需要整场洪水的最大冲刷深度。
+本模块按时间分块流式输入 (H0, U) 过程线，逐块向量化计算，只保留累积量：
+峰值 hs、峰现时刻及各阈值的超越历时，不保存逐时段结果。
+
+    acc = HydrographAccumulator("d21", dt=1.0, thresholds=[2.0, 4.0], d50=..., L0=..., ...)
+    for H0_blk, U_blk in blocks:          # 形状 (断面数, 本块时段数)
+        acc.feed(H0_blk, U_blk)
+    env = acc.result()
+
+D.2.1 中 Um ≤ Uc 的时段按“不产生冲刷”计 hs=0（D.2.2 中 hs 为负时同样计 0），
+其他输入错误的时段计入 `n_invalid`，不参与峰值与历时统计。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from scour_batch import _require_numpy, calc_d21_batch, calc_d22_batch, k1_codes, uc_codes
+
+
+# D.2.1 中 “Um 必须大于 Uc” 的错误码（见 scour_batch.D21_ERRORS）
+_D21_NO_SCOUR = 10
+
+_D21_STATIC = ("d50", "L0", "B", "theta_deg", "m", "k1_type", "uc_method", "gamma_s", "gamma_w", "uc_manual")
+_D22_STATIC = ("Uc", "alpha_deg", "n")
+
+
+@dataclass
+class HydrographEnvelope:
+    peak_hs: object          # (断面数,) 峰值冲刷深度，m；全部时段无效时为 NaN
+    peak_time: object        # (断面数,) 峰现时刻，t0 + 时段序号 × dt
+    peak_step: object        # (断面数,) 峰现时段序号（int64，无效为 -1）
+    thresholds: tuple[float, ...]
+    exceed_duration: object  # (断面数, 阈值数) hs 超过各阈值的累计历时（单位同 dt）
+    n_steps: int
+    n_invalid: object        # (断面数,) 输入无效的时段数
+    first_error: object      # (断面数,) 首个无效时段的错误码（0 表示没有）
+
+
+class HydrographAccumulator:
+    """按时间分块累积冲刷包络。
+
+    `kind` 为 "d21" 或 "d22"；其余关键字为不随时间变化的断面参数（标量或长度为断面数的数组）：
+    - d21：d50, L0, B, theta_deg, m, k1_type, uc_method, gamma_s, gamma_w, uc_manual
+    - d22：Uc, alpha_deg, n
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        *,
+        dt: float = 1.0,
+        t0: float = 0.0,
+        thresholds: Sequence[float] = (),
+        **params,
+    ) -> None:
+        np = _require_numpy()
+        if kind not in ("d21", "d22"):
+            raise ValueError(f"未知计算类型：{kind}")
+        if dt <= 0:
+            raise ValueError("dt 必须为正")
+        allowed = _D21_STATIC if kind == "d21" else _D22_STATIC
+        unknown = [k for k in params if k not in allowed]
+        if unknown:
+            raise TypeError(f"未知断面参数：{', '.join(unknown)}")
+
+        self.kind = kind
+        self.dt = float(dt)
+        self.t0 = float(t0)
+        self.thresholds = tuple(float(t) for t in thresholds)
+        # 类别参数先转为整数编码，避免每块重复查表
+        if "k1_type" in params:
+            params["k1_type"] = k1_codes(params["k1_type"])
+        if "uc_method" in params:
+            params["uc_method"] = uc_codes(params["uc_method"])
+        self._params = {k: (None if v is None else np.asarray(v)) for k, v in params.items()}
+        self._n_sections: int | None = None
+        self._step = 0
+        self._peak = self._peak_step = self._exceed = self._n_invalid = self._first_error = None
+
+    def _init_state(self, np, n: int) -> None:
+        self._n_sections = n
+        self._peak = np.full(n, -np.inf)
+        self._peak_step = np.full(n, -1, dtype=np.int64)
+        self._exceed = np.zeros((n, len(self.thresholds)), dtype=np.int64)
+        self._n_invalid = np.zeros(n, dtype=np.int64)
+        self._first_error = np.zeros(n, dtype=np.int8)
+        for k, v in self._params.items():
+            if v is not None and v.ndim > 0 and v.shape[0] != n:
+                raise ValueError(f"断面参数 {k} 的长度应为断面数 {n}")
+
+    def _section_param(self, name: str):
+        v = self._params.get(name)
+        if v is None or v.ndim == 0:
+            return v
+        return v[:, None]
+
+    def feed(self, H0, U) -> None:
+        """输入一块过程线：形状 (断面数, 时段数)；一维数组视为单个时段。"""
+        np = _require_numpy()
+        H0 = np.asarray(H0, dtype=np.float64)
+        U = np.asarray(U, dtype=np.float64)
+        if H0.ndim == 1:
+            H0 = H0[:, None]
+        if U.ndim == 1:
+            U = U[:, None]
+        H0, U = np.broadcast_arrays(H0, U)
+        n, k = H0.shape
+        if self._n_sections is None:
+            self._init_state(np, n)
+        elif n != self._n_sections:
+            raise ValueError(f"断面数应为 {self._n_sections}")
+        if k == 0:
+            return
+
+        static = {name: self._section_param(name) for name in self._params}
+        if self.kind == "d21":
+            res = calc_d21_batch(H0=H0, U=U, **static)
+            hs = res.hs.reshape(n, k)
+            err = res.err.reshape(n, k)
+            no_scour = err == _D21_NO_SCOUR
+            hs = np.where(no_scour, 0.0, hs)
+            err = np.where(no_scour, 0, err).astype(np.int8)
+        else:
+            res = calc_d22_batch(H0=H0, U=U, **static)
+            hs = np.maximum(res.hs_local.reshape(n, k), 0.0)
+            err = res.err.reshape(n, k)
+
+        valid = err == 0
+        hs_v = np.where(valid, hs, -np.inf)
+        j = np.argmax(hs_v, axis=1)
+        blk_max = hs_v[np.arange(n), j]
+        better = blk_max > self._peak
+        self._peak = np.where(better, blk_max, self._peak)
+        self._peak_step = np.where(better, self._step + j, self._peak_step)
+
+        for i, thr in enumerate(self.thresholds):
+            self._exceed[:, i] += np.count_nonzero(valid & (hs > thr), axis=1)
+
+        bad = ~valid
+        self._n_invalid += np.count_nonzero(bad, axis=1)
+        first_bad = np.argmax(bad, axis=1)
+        new_err = (self._first_error == 0) & bad.any(axis=1)
+        self._first_error = np.where(new_err, err[np.arange(n), first_bad], self._first_error).astype(np.int8)
+
+        self._step += k
+
+    def result(self) -> HydrographEnvelope:
+        np = _require_numpy()
+        if self._n_sections is None:
+            raise ValueError("尚未输入任何过程线")
+        has_peak = self._peak_step >= 0
+        return HydrographEnvelope(
+            peak_hs=np.where(has_peak, self._peak, np.nan),
+            peak_time=np.where(has_peak, self.t0 + self._peak_step * self.dt, np.nan),
+            peak_step=self._peak_step.copy(),
+            thresholds=self.thresholds,
+            exceed_duration=self._exceed * self.dt,
+            n_steps=self._step,
+            n_invalid=self._n_invalid.copy(),
+            first_error=self._first_error.copy(),
+        )
+
+
+def hydrograph_envelope(
+    kind: str,
+    blocks: Iterable[tuple[object, object]],
+    *,
+    dt: float = 1.0,
+    t0: float = 0.0,
+    thresholds: Sequence[float] = (),
+    **params,
+) -> HydrographEnvelope:
+    """对 (H0, U) 过程线分块迭代器求冲刷包络，见 `HydrographAccumulator`。"""
+    acc = HydrographAccumulator(kind, dt=dt, t0=t0, thresholds=thresholds, **params)
+    for H0, U in blocks:
+        acc.feed(H0, U)
+    return acc.result()
+
+
+def iter_time_blocks(H0, U, *, block_steps: int = 1440):
+    """把已在内存（或内存映射）中的 (断面数, 时段数) 过程线切成时间块。"""
+    np = _require_numpy()
+    if block_steps <= 0:
+        raise ValueError("block_steps 必须为正")
+    H0 = np.asarray(H0)
+    U = np.asarray(U)
+    total = H0.shape[1]
+    for s in range(0, total, block_steps):
+        yield H0[:, s:s + block_steps], U[:, s:s + block_steps]
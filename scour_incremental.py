@@ -0,0 +1,297 @@
+"""D.2.1 增量计算：记录输入与中间量的依赖关系，只重算受影响的节点。
+
+依赖关系（节点按计算顺序排列，与 `calc_d21` 的校验先后一致）：
+
+    base        <- H0, d50                       （H0、d50 校验）
+    k1          <- k1_type
+    k2          <- theta_deg
+    k3          <- m
+    Um          <- U, L0, B
+    Uc          <- uc_method, H0, d50, gamma_s, gamma_w, uc_manual
+    v_term      <- Um, Uc, d50
+    hs_over_H0  <- k1, k2, k3, v_term, L0, H0
+    hs          <- hs_over_H0, H0
+
+例如只改 θ 时仅重算 k2、hs_over_H0、hs；只改 B 时仅重算 Um、v_term、hs_over_H0、hs。
+
+    ev = D21Evaluator(**inputs)
+    ev.update(theta_deg=45)               # 交互修改：增量重算
+    batch = ev.variants(B=[80, 100, 120])  # “如果……会怎样”：只对受影响节点做向量化计算
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from scour_batch import (
+    D21Batch,
+    _as_float,
+    _flag,
+    _require_numpy,
+    k1_codes,
+    uc_codes,
+    uc_rubble_batch,
+    uc_zhang_batch,
+)
+from scour_calc import (
+    D21_VELOCITY_EXPONENT,
+    D21Result,
+    G,
+    K1_VALUES,
+    UcCode,
+    k1_from_type,
+    k2_from_theta,
+    k3_from_m,
+    uc_from_method,
+    um_from_u,
+    velocity_term,
+)
+
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    deps: tuple[str, ...]
+    scalar: Callable[[dict], object]
+    batch: Callable[..., object]
+
+
+class DependencyGraph:
+    """有向无环依赖图；`nodes` 须按拓扑顺序给出（依赖只能是输入或排在前面的节点）。"""
+
+    def __init__(self, inputs: Iterable[str], nodes: Iterable[Node]) -> None:
+        self.inputs = tuple(inputs)
+        self.nodes = tuple(nodes)
+        self.order = tuple(n.name for n in self.nodes)
+        self.by_name = {n.name: n for n in self.nodes}
+        known = set(self.inputs)
+        self._children: dict[str, list[str]] = {k: [] for k in (*self.inputs, *self.order)}
+        for n in self.nodes:
+            missing = [d for d in n.deps if d not in known]
+            if missing:
+                raise ValueError(f"节点 {n.name} 的依赖未定义或顺序不对：{', '.join(missing)}")
+            for d in n.deps:
+                self._children[d].append(n.name)
+            known.add(n.name)
+
+    def affected(self, changed: Iterable[str]) -> tuple[str, ...]:
+        """受 `changed`（输入或节点）影响的全部节点，按计算顺序返回。"""
+        seen: set[str] = set()
+        stack = list(changed)
+        while stack:
+            for child in self._children.get(stack.pop(), ()):
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return tuple(n for n in self.order if n in seen)
+
+
+# ---------------- 标量节点 ----------------
+def _s_base(v: dict) -> None:
+    if v["H0"] <= 0 or v["d50"] <= 0:
+        raise ValueError("H0 与 d50 必须为正")
+
+
+def _s_uc(v: dict) -> float:
+    return uc_from_method(
+        uc_method=v["uc_method"],
+        H0=v["H0"],
+        d50=v["d50"],
+        gamma_s=v["gamma_s"],
+        gamma_w=v["gamma_w"],
+        uc_manual=v["uc_manual"],
+    )
+
+
+def _s_hs_over_h0(v: dict) -> float:
+    return 2.80 * v["k1"] * v["k2"] * v["k3"] * (v["v_term"] ** D21_VELOCITY_EXPONENT) * ((v["L0"] / v["H0"]) ** 0.08)
+
+
+# ---------------- 向量化节点（无效行记错误码，码值同 scour_batch.D21_ERRORS） ----------------
+def _b_base(np, v, err):
+    _flag(np, err, ~((v["H0"] > 0) & (v["d50"] > 0)), 1)
+
+
+def _b_k1(np, v, err):
+    codes = k1_codes(v["k1_type"])
+    _flag(np, err, codes < 0, 2)
+    return np.take(np.asarray(K1_VALUES), np.clip(codes, 0, len(K1_VALUES) - 1))
+
+
+def _b_k2(np, v, err):
+    theta = _as_float(np, v["theta_deg"])
+    _flag(np, err, ~((theta > 0) & (theta <= 90)), 3)
+    return (theta / 90.0) ** 0.26
+
+
+def _b_k3(np, v, err):
+    m = _as_float(np, v["m"])
+    _flag(np, err, ~(m > 0), 4)
+    return np.exp(-0.07 * m)
+
+
+def _b_um(np, v, err):
+    U, L0, B = (_as_float(np, v[k]) for k in ("U", "L0", "B"))
+    _flag(np, err, ~((U > 0) & (L0 > 0) & (B > 0)), 5)
+    return (1.0 + 4.8 * (L0 / B)) * U
+
+
+def _b_uc(np, v, err):
+    ucc = uc_codes(v["uc_method"])
+    H0, d50, gs, gw, ucm = (_as_float(np, v[k]) for k in ("H0", "d50", "gamma_s", "gamma_w", "uc_manual"))
+    manual = ucc == UcCode.MANUAL
+    _flag(np, err, manual & ~(ucm > 0), 6)
+    _flag(np, err, ~manual & (np.isnan(gs) | np.isnan(gw)), 7)
+    _flag(np, err, ((ucc == UcCode.ZHANG) | (ucc == UcCode.RUBBLE)) & ~(gs > gw), 8)
+    _flag(np, err, ucc < 0, 9)
+    return np.where(
+        ucc == UcCode.ZHANG,
+        uc_zhang_batch(H0, d50, gs, gw),
+        np.where(ucc == UcCode.RUBBLE, uc_rubble_batch(H0, d50, gs, gw), ucm),
+    )
+
+
+def _b_v_term(np, v, err):
+    _flag(np, err, ~(np.asarray(v["Um"]) > v["Uc"]), 10)
+    return (v["Um"] - v["Uc"]) / np.sqrt(G * _as_float(np, v["d50"]))
+
+
+def _b_hs_over_h0(np, v, err):
+    L0, H0 = _as_float(np, v["L0"]), _as_float(np, v["H0"])
+    return 2.80 * v["k1"] * v["k2"] * v["k3"] * (v["v_term"] ** D21_VELOCITY_EXPONENT) * ((L0 / H0) ** 0.08)
+
+
+def _b_hs(np, v, err):
+    return v["hs_over_H0"] * _as_float(np, v["H0"])
+
+
+D21_INPUTS = ("H0", "d50", "U", "L0", "B", "theta_deg", "m", "k1_type", "uc_method", "gamma_s", "gamma_w", "uc_manual")
+D21_OPTIONAL = ("gamma_s", "gamma_w", "uc_manual")
+
+D21_GRAPH = DependencyGraph(
+    D21_INPUTS,
+    [
+        Node("base", ("H0", "d50"), _s_base, _b_base),
+        Node("k1", ("k1_type",), lambda v: k1_from_type(v["k1_type"]), _b_k1),
+        Node("k2", ("theta_deg",), lambda v: k2_from_theta(v["theta_deg"]), _b_k2),
+        Node("k3", ("m",), lambda v: k3_from_m(v["m"]), _b_k3),
+        Node("Um", ("U", "L0", "B"), lambda v: um_from_u(U=v["U"], L0=v["L0"], B=v["B"]), _b_um),
+        Node("Uc", ("uc_method", "H0", "d50", "gamma_s", "gamma_w", "uc_manual"), _s_uc, _b_uc),
+        Node("v_term", ("Um", "Uc", "d50"), lambda v: velocity_term(Um=v["Um"], Uc=v["Uc"], d50=v["d50"]), _b_v_term),
+        Node("hs_over_H0", ("k1", "k2", "k3", "v_term", "L0", "H0"), _s_hs_over_h0, _b_hs_over_h0),
+        Node("hs", ("hs_over_H0", "H0"), lambda v: v["hs_over_H0"] * v["H0"], _b_hs),
+    ],
+)
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+class D21Evaluator:
+    """D.2.1 增量计算器。
+
+    - `evaluate(**inputs)`：给出完整输入（同 `calc_d21` 的参数，可选项缺省为 None）；
+    - `update(**changes)`：只改部分输入；
+    两者都只重算受影响的节点并返回 `D21Result`，出错时抛出与 `calc_d21` 相同的 ValueError，
+    出错节点及其下游保持“待算”，下次修改后继续重算。
+    `recomputed` 记录最近一次实际重算的节点。
+    """
+
+    graph = D21_GRAPH
+
+    def __init__(self, **inputs) -> None:
+        self._values: dict[str, object] = {}
+        self._dirty: set[str] = set(self.graph.order)
+        self.recomputed: tuple[str, ...] = ()
+        if inputs:
+            self.evaluate(**inputs)
+
+    @property
+    def inputs(self) -> dict:
+        return {k: self._values[k] for k in self.graph.inputs if k in self._values}
+
+    def evaluate(self, **inputs) -> D21Result:
+        full = {k: None for k in D21_OPTIONAL}
+        full.update(inputs)
+        return self._apply(full)
+
+    def update(self, **changes) -> D21Result:
+        return self._apply(changes)
+
+    def _apply(self, changes: dict) -> D21Result:
+        unknown = [k for k in changes if k not in self.graph.inputs]
+        if unknown:
+            raise TypeError(f"未知输入：{', '.join(unknown)}")
+        merged = {**self._values, **changes}
+        missing = [k for k in self.graph.inputs if k not in merged]
+        if missing:
+            raise TypeError(f"缺少输入：{', '.join(missing)}")
+
+        changed = [k for k, v in changes.items() if k not in self._values or not _same(self._values[k], v)]
+        self._values.update(changes)
+        self._dirty.update(self.graph.affected(changed))
+        self._recompute()
+        return self.result
+
+    def _recompute(self) -> None:
+        done = []
+        try:
+            for name in self.graph.order:
+                if name in self._dirty:
+                    self._values[name] = self.graph.by_name[name].scalar(self._values)
+                    self._dirty.discard(name)
+                    done.append(name)
+        finally:
+            self.recomputed = tuple(done)
+
+    @property
+    def result(self) -> D21Result:
+        if self._dirty:
+            raise ValueError("当前输入未通过校验，没有有效结果")
+        return D21Result(*(self._values[k] for k in D21Result.__slots__))
+
+    def value(self, name: str):
+        """取输入或中间量（k1/k2/k3/Um/Uc/v_term/hs_over_H0/hs）的当前值。"""
+        if name in self._dirty:
+            raise ValueError(f"{name} 尚未算出（输入未通过校验）")
+        return self._values[name]
+
+    def variants(self, **columns) -> D21Batch:
+        """在当前输入基础上替换若干列（数组，按广播规则展开），批量求结果。
+
+        只对受这些列影响的节点做向量化计算，其余中间量直接复用当前值。
+        """
+        np = _require_numpy()
+        if not columns:
+            raise ValueError("至少需要替换一列")
+        unknown = [k for k in columns if k not in self.graph.inputs]
+        if unknown:
+            raise TypeError(f"未知输入：{', '.join(unknown)}")
+        affected = self.graph.affected(columns)
+        stale = [n for n in self._dirty if n not in affected]
+        if stale:
+            raise ValueError(f"当前输入未通过校验（{', '.join(sorted(stale))}），无法生成变体")
+
+        names = list(columns)
+        arrays = np.broadcast_arrays(*(np.asarray(columns[k]) if k in ("k1_type", "uc_method") else np.asarray(columns[k], dtype=np.float64) for k in names))
+        n = arrays[0].size
+        vals = dict(self._values)
+        for k, a in zip(names, arrays):
+            vals[k] = a.ravel()
+
+        err = np.zeros(n, dtype=np.int8)
+        with np.errstate(all="ignore"):
+            for name in affected:
+                vals[name] = self.graph.by_name[name].batch(np, vals, err)
+
+        out = D21Batch.empty(n)
+        for i, k in enumerate(D21Batch.FIELDS):
+            out.data[i] = vals[k]
+        out.data[:, err != 0] = np.nan
+        out.err = err
+        return out
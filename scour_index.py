@@ -0,0 +1,231 @@
+"""计算结果的索引与查询。
+
+对 `calc_d21_batch`/`calc_d22_batch` 的结果（及对应输入）按列建立排序索引，
+支持区间查询、多条件组合、Top-K 与分组最值（如“各河段最不利断面”）：
+
+    idx = ResultIndex.from_batch(batch, inputs)
+    rows = idx.query(hs__gt=4.0, theta_deg__lt=45.0)
+    worst = idx.top_by_group("reach", "hs")
+
+条件写法为 `列名__运算符=值`，运算符取 gt/ge/lt/le/eq。
+排序索引按需建立（首次查询该列时），建立后单次查询为 O(log n + 命中行数)；
+无效行（结果为 NaN）不会出现在任何区间查询结果中。
+"""
+
+from __future__ import annotations
+
+from typing import Mapping, Sequence
+
+from scour_batch import D22Batch, _require_numpy
+
+
+D21_INDEXED = ("hs", "hs_over_H0", "Uc", "Um", "H0", "d50", "U", "L0", "B", "theta_deg", "m")
+D22_INDEXED = ("hs_local", "Uep", "H0", "U", "Uc", "alpha_deg", "n")
+
+_OPS = ("gt", "ge", "lt", "le", "eq")
+
+
+class _SortedIndex:
+    __slots__ = ("order", "values", "valid")
+
+    def __init__(self, np, col) -> None:
+        col = np.asarray(col, dtype=np.float64)
+        dtype = np.int32 if col.shape[0] < 2**31 else np.int64
+        order = np.argsort(col, kind="stable").astype(dtype, copy=False)
+        self.order = order
+        self.values = col[order]
+        # argsort 把 NaN 排在末尾
+        self.valid = int(col.shape[0] - np.count_nonzero(np.isnan(col)))
+
+    def span(self, np, op: str, value: float) -> tuple[int, int]:
+        vals = self.values[: self.valid]
+        if op == "gt":
+            return int(np.searchsorted(vals, value, side="right")), self.valid
+        if op == "ge":
+            return int(np.searchsorted(vals, value, side="left")), self.valid
+        if op == "lt":
+            return 0, int(np.searchsorted(vals, value, side="left"))
+        if op == "le":
+            return 0, int(np.searchsorted(vals, value, side="right"))
+        return int(np.searchsorted(vals, value, side="left")), int(np.searchsorted(vals, value, side="right"))
+
+
+def _compare(np, col, op: str, value: float):
+    if op == "gt":
+        return col > value
+    if op == "ge":
+        return col >= value
+    if op == "lt":
+        return col < value
+    if op == "le":
+        return col <= value
+    return col == value
+
+
+def _parse_condition(key: str) -> tuple[str, str]:
+    name, sep, op = key.rpartition("__")
+    if not sep or op not in _OPS:
+        raise ValueError(f"查询条件格式应为 列名__gt/ge/lt/le/eq：{key}")
+    return name, op
+
+
+class ResultIndex:
+    """按列排序索引的结果表。
+
+    `columns` 为等长的一维列（数值列可参与区间查询，文字列可作分组键）；
+    `indexed` 为预先建立索引的列名，其余数值列在首次查询时建立。
+    """
+
+    def __init__(self, columns: Mapping[str, object], *, indexed: Sequence[str] = ()) -> None:
+        np = _require_numpy()
+        cols = {}
+        n = None
+        for k, v in columns.items():
+            arr = np.asarray(v)
+            if arr.ndim != 1:
+                raise ValueError(f"列 {k} 应为一维")
+            if n is None:
+                n = arr.shape[0]
+            elif arr.shape[0] != n:
+                raise ValueError(f"列 {k} 长度与其他列不一致")
+            cols[k] = arr
+        self.columns = cols
+        self.n = int(n or 0)
+        self._indexes: dict[str, _SortedIndex] = {}
+        for k in indexed:
+            if k in cols:
+                self.index(k)
+
+    @classmethod
+    def from_batch(cls, batch, inputs: Mapping[str, object] | None = None, *, extra: Mapping[str, object] | None = None, indexed: Sequence[str] | None = None) -> "ResultIndex":
+        """由批量结果与其输入构造；标量输入会广播到每一行。
+
+        `extra` 用于附加分组键等列（如断面编号、河段编号）。
+        """
+        np = _require_numpy()
+        n = len(batch)
+        cols: dict[str, object] = {}
+        items = [(k, np.asarray(v)) for k, v in (inputs or {}).items() if v is not None]
+        if items:
+            arrays = np.broadcast_arrays(*(a for _, a in items))
+            for (k, _), arr in zip(items, arrays):
+                cols[k] = np.broadcast_to(arr, (n,)) if arr.ndim == 0 else arr.ravel()
+        for k, v in (extra or {}).items():
+            cols[k] = np.asarray(v)
+        cols.update(batch.to_dict(include_errors=False))
+        cols["err"] = batch.err
+        if indexed is None:
+            indexed = D22_INDEXED if isinstance(batch, D22Batch) else D21_INDEXED
+        return cls(cols, indexed=indexed)
+
+    @classmethod
+    def from_store(cls, store, *, indexed: Sequence[str] | None = None) -> "ResultIndex":
+        """由 `scour_store.ResultStore` 构造：结果列零拷贝引用，扫描轴展开为输入列。"""
+        np = _require_numpy()
+        cols: dict[str, object] = {}
+        inputs = store.inputs_at(np.arange(store.filled, dtype=np.int64))
+        for name in store.axis_names:
+            cols[name] = inputs[name]
+        for name in store.batch_cls.FIELDS:
+            cols[name] = store.column(name)
+        cols["err"] = store.column("err")
+        if indexed is None:
+            indexed = D22_INDEXED if store.batch_cls is D22Batch else D21_INDEXED
+        return cls(cols, indexed=indexed)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def index(self, name: str) -> _SortedIndex:
+        """取得（必要时建立）某列的排序索引。"""
+        idx = self._indexes.get(name)
+        if idx is None:
+            np = _require_numpy()
+            col = self.columns.get(name)
+            if col is None:
+                raise KeyError(f"没有列：{name}")
+            if col.dtype.kind not in "fiu":
+                raise ValueError(f"列 {name} 不是数值列，不能建立排序索引")
+            idx = _SortedIndex(np, col)
+            self._indexes[name] = idx
+        return idx
+
+    # ---------------- 查询 ----------------
+    def range(self, name: str, lo: float | None = None, hi: float | None = None, *, inclusive: bool = True):
+        """单列区间查询，返回升序行号。"""
+        conds = {}
+        if lo is not None:
+            conds[f"{name}__{'ge' if inclusive else 'gt'}"] = lo
+        if hi is not None:
+            conds[f"{name}__{'le' if inclusive else 'lt'}"] = hi
+        if not conds:
+            conds[f"{name}__ge"] = float("-inf")
+        return self.query(**conds)
+
+    def query(self, **conditions: float):
+        """多条件（与）查询，返回满足全部条件的升序行号。
+
+        先用各列索引求出每个条件的命中区段，从最小的区段出发逐条过滤其余条件。
+        """
+        np = _require_numpy()
+        if not conditions:
+            return np.arange(self.n, dtype=np.int64)
+
+        spans = []
+        for key, value in conditions.items():
+            name, op = _parse_condition(key)
+            idx = self.index(name)
+            lo, hi = idx.span(np, op, float(value))
+            spans.append((max(hi - lo, 0), name, op, float(value), idx, lo, hi))
+        spans.sort(key=lambda s: s[0])
+
+        _, _, _, _, idx, lo, hi = spans[0]
+        rows = np.sort(idx.order[lo:hi]).astype(np.int64, copy=False)
+        for _, name, op, value, _, _, _ in spans[1:]:
+            if rows.size == 0:
+                break
+            rows = rows[_compare(np, self.columns[name][rows], op, value)]
+        return rows
+
+    def top_k(self, name: str, k: int, *, largest: bool = True, rows=None):
+        """按某列取前 k 行（默认最大者），返回按值排序的行号；NaN 行不参与。"""
+        np = _require_numpy()
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        if rows is None:
+            idx = self.index(name)
+            valid = idx.order[: idx.valid]
+            sel = valid[::-1][:k] if largest else valid[:k]
+            return sel.astype(np.int64)
+        rows = np.asarray(rows, dtype=np.int64)
+        vals = self.columns[name][rows]
+        keep = ~np.isnan(vals)
+        rows, vals = rows[keep], vals[keep]
+        if rows.size > k:
+            part = np.argpartition(-vals if largest else vals, k - 1)[:k]
+            rows, vals = rows[part], vals[part]
+        order = np.argsort(-vals if largest else vals, kind="stable")
+        return rows[order]
+
+    def top_by_group(self, group: str, name: str, *, largest: bool = True, rows=None) -> dict:
+        """分组最值：返回 {分组键: 行号}，每组取 `name` 最大（或最小）的一行。"""
+        np = _require_numpy()
+        if rows is None:
+            idx = self.index(name)
+            order = idx.order[: idx.valid]
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            vals = self.columns[name][rows]
+            rows = rows[~np.isnan(vals)]
+            order = rows[np.argsort(self.columns[name][rows], kind="stable")]
+        if largest:
+            order = order[::-1]
+        keys = self.columns[group][order]
+        uniq, first = np.unique(keys, return_index=True)
+        return {k.item() if hasattr(k, "item") else k: int(order[i]) for k, i in zip(uniq, first)}
+
+    def take(self, rows, names: Sequence[str] | None = None) -> dict:
+        """取若干行的指定列（默认全部列）。"""
+        np = _require_numpy()
+        rows = np.asarray(rows, dtype=np.int64)
+        return {k: self.columns[k][rows] for k in (names or self.columns)}
@@ -0,0 +1,336 @@
+"""丁坝布置多目标优化（NSGA-II）。
+
+在 L0、θ、m 等设计变量的取值范围内搜索 (hs, L0, 造价) 的 Pareto 前沿：
+冲刷深度越小越好，坝长默认越长越好（挑流、护岸范围大，可用 `l0_sense="min"` 改为越短越好），
+造价由调用方提供的向量化函数给出、越小越好。
+
+    def cost(cols):                      # cols 为 {参数名: 数组}（含固定参数与 hs），返回数组
+        return 1.2 * cols["L0"] * (1 + 0.4 * cols["m"])
+
+    front = optimize_layout(
+        bounds={"L0": (10, 60), "theta_deg": (30, 90), "m": (0.5, 3.0)},
+        fixed={"H0": 4.0, "d50": 0.02, "U": 2.0, "B": 150.0, "k1_type": 0,
+               "uc_method": 1, "gamma_s": 26.0, "gamma_w": 9.81},
+        cost=cost, population=200, generations=100, seed=1,
+    )
+    front.rows()
+
+整代种群一次调用 `calc_d21_batch` 批量计算；`processes > 1` 时按块分发到多进程
+（此时 `cost` 须为模块级函数，以便传给子进程）。
+变量范围按 `scour_sampling.INPUT_DOMAINS` 校验（θ ∈ (0, 90]、m > 0 等）；
+Um ≤ Uc 的方案按约束违反量 Uc − Um 处理（Deb 约束支配规则），不会进入可行前沿。
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Callable, Mapping
+
+from scour_batch import (
+    _as_float,
+    _require_numpy,
+    calc_d21_batch,
+    uc_codes,
+    uc_rubble_batch,
+    uc_zhang_batch,
+)
+from scour_calc import UcCode
+from scour_sampling import SampleSpace
+
+
+_D21_NO_SCOUR = 10
+_INVALID = 1e30          # 其他输入错误的约束违反量
+
+
+@dataclass
+class ParetoFront:
+    names: tuple[str, ...]          # 设计变量
+    objectives: tuple[str, ...]     # 目标名（"hs"、"L0"、"cost"）
+    senses: tuple[str, ...]         # 各目标 "min" / "max"
+    X: object                       # (方案数, 变量数)
+    F: object                       # (方案数, 目标数)，原始取值（未变号）
+    hs: object
+    n_evals: int
+    generations: int
+
+    def __len__(self) -> int:
+        return int(self.X.shape[0])
+
+    def rows(self) -> list[dict]:
+        """逐方案的 {变量..., 目标...}，按 hs 升序。"""
+        np = _require_numpy()
+        order = np.argsort(self.hs, kind="stable")
+        out = []
+        for i in order.tolist():
+            row = {k: float(self.X[i, j]) for j, k in enumerate(self.names)}
+            row.update({k: float(self.F[i, j]) for j, k in enumerate(self.objectives)})
+            out.append(row)
+        return out
+
+
+def _rows(np, v, n: int, mask):
+    if v is None:
+        return None
+    arr = np.asarray(v)
+    return arr[mask] if arr.ndim and arr.shape[0] == n else v
+
+
+def _um_uc_gap(np, cols):
+    """Um ≤ Uc 方案的约束违反量 Uc − Um（批量结果中这些行的 Um、Uc 已置 NaN，故单独重算）。"""
+    H0, d50, U, L0, B, gs, gw, ucm = (
+        _as_float(np, cols.get(k)) for k in ("H0", "d50", "U", "L0", "B", "gamma_s", "gamma_w", "uc_manual")
+    )
+    ucc = uc_codes(cols["uc_method"])
+    with np.errstate(all="ignore"):
+        Um = (1.0 + 4.8 * (L0 / B)) * U
+        Uc = np.where(
+            ucc == UcCode.ZHANG,
+            uc_zhang_batch(H0, d50, gs, gw),
+            np.where(ucc == UcCode.RUBBLE, uc_rubble_batch(H0, d50, gs, gw), ucm),
+        )
+    return np.maximum(Uc - Um, 0.0) + 1e-9
+
+
+def evaluate_designs(names, X, fixed: Mapping, cost: Callable | None = None):
+    """一批方案 (方案数, 变量数) -> (hs, 造价或 None, 约束违反量)；可行方案的违反量为 0。"""
+    np = _require_numpy()
+    n = X.shape[0]
+    cols = dict(fixed)
+    for j, k in enumerate(names):
+        cols[k] = X[:, j]
+    res = calc_d21_batch(**cols)
+
+    viol = np.where(res.err == 0, 0.0, _INVALID)
+    no_scour = res.err == _D21_NO_SCOUR
+    if no_scour.any():
+        viol[no_scour] = _um_uc_gap(np, {k: _rows(np, v, n, no_scour) for k, v in cols.items()})
+
+    c = None
+    if cost is not None:
+        num = {}
+        for k, v in cols.items():
+            arr = None if v is None else np.asarray(v)
+            if arr is not None and arr.dtype.kind in "fiu":
+                num[k] = np.broadcast_to(arr, (n,))
+        num["hs"] = res.hs
+        c = np.asarray(cost(num), dtype=np.float64)
+        if c.shape != (n,):
+            raise ValueError("cost 函数应返回与方案数等长的一维数组")
+    return res.hs, c, viol
+
+
+def _evaluate(names, X, fixed, cost, pool: ProcessPoolExecutor | None, processes: int):
+    """评价一批方案；`pool` 为整个优化过程共用的进程池（None 时在本进程计算）。"""
+    np = _require_numpy()
+    if pool is None:
+        return evaluate_designs(names, X, fixed, cost)
+    parts = np.array_split(X, processes)
+    outs = list(pool.map(evaluate_designs, [names] * len(parts), parts, [dict(fixed)] * len(parts), [cost] * len(parts)))
+    hs = np.concatenate([o[0] for o in outs])
+    c = None if cost is None else np.concatenate([o[1] for o in outs])
+    viol = np.concatenate([o[2] for o in outs])
+    return hs, c, viol
+
+
+# ---------------- NSGA-II ----------------
+# 分块计算支配关系时每块的元素上限（块行数 × 方案数）
+_DOMINANCE_BLOCK = 1 << 22
+
+
+def _dominance(np, F, viol, rows=slice(None)):
+    """D[i, j]：方案 i 约束支配方案 j（Deb 规则），只算 `rows` 所选的行。F 已统一为越小越好。
+
+    逐个目标累积比较，临时数组为 (块行数, 方案数)，不产生 (N, N, 目标数) 的三维数组。
+    """
+    Fi, vi = F[rows], viol[rows]
+    le = np.ones((Fi.shape[0], F.shape[0]), dtype=bool)
+    lt = np.zeros_like(le)
+    for k in range(F.shape[1]):
+        a, b = Fi[:, k, None], F[None, :, k]
+        le &= a <= b
+        lt |= a < b
+    fi = (vi == 0)[:, None]
+    fj = (viol == 0)[None, :]
+    return np.where(fi & fj, le & lt, np.where(fi, True, np.where(fj, False, vi[:, None] < viol[None, :])))
+
+
+def non_dominated_sort(F, viol=None):
+    """快速非支配排序，返回各方案的前沿序号（0 为第一前沿）。
+
+    支配矩阵按行分块计算并按位压缩保存（N² 位），种群上千时内存仍为几 MB。
+    """
+    np = _require_numpy()
+    F = np.asarray(F, dtype=np.float64)
+    n = F.shape[0]
+    viol = np.zeros(n) if viol is None else np.asarray(viol, dtype=np.float64)
+    block = max(1, _DOMINANCE_BLOCK // max(n, 1))
+    packed = np.empty((n, (n + 7) // 8), dtype=np.uint8)
+    count = np.zeros(n, dtype=np.int64)
+    for s in range(0, n, block):
+        D = _dominance(np, F, viol, slice(s, s + block))
+        count += D.sum(axis=0)
+        packed[s : s + block] = np.packbits(D, axis=1)
+    rank = np.full(n, -1, dtype=np.int64)
+    r = 0
+    remaining = np.ones(n, dtype=bool)
+    while remaining.any():
+        front = np.flatnonzero(remaining & (count == 0))
+        rank[front] = r
+        remaining[front] = False
+        for s in range(0, front.size, block):
+            rows = np.unpackbits(packed[front[s : s + block]], axis=1, count=n)
+            count -= rows.sum(axis=0, dtype=np.int64)
+        r += 1
+    return rank
+
+
+def crowding_distance(F, rank):
+    """同一前沿内的拥挤距离（边界方案为无穷大）。"""
+    np = _require_numpy()
+    n, m = F.shape
+    dist = np.zeros(n)
+    for r in np.unique(rank):
+        idx = np.flatnonzero(rank == r)
+        if idx.size <= 2:
+            dist[idx] = np.inf
+            continue
+        for k in range(m):
+            order = idx[np.argsort(F[idx, k], kind="stable")]
+            span = F[order[-1], k] - F[order[0], k]
+            dist[order[0]] = dist[order[-1]] = np.inf
+            if span > 0:
+                dist[order[1:-1]] += (F[order[2:], k] - F[order[:-2], k]) / span
+    return dist
+
+
+def _tournament(np, rng, rank, crowd, k: int):
+    a = rng.integers(0, rank.shape[0], k)
+    b = rng.integers(0, rank.shape[0], k)
+    better = (rank[a] < rank[b]) | ((rank[a] == rank[b]) & (crowd[a] > crowd[b]))
+    return np.where(better, a, b)
+
+
+def _sbx(np, rng, P1, P2, lo, hi, eta: float, prob: float):
+    """模拟二进制交叉（SBX）。"""
+    u = rng.random(P1.shape)
+    beta = np.where(u <= 0.5, (2 * u) ** (1 / (eta + 1)), (1 / (2 * (1 - u))) ** (1 / (eta + 1)))
+    do = (rng.random((P1.shape[0], 1)) < prob) & (rng.random(P1.shape) < 0.5)
+    c1 = np.where(do, 0.5 * ((1 + beta) * P1 + (1 - beta) * P2), P1)
+    c2 = np.where(do, 0.5 * ((1 - beta) * P1 + (1 + beta) * P2), P2)
+    return np.clip(c1, lo, hi), np.clip(c2, lo, hi)
+
+
+def _mutate(np, rng, X, lo, hi, eta: float, prob: float):
+    """多项式变异。"""
+    u = rng.random(X.shape)
+    span = hi - lo
+    d1 = (X - lo) / span
+    d2 = (hi - X) / span
+    mpow = 1 / (eta + 1)
+    dq = np.where(
+        u < 0.5,
+        (2 * u + (1 - 2 * u) * (1 - d1) ** (eta + 1)) ** mpow - 1,
+        1 - (2 * (1 - u) + 2 * (u - 0.5) * (1 - d2) ** (eta + 1)) ** mpow,
+    )
+    do = rng.random(X.shape) < prob
+    return np.clip(np.where(do, X + dq * span, X), lo, hi)
+
+
+def optimize_layout(
+    *,
+    bounds: Mapping[str, tuple[float, float]],
+    fixed: Mapping[str, object],
+    cost: Callable | None = None,
+    l0_sense: str = "max",
+    population: int = 100,
+    generations: int = 100,
+    crossover_eta: float = 15.0,
+    mutation_eta: float = 20.0,
+    crossover_prob: float = 0.9,
+    seed: int | None = None,
+    processes: int = 1,
+) -> ParetoFront:
+    """NSGA-II 搜索 (hs, L0[, 造价]) 的 Pareto 前沿。
+
+    `bounds` 为设计变量范围（通常为 L0、theta_deg、m）；L0 若不参与优化须在 `fixed` 中给定。
+    返回最终种群中的可行非支配方案。
+    """
+    np = _require_numpy()
+    if l0_sense not in ("min", "max"):
+        raise ValueError("l0_sense 应为 min 或 max")
+    if population < 4:
+        raise ValueError("population 至少为 4")
+    if generations < 0:
+        raise ValueError("generations 不能为负")
+    if "L0" not in bounds and "L0" not in fixed:
+        raise ValueError("L0 须作为设计变量或在固定参数中给定")
+    overlap = [k for k in bounds if k in fixed]
+    if overlap:
+        raise ValueError(f"参数既是设计变量又在固定参数中：{', '.join(overlap)}")
+
+    # 范围校验与初始种群（拉丁超立方）
+    space = SampleSpace(bounds, method="lhs", seed=seed)
+    names = space.names
+    lo = np.array([float(bounds[k][0]) for k in names])
+    hi = np.array([float(bounds[k][1]) for k in names])
+    rng = np.random.default_rng(seed)
+    init = space.sample(population)
+    X = np.stack([init[k] for k in names], axis=1)
+
+    objectives = ("hs", "L0") + (("cost",) if cost is not None else ())
+    senses = ("min", l0_sense) + (("min",) if cost is not None else ())
+    sign = np.array([1.0 if s == "min" else -1.0 for s in senses])
+
+    def objective_matrix(X, hs, c):
+        L0 = X[:, names.index("L0")] if "L0" in names else np.broadcast_to(float(fixed["L0"]), hs.shape)
+        cols = [hs, L0] + ([c] if c is not None else [])
+        F = np.stack(cols, axis=1)
+        return np.where(np.isnan(F), np.inf, F)
+
+    # 进程池在各代之间复用，避免每代重新启动子进程
+    with ProcessPoolExecutor(max_workers=processes) if processes > 1 else nullcontext() as pool:
+        hs, c, viol = _evaluate(names, X, fixed, cost, pool, processes)
+        F = objective_matrix(X, hs, c)
+        n_evals = population
+        rank = non_dominated_sort(F * sign, viol)
+        crowd = crowding_distance(F * sign, rank)
+
+        for _ in range(generations):
+            pa = _tournament(np, rng, rank, crowd, population)
+            pb = _tournament(np, rng, rank, crowd, population)
+            c1, c2 = _sbx(np, rng, X[pa], X[pb], lo, hi, crossover_eta, crossover_prob)
+            kids = np.concatenate([c1, c2])[:population]
+            kids = _mutate(np, rng, kids, lo, hi, mutation_eta, 1.0 / len(names))
+
+            khs, kc, kviol = _evaluate(names, kids, fixed, cost, pool, processes)
+            n_evals += kids.shape[0]
+            X = np.concatenate([X, kids])
+            hs = np.concatenate([hs, khs])
+            c = None if cost is None else np.concatenate([c, kc])
+            viol = np.concatenate([viol, kviol])
+            F = objective_matrix(X, hs, c)
+
+            # 环境选择：按前沿序号逐层取，最后一层按拥挤距离截断
+            rank = non_dominated_sort(F * sign, viol)
+            crowd = crowding_distance(F * sign, rank)
+            keep = np.lexsort((-crowd, rank))[:population]
+            X, hs, viol, F = X[keep], hs[keep], viol[keep], F[keep]
+            c = None if c is None else c[keep]
+            rank, crowd = rank[keep], crowd[keep]
+
+    best = (rank == 0) & (viol == 0)
+    # 去掉重复方案
+    _, first = np.unique(np.round(X[best], 12), axis=0, return_index=True)
+    sel = np.flatnonzero(best)[np.sort(first)]
+    return ParetoFront(
+        names=names,
+        objectives=objectives,
+        senses=senses,
+        X=X[sel],
+        F=F[sel],
+        hs=hs[sel],
+        n_evals=n_evals,
+        generations=generations,
+    )
@@ -0,0 +1,320 @@
+"""河段批量流水线：D.2.1 丁坝一般冲刷 → D.2.2 护岸局部冲刷。
+
+相当于对整张断面表逐块执行桌面版的“计算 D.2.1 → 从 D.2.1 带入 → 计算 D.2.2”：
+每个断面的 H0、U 与 D.2.1 算得的 Uc 直接作为 D.2.2 的输入（同一组数组，不重复计算），
+输出逐断面包络：两种冲刷深度、较大值及控制工况（任一式失败时较大值与控制工况为空）。
+
+断面表列名（CSV 表头或 dict 键）：
+    section_id, H0, d50, U, L0, B, theta_deg, m, k1_type, uc_method,
+    gamma_s, gamma_w, uc_manual, alpha_deg, n
+缺省列可由 `defaults` 统一给定（如全河段相同的 γs、γ、n）。
+`k1_type`/`uc_method` 列可填显示文字或整数编码（见 `scour_calc.K1Code`/`UcCode`）。
+"""
+
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator, Mapping
+
+from scour_batch import (
+    D21Batch,
+    D21UcCompareBatch,
+    D22Batch,
+    _require_numpy,
+    calc_d21_all_uc_batch,
+    calc_d21_batch,
+    calc_d22_batch,
+)
+from scour_calc import UC_LABELS
+
+
+SECTION_COLUMNS = (
+    "section_id",
+    "H0",
+    "d50",
+    "U",
+    "L0",
+    "B",
+    "theta_deg",
+    "m",
+    "k1_type",
+    "uc_method",
+    "gamma_s",
+    "gamma_w",
+    "uc_manual",
+    "alpha_deg",
+    "n",
+)
+_TEXT_COLUMNS = ("section_id", "k1_type", "uc_method")
+_NUMERIC_COLUMNS = tuple(c for c in SECTION_COLUMNS if c not in _TEXT_COLUMNS)
+
+ENVELOPE_COLUMNS = (
+    "section_id",
+    "H0",
+    "U",
+    "Uc",
+    "Um",
+    "k1",
+    "k2",
+    "k3",
+    "hs_over_H0",
+    "hs_d21",
+    "eta",
+    "Uep",
+    "hs_d22",
+    "hs_max",
+    "governing",
+    "error",
+)
+
+# 各 Uc 取值方法对比表：断面编号 + D21UcCompareBatch 各列 + 控制方法 + 各方法错误
+UC_COMPARE_COLUMNS = (
+    "section_id",
+    *D21UcCompareBatch.FIELDS,
+    "governing",
+    *(f"error_{c.name.lower()}" for c in D21UcCompareBatch.METHODS),
+)
+
+
+@dataclass
+class ReachChunk:
+    """一块断面的流水线结果。"""
+
+    section_id: list
+    H0: object
+    U: object
+    d21: D21Batch
+    d22: D22Batch
+    hs_max: object
+    governing: list[str]
+    errors: list[str]
+
+    def __len__(self) -> int:
+        return len(self.section_id)
+
+    def columns(self) -> dict:
+        """包络表各列（数值列为 NumPy 数组）。"""
+        return {
+            "section_id": self.section_id,
+            "H0": self.H0,
+            "U": self.U,
+            "Uc": self.d21.Uc,
+            "Um": self.d21.Um,
+            "k1": self.d21.k1,
+            "k2": self.d21.k2,
+            "k3": self.d21.k3,
+            "hs_over_H0": self.d21.hs_over_H0,
+            "hs_d21": self.d21.hs,
+            "eta": self.d22.eta,
+            "Uep": self.d22.Uep,
+            "hs_d22": self.d22.hs_local,
+            "hs_max": self.hs_max,
+            "governing": self.governing,
+            "error": self.errors,
+        }
+
+    def rows(self) -> Iterator[dict]:
+        cols = self.columns()
+        for i in range(len(self)):
+            yield {k: cols[k][i] for k in ENVELOPE_COLUMNS}
+
+
+def _to_number(v):
+    if v is None:
+        return None
+    if isinstance(v, str):
+        s = v.strip().replace(",", "")
+        return None if s == "" else float(s)
+    return float(v)
+
+
+def _to_category(v):
+    """类别列：整数编码（含 CSV 中的数字文本）转为 int，其余原样交给核心查表。"""
+    if isinstance(v, str) and v.strip().isdigit():
+        return int(v.strip())
+    return v
+
+
+def _columns_from_rows(np, rows: list[Mapping], defaults: Mapping) -> dict:
+    cols: dict[str, object] = {}
+    for k in _TEXT_COLUMNS:
+        cols[k] = [r.get(k) if r.get(k) not in (None, "") else defaults.get(k) for r in rows]
+    for k in ("k1_type", "uc_method"):
+        cols[k] = [_to_category(v) for v in cols[k]]
+    for k in _NUMERIC_COLUMNS:
+        vals = []
+        for r in rows:
+            v = _to_number(r.get(k))
+            if v is None:
+                v = _to_number(defaults.get(k))
+            vals.append(np.nan if v is None else v)
+        cols[k] = np.asarray(vals, dtype=np.float64)
+    return cols
+
+
+def evaluate_sections(cols: Mapping[str, object]) -> ReachChunk:
+    """对一块断面（列式输入）执行 D.2.1 → D.2.2。"""
+    np = _require_numpy()
+    H0 = np.asarray(cols["H0"], dtype=np.float64)
+    U = np.asarray(cols["U"], dtype=np.float64)
+    d21 = calc_d21_batch(
+        H0=H0,
+        d50=cols["d50"],
+        U=U,
+        L0=cols["L0"],
+        B=cols["B"],
+        theta_deg=cols["theta_deg"],
+        m=cols["m"],
+        k1_type=cols["k1_type"],
+        uc_method=cols["uc_method"],
+        gamma_s=cols.get("gamma_s"),
+        gamma_w=cols.get("gamma_w"),
+        uc_manual=cols.get("uc_manual"),
+    )
+    # D.2.1 的 H0、U、Uc 直接带入 D.2.2（D.2.1 失败的断面 Uc 为 NaN，D.2.2 随之记为错误）
+    d22 = calc_d22_batch(H0=H0, U=U, Uc=d21.Uc, alpha_deg=cols["alpha_deg"], n=cols["n"])
+
+    # 包络只在两式都算出时成立；D.2.2 失败时若只取 D.2.1，较大值会被低估却看似有效
+    ok = d21.ok & d22.ok
+    hs_max = np.where(ok, np.maximum(d21.hs, d22.hs_local), np.nan)
+    governing = np.where(~ok, "", np.where(d22.hs_local > d21.hs, "D.2.2", "D.2.1")).tolist()
+
+    err21 = d21.errors()
+    err22 = d22.errors()
+    errors = []
+    for i in range(len(d21)):
+        if err21[i]:
+            errors.append(f"D.2.1：{err21[i]}")
+        elif err22[i]:
+            errors.append(f"D.2.2：{err22[i]}")
+        else:
+            errors.append("")
+
+    sid = cols.get("section_id")
+    if sid is None:
+        sid = [str(i + 1) for i in range(len(d21))]
+    return ReachChunk(
+        section_id=list(sid),
+        H0=H0,
+        U=U,
+        d21=d21,
+        d22=d22,
+        hs_max=hs_max,
+        governing=governing,
+        errors=errors,
+    )
+
+
+def run_reach_pipeline(
+    sections: Iterable[Mapping],
+    *,
+    defaults: Mapping | None = None,
+    chunk_size: int = 10000,
+) -> Iterator[ReachChunk]:
+    """流式处理断面表：每累计 `chunk_size` 个断面做一次向量化计算并产出结果块。"""
+    np = _require_numpy()
+    if chunk_size <= 0:
+        raise ValueError("chunk_size 必须为正")
+    defaults = dict(defaults or {})
+    buf: list[Mapping] = []
+    for row in sections:
+        buf.append(row)
+        if len(buf) >= chunk_size:
+            yield evaluate_sections(_columns_from_rows(np, buf, defaults))
+            buf = []
+    if buf:
+        yield evaluate_sections(_columns_from_rows(np, buf, defaults))
+
+
+def read_sections_csv(f: IO[str]) -> Iterator[dict]:
+    """逐行读取断面表 CSV（首行为表头，支持带 BOM 的 UTF-8）。"""
+    reader = csv.DictReader(f)
+    if reader.fieldnames:
+        reader.fieldnames = [h.strip().lstrip("\ufeff") for h in reader.fieldnames]
+    for row in reader:
+        yield row
+
+
+def _fmt_cell(v) -> str:
+    if isinstance(v, str):
+        return v
+    try:
+        x = float(v)
+    except (TypeError, ValueError):
+        return "" if v is None else str(v)
+    return "" if x != x else repr(x)
+
+
+def write_envelope_csv(chunks: Iterable[ReachChunk], f: IO[str]) -> int:
+    """把流水线结果逐块写为 CSV，返回写入的断面数。"""
+    writer = csv.writer(f)
+    writer.writerow(ENVELOPE_COLUMNS)
+    n = 0
+    for chunk in chunks:
+        for row in chunk.rows():
+            writer.writerow([_fmt_cell(row[k]) for k in ENVELOPE_COLUMNS])
+        n += len(chunk)
+    return n
+
+
+def run_uc_comparison(
+    sections: Iterable[Mapping],
+    *,
+    defaults: Mapping | None = None,
+    chunk_size: int = 10000,
+) -> Iterator[tuple[list, D21UcCompareBatch]]:
+    """流式计算断面表在全部 Uc 取值方法下的 D.2.1 结果，逐块产出 (断面编号, 宽表结果)。
+
+    断面表的 `uc_method` 列不起作用；未给 γs/γ 或手动 Uc 的断面，对应方法各列为空。
+    未填断面编号的行编号为 None（写出时为空，与包络输出一致）。
+    """
+    np = _require_numpy()
+    if chunk_size <= 0:
+        raise ValueError("chunk_size 必须为正")
+    defaults = dict(defaults or {})
+
+    def run(buf):
+        cols = _columns_from_rows(np, buf, defaults)
+        res = calc_d21_all_uc_batch(
+            H0=cols["H0"],
+            d50=cols["d50"],
+            U=cols["U"],
+            L0=cols["L0"],
+            B=cols["B"],
+            theta_deg=cols["theta_deg"],
+            m=cols["m"],
+            k1_type=cols["k1_type"],
+            gamma_s=cols["gamma_s"],
+            gamma_w=cols["gamma_w"],
+            uc_manual=cols["uc_manual"],
+        )
+        return list(cols["section_id"]), res
+
+    buf: list[Mapping] = []
+    for row in sections:
+        buf.append(row)
+        if len(buf) >= chunk_size:
+            yield run(buf)
+            buf = []
+    if buf:
+        yield run(buf)
+
+
+def write_uc_compare_csv(chunks: Iterable[tuple[list, D21UcCompareBatch]], f: IO[str]) -> int:
+    """把各 Uc 方法对比结果逐块写为 CSV（控制方法写显示文字），返回写入的断面数。"""
+    writer = csv.writer(f)
+    writer.writerow(UC_COMPARE_COLUMNS)
+    n = 0
+    for sid, res in chunks:
+        cols = res.to_dict(include_errors=False)
+        governing = [UC_LABELS.get(int(c), "") for c in res.governing()]
+        errs = [res.method_errors(c) for c in res.METHODS]
+        for i in range(len(res)):
+            row = [_fmt_cell(sid[i])]
+            row += [_fmt_cell(cols[k][i]) for k in res.FIELDS]
+            row.append(governing[i])
+            row += [e[i] for e in errs]
+            writer.writerow(row)
+        n += len(res)
+    return n
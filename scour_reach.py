@@ -0,0 +1,224 @@
+"""沿河段纵剖面（按桩号）流式计算建筑物冲刷包络。
+
+输入为两张表：
+
+- 纵剖面：每隔数米一个测点，列 `chainage, H0, U, B, d50`，按桩号递增排列，可长达数十万行；
+- 建筑物表：丁坝、护岸所在桩号及其参数，列为 `structure_id, chainage` 加断面表中除
+  H0、U、B、d50 以外的列（L0、theta_deg、m、k1_type、uc_method、gamma_s、gamma_w、uc_manual、
+  alpha_deg、n），行数少，整表读入后按桩号排序。
+
+纵剖面分块读取，与排好序的建筑物桩号做归并：每读入一块测点，就对落在该块（及上一块末点）
+桩号范围内的建筑物线性插值出 H0、U、B、d50，凑满 `chunk_size` 个建筑物即按
+`scour_pipeline.evaluate_sections` 批量计算 D.2.1 → D.2.2 并产出结果块。内存只与块大小和
+建筑物数有关，与纵剖面长度无关。
+
+桩号超出纵剖面范围的建筑物不外推，该行记错误“桩号超出纵剖面范围”。
+
+    with open("纵剖面.csv", encoding="utf-8-sig", newline="") as fp, open("建筑物.csv", ...) as fs:
+        chunks = run_reach_profile(read_sections_csv(fp), read_sections_csv(fs), defaults={"n": 0.25})
+        write_reach_csv(chunks, out)
+"""
+
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator, Mapping
+
+from scour_batch import _require_numpy
+from scour_pipeline import (
+    ENVELOPE_COLUMNS,
+    ReachChunk,
+    _columns_from_rows,
+    _fmt_cell,
+    _to_number,
+    evaluate_sections,
+)
+
+
+PROFILE_COLUMNS = ("H0", "U", "B", "d50")
+REACH_COLUMNS = ("chainage", *ENVELOPE_COLUMNS)
+OUT_OF_RANGE = "桩号超出纵剖面范围"
+
+
+@dataclass
+class StructureChunk(ReachChunk):
+    """一块建筑物（按桩号递增）的计算结果；`section_id` 为建筑物编号。"""
+
+    chainage: object = None
+
+    def columns(self) -> dict:
+        return {"chainage": self.chainage, **super().columns()}
+
+    def rows(self) -> Iterator[dict]:
+        cols = self.columns()
+        for i in range(len(self)):
+            yield {k: cols[k][i] for k in REACH_COLUMNS}
+
+
+def iter_profile_chunks(rows: Iterable[Mapping], *, chunk_rows: int = 1 << 16) -> Iterator[tuple[object, dict]]:
+    """把纵剖面测点逐块转为 (桩号数组, {H0/U/B/d50: 数组})；桩号须非递减，空值为 NaN。"""
+    np = _require_numpy()
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows 必须为正")
+    last = -np.inf
+    n = 0
+    buf: list[Mapping] = []
+
+    def flush():
+        nonlocal last
+        x = np.asarray([_to_number(r.get("chainage")) for r in buf], dtype=np.float64)
+        bad = np.flatnonzero(~(np.diff(x, prepend=last) >= 0))
+        if bad.size:
+            raise ValueError(f"纵剖面第 {n - len(buf) + int(bad[0]) + 1} 个测点桩号缺失或小于前一测点（须按桩号递增排列）")
+        cols = {}
+        for k in PROFILE_COLUMNS:
+            vals = [_to_number(r.get(k)) for r in buf]
+            cols[k] = np.asarray([np.nan if v is None else v for v in vals], dtype=np.float64)
+        last = x[-1]
+        return x, cols
+
+    for row in rows:
+        buf.append(row)
+        n += 1
+        if len(buf) >= chunk_rows:
+            yield flush()
+            buf = []
+    if buf:
+        yield flush()
+
+
+def interpolate_profile(
+    chunks: Iterable[tuple[object, dict]],
+    stations,
+) -> Iterator[tuple[int, int, dict, bool]]:
+    """在递增的桩号 `stations` 处对分块纵剖面线性插值。
+
+    按桩号顺序产出 (起, 止, {H0/U/B/d50: 数组}, 是否在纵剖面范围内)，覆盖 `stations[起:止]`；
+    范围外的各值为 NaN。每块只保留上一块末点用于跨块插值。同一桩号有多个测点
+    （如堰、跌坎处水力参数突变）时，上游侧按第一个测点插值，该桩号及下游侧按最后一个，
+    结果与分块位置无关。
+    """
+    np = _require_numpy()
+    stations = np.asarray(stations, dtype=np.float64)
+    if np.any(np.diff(stations) < 0):
+        raise ValueError("建筑物桩号须按递增顺序给出")
+    n = stations.shape[0]
+
+    def outside(lo: int, hi: int):
+        return lo, hi, {k: np.full(hi - lo, np.nan) for k in PROFILE_COLUMNS}, False
+
+    j = 0
+    prev = None
+    for x, cols in chunks:
+        if x.shape[0] == 0:
+            continue
+        if prev is None:
+            k = int(np.searchsorted(stations, x[0], side="left"))
+            if k > j:
+                yield outside(j, k)
+                j = k
+        else:
+            x = np.concatenate(([prev[0]], x))
+            cols = {c: np.concatenate(([prev[1][c]], cols[c])) for c in PROFILE_COLUMNS}
+        # 恰在本块末点桩号上的建筑物留到下一块（下一块可能还有同桩号测点）
+        k = int(np.searchsorted(stations, x[-1], side="left"))
+        if k > j:
+            s = stations[j:k]
+            # 所在区间按 side="right" 查找：重复桩号处落到最后一个测点之后的区间
+            i = np.searchsorted(x, s, side="right")
+            x0, x1 = x[i - 1], x[i]
+            t = (s - x0) / (x1 - x0)
+            yield j, k, {c: cols[c][i - 1] + t * (cols[c][i] - cols[c][i - 1]) for c in PROFILE_COLUMNS}, True
+            j = k
+        prev = (x[-1], {c: cols[c][-1] for c in PROFILE_COLUMNS})
+    if prev is not None:
+        k = int(np.searchsorted(stations, prev[0], side="right"))
+        if k > j:
+            yield j, k, {c: np.full(k - j, prev[1][c]) for c in PROFILE_COLUMNS}, True
+            j = k
+    if j < n:
+        yield outside(j, n)
+
+
+def run_reach_profile(
+    profile: Iterable[Mapping],
+    structures: Iterable[Mapping],
+    *,
+    defaults: Mapping | None = None,
+    chunk_size: int = 10000,
+    profile_chunk_rows: int = 1 << 16,
+) -> Iterator[StructureChunk]:
+    """流式读取纵剖面，在各建筑物桩号处插值并批量计算，按桩号顺序产出结果块。"""
+    np = _require_numpy()
+    if chunk_size <= 0:
+        raise ValueError("chunk_size 必须为正")
+    defaults = dict(defaults or {})
+
+    rows = list(structures)
+    chainage = []
+    for i, r in enumerate(rows):
+        c = _to_number(r.get("chainage"))
+        if c is None or c != c:
+            raise ValueError(f"第 {i + 1} 个建筑物缺少桩号")
+        chainage.append(c)
+    order = np.argsort(np.asarray(chainage, dtype=np.float64), kind="stable")
+    rows = [rows[i] for i in order]
+    stations = np.asarray(chainage, dtype=np.float64)[order]
+    for i, r in enumerate(rows):
+        if r.get("structure_id") not in (None, ""):
+            r = {**r, "section_id": r["structure_id"]}
+        elif r.get("section_id") in (None, ""):
+            r = {**r, "section_id": str(int(order[i]) + 1)}
+        rows[i] = r
+
+    pending: list[tuple[int, int, dict, bool]] = []
+    n_pending = 0
+
+    def evaluate(pieces) -> StructureChunk:
+        lo, hi = pieces[0][0], pieces[-1][1]
+        cols = _columns_from_rows(np, rows[lo:hi], defaults)
+        for c in PROFILE_COLUMNS:
+            cols[c] = np.concatenate([p[2][c] for p in pieces])
+        inside = np.concatenate([np.full(p[1] - p[0], p[3]) for p in pieces])
+        res = evaluate_sections(cols)
+        errors = [e if ok else OUT_OF_RANGE for e, ok in zip(res.errors, inside)]
+        return StructureChunk(
+            section_id=res.section_id,
+            H0=res.H0,
+            U=res.U,
+            d21=res.d21,
+            d22=res.d22,
+            hs_max=res.hs_max,
+            governing=res.governing,
+            errors=errors,
+            chainage=stations[lo:hi],
+        )
+
+    for lo, hi, vals, inside in interpolate_profile(
+        iter_profile_chunks(profile, chunk_rows=profile_chunk_rows), stations
+    ):
+        # 拆成不跨越 chunk_size 边界的片段，使每块正好 chunk_size 个建筑物
+        while lo < hi:
+            take = min(hi - lo, chunk_size - n_pending)
+            pending.append((lo, lo + take, {c: v[: take] for c, v in vals.items()}, inside))
+            vals = {c: v[take:] for c, v in vals.items()}
+            lo += take
+            n_pending += take
+            if n_pending == chunk_size:
+                yield evaluate(pending)
+                pending, n_pending = [], 0
+    if pending:
+        yield evaluate(pending)
+
+
+def write_reach_csv(chunks: Iterable[StructureChunk], f: IO[str]) -> int:
+    """把沿程包络逐块写为 CSV（首列为桩号），返回写入的建筑物数。"""
+    writer = csv.writer(f)
+    writer.writerow(REACH_COLUMNS)
+    n = 0
+    for chunk in chunks:
+        for row in chunk.rows():
+            writer.writerow([_fmt_cell(row[k]) for k in REACH_COLUMNS])
+        n += len(chunk)
+    return n
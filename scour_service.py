@@ -0,0 +1,170 @@
+"""冲刷计算 HTTP 服务（JSON 接口，仅依赖标准库）。
+
+与 Streamlit 页面走同一套后端：计算结果进 `shared_cache.SharedCache`，计算书由
+`report_cache` 渲染。供脚本/其他系统调用，也是 `loadtest.py` 的压测对象。
+
+    python scour_service.py --port 8600
+
+接口：
+    GET  /health                  {"status": "ok"}
+    GET  /stats                   进程 RSS 与缓存统计
+    POST /calc/d21、/calc/d22      {"inputs": {...}}                 -> {"result": {...}}
+    POST /report/d21、/report/d22  {"inputs": {...}, "name": "..."}  -> docx 字节
+
+请求头 `X-Session-Id` 用于共享缓存按会话记账；输入有误返回 400 与 {"error": "..."}，
+计算中的其他异常（如数值溢出）返回 500。结果中的 inf/NaN 输出为 null。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from dataclasses import asdict, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from report_cache import default_cache
+from scour_calc import calc_d21, calc_d22
+from shared_cache import SharedCache, make_key
+
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+MAX_BODY_BYTES = 1 << 20
+
+_CALCS = {"d21": calc_d21, "d22": calc_d22}
+
+
+def process_rss(pid: int | str = "self") -> int | None:
+    """进程常驻内存（字节），读 /proc/<pid>/status；非 Linux 返回 None。"""
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def _finite(v):
+    """非有限浮点数（inf/NaN）转为 None，输出为标准 JSON 的 null。"""
+    if isinstance(v, float) and not math.isfinite(v):
+        return None
+    if isinstance(v, dict):
+        return {k: _finite(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_finite(x) for x in v]
+    return v
+
+
+def _result_dict(result) -> dict:
+    return {f.name: getattr(result, f.name) for f in fields(result)}
+
+
+class ScourService(ThreadingHTTPServer):
+    """多线程 HTTP 服务；`cache` 为结果共享缓存。"""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], *, cache: SharedCache | None = None) -> None:
+        super().__init__(address, _Handler)
+        self.cache = SharedCache() if cache is None else cache
+
+    def calc(self, kind: str, inputs: dict, *, session: str | None):
+        fn = _CALCS[kind]
+        return self.cache.get_or_compute(make_key(kind, inputs), lambda: fn(**inputs), session=session)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"       # 保持连接，压测时不反复建连
+    disable_nagle_algorithm = True      # 响应头与正文分两次写，不关 Nagle 会被延迟确认拖慢约 40 ms
+    server: ScourService
+
+    def log_message(self, format, *args) -> None:   # 压测时逐条打印访问日志开销太大
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, obj) -> None:
+        body = json.dumps(_finite(obj), ensure_ascii=False, allow_nan=False).encode("utf-8")
+        self._send(status, body, "application/json; charset=utf-8")
+
+    def _payload(self) -> dict:
+        try:
+            n = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            n = -1
+        if n < 0 or n > MAX_BODY_BYTES:
+            # 请求体未读出，连接上的后续字节无法再按请求解析，回复后关闭连接
+            self.close_connection = True
+            raise ValueError("Content-Length 无效" if n < 0 else "请求体过大")
+        data = json.loads(self.rfile.read(n) or b"{}")
+        if not isinstance(data, dict) or not isinstance(data.get("inputs"), dict):
+            raise ValueError("请求体须为 {\"inputs\": {...}}")
+        return data
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._json(200, {
+                "rss_bytes": process_rss(),
+                "cache": asdict(self.server.cache.stats()),
+                "report_cache": asdict(default_cache().stats()),
+            })
+        else:
+            self._json(404, {"error": f"未知路径：{self.path}"})
+
+    def do_POST(self) -> None:
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] not in ("calc", "report") or parts[1] not in _CALCS:
+            self._json(404, {"error": f"未知路径：{self.path}"})
+            return
+        action, kind = parts
+        try:
+            data = self._payload()
+            inputs = data["inputs"]
+            result = self.server.calc(kind, inputs, session=self.headers.get("X-Session-Id"))
+            if action == "calc":
+                self._json(200, {"result": _result_dict(result)})
+            else:
+                body = default_cache().render(kind, name=data.get("name"), inputs=inputs, result=result)
+                self._send(200, body, DOCX_MIME)
+        except (ValueError, TypeError, KeyError) as e:
+            self._json(400, {"error": str(e)})
+        except Exception as e:      # 如数值溢出（OverflowError）：返回 500，不让连接无响应断开
+            self._json(500, {"error": f"{type(e).__name__}: {e}"})
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="冲刷计算 HTTP 服务")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8600)
+    p.add_argument("--cache-mb", type=int, default=256, help="共享结果缓存上限（MB）")
+    p.add_argument("--ttl", type=float, default=3600.0, help="缓存条目空闲过期时间（秒）")
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    server = ScourService((args.host, args.port), cache=SharedCache(max_bytes=args.cache_mb << 20, ttl_s=args.ttl))
+    print(f"冲刷计算服务：http://{args.host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""大规模参数扫描结果的磁盘存储（内存映射定长二进制列）。
+
+目录结构：
+    header.json      小文件头：计算类型、精度、扫描轴（参数名与取值）、固定参数、总行数、已写入行数
+    <字段>.f64       每个结果字段一列，小端 float64，定长（单精度存储为 <字段>.f32，小端 float32）
+    err.i8           逐行错误码（int8，含义见 scour_batch.D21_ERRORS / D22_ERRORS）
+
+行号按扫描轴的 C 顺序（第一个轴变化最慢）展平，可由网格下标直接定位。
+结果边算边追加（`append`），读取方以只读方式打开即可零拷贝得到 NumPy 视图，
+计算中断后 `sweep()` 会从已写入位置继续。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Iterator, Mapping, Sequence
+
+from scour_batch import (
+    D21Batch,
+    D22Batch,
+    _dtype,
+    _require_numpy,
+    calc_d21_batch,
+    calc_d22_batch,
+)
+
+
+STORE_VERSION = 1
+HEADER_NAME = "header.json"
+
+# 精度 -> (列文件扩展名, 元素字节数)；旧文件头没有 precision 字段，按 float64 处理
+_COLUMN_FORMATS = {"float64": ("f64", 8), "float32": ("f32", 4)}
+
+_KINDS = {
+    "d21": (D21Batch, calc_d21_batch),
+    "d22": (D22Batch, calc_d22_batch),
+}
+
+
+class ResultStore:
+    """内存映射结果存储。用 `ResultStore.create(...)` 新建，`ResultStore.open(...)` 打开。"""
+
+    def __init__(self, path: str, header: dict, *, mode: str) -> None:
+        np = _require_numpy()
+        self.path = str(path)
+        self.header = header
+        self.mode = mode
+        self.batch_cls = _KINDS[header["kind"]][0]
+        count = int(header["count"])
+        ext, width = _COLUMN_FORMATS[self.precision]
+        self._cols = {}
+        for name in self.batch_cls.FIELDS:
+            self._cols[name] = np.memmap(self._col_path(name, ext), dtype=f"<f{width}", mode=mode, shape=(count,))
+        self._err = np.memmap(self._col_path("err", "i8"), dtype=np.int8, mode=mode, shape=(count,))
+
+    # ---------------- 创建 / 打开 ----------------
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        *,
+        kind: str,
+        axes: Mapping[str, Sequence[float]],
+        fixed: Mapping[str, object] | None = None,
+        precision: str = "float64",
+    ) -> "ResultStore":
+        """新建存储并按网格总行数预分配列文件（稀疏文件，不立即占用磁盘）。
+
+        `precision="float32"` 时结果列按单精度存储，磁盘与内存映射占用减半。
+        """
+        np = _require_numpy()
+        if kind not in _KINDS:
+            raise ValueError(f"未知计算类型：{kind}")
+        _dtype(np, precision)
+        if not axes:
+            raise ValueError("至少需要一个扫描轴")
+        ax = [{"name": str(k), "values": [float(v) for v in vals]} for k, vals in axes.items()]
+        if any(len(a["values"]) == 0 for a in ax):
+            raise ValueError("扫描轴取值不能为空")
+        fixed = dict(fixed or {})
+        dup = set(fixed) & {a["name"] for a in ax}
+        if dup:
+            raise ValueError(f"参数同时出现在扫描轴与固定参数中：{', '.join(sorted(dup))}")
+
+        os.makedirs(path, exist_ok=True)
+        count = int(np.prod([len(a["values"]) for a in ax], dtype=np.int64))
+        header = {
+            "version": STORE_VERSION,
+            "kind": kind,
+            "precision": precision,
+            "axes": ax,
+            "fixed": fixed,
+            "count": count,
+            "filled": 0,
+        }
+        batch_cls = _KINDS[kind][0]
+        col_ext, col_width = _COLUMN_FORMATS[precision]
+        for name, ext, width in [(f, col_ext, col_width) for f in batch_cls.FIELDS] + [("err", "i8", 1)]:
+            with open(os.path.join(path, f"{name}.{ext}"), "wb") as f:
+                f.truncate(count * width)
+        _write_header(path, header)
+        return cls(path, header, mode="r+")
+
+    @classmethod
+    def open(cls, path: str, *, mode: str = "r") -> "ResultStore":
+        """打开已有存储；`mode="r"` 只读（可与正在写入的进程并存），`"r+"` 可继续追加。"""
+        if mode not in ("r", "r+"):
+            raise ValueError("mode 只能为 'r' 或 'r+'")
+        header = _read_header(path)
+        if header.get("version") != STORE_VERSION:
+            raise ValueError(f"不支持的存储版本：{header.get('version')}")
+        return cls(path, header, mode=mode)
+
+    def _col_path(self, name: str, ext: str) -> str:
+        return os.path.join(self.path, f"{name}.{ext}")
+
+    # ---------------- 元数据 ----------------
+    @property
+    def kind(self) -> str:
+        return self.header["kind"]
+
+    @property
+    def precision(self) -> str:
+        return self.header.get("precision", "float64")
+
+    @property
+    def count(self) -> int:
+        return int(self.header["count"])
+
+    @property
+    def filled(self) -> int:
+        return int(self.header["filled"])
+
+    @property
+    def axis_names(self) -> list[str]:
+        return [a["name"] for a in self.header["axes"]]
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return tuple(len(a["values"]) for a in self.header["axes"])
+
+    def axis_values(self, name: str):
+        np = _require_numpy()
+        for a in self.header["axes"]:
+            if a["name"] == name:
+                return np.asarray(a["values"], dtype=np.float64)
+        raise KeyError(name)
+
+    def refresh(self) -> int:
+        """重新读取文件头（只读方查看写入进度），返回已写入行数。"""
+        self.header = _read_header(self.path)
+        return self.filled
+
+    # ---------------- 写入 ----------------
+    def append(self, batch) -> int:
+        """把一块结果追加到已写入位置之后，返回新的已写入行数。"""
+        if self.mode != "r+":
+            raise ValueError("只读打开的存储不能追加")
+        if not isinstance(batch, self.batch_cls):
+            raise TypeError(f"应追加 {self.batch_cls.__name__}")
+        if batch.precision != self.precision:
+            raise ValueError(f"结果精度（{batch.precision}）与存储精度（{self.precision}）不一致")
+        start, n = self.filled, len(batch)
+        if start + n > self.count:
+            raise ValueError("追加行数超出网格总行数")
+        for i, name in enumerate(self.batch_cls.FIELDS):
+            self._cols[name][start:start + n] = batch.data[i]
+        self._err[start:start + n] = batch.err
+        self.flush()
+        self.header["filled"] = start + n
+        _write_header(self.path, self.header)
+        return start + n
+
+    def flush(self) -> None:
+        if self.mode == "r+":
+            for col in self._cols.values():
+                col.flush()
+            self._err.flush()
+
+    # ---------------- 读取 ----------------
+    def column(self, name: str):
+        """结果列（已写入部分）的零拷贝 NumPy 视图；`name="err"` 为错误码列。"""
+        col = self._err if name == "err" else self._cols[name]
+        return col[: self.filled]
+
+    def grid(self, name: str):
+        """结果列按扫描轴形状重排的视图（仅在全部写入后可用）。"""
+        if self.filled != self.count:
+            raise ValueError("结果尚未全部写入")
+        return self.column(name).reshape(self.shape)
+
+    def row_index(self, *index: int, **by_name: int) -> int:
+        """网格下标 -> 行号；可按轴顺序给位置参数，或按轴名给关键字参数。"""
+        np = _require_numpy()
+        if by_name:
+            if index:
+                raise ValueError("位置下标与按名下标不能混用")
+            index = tuple(by_name[n] for n in self.axis_names)
+        return int(np.ravel_multi_index(index, self.shape))
+
+    def inputs_at(self, rows) -> dict:
+        """行号（标量或数组）对应的计算输入：扫描轴取值 + 固定参数。"""
+        np = _require_numpy()
+        idx = np.unravel_index(np.asarray(rows, dtype=np.int64), self.shape)
+        out = dict(self.header["fixed"])
+        for a, ix in zip(self.header["axes"], idx):
+            out[a["name"]] = np.asarray(a["values"], dtype=np.float64)[ix]
+        return out
+
+    def read(self, rows=slice(None)):
+        """读取若干行为结果容器（复制到内存）。"""
+        np = _require_numpy()
+        data = np.stack([self.column(n)[rows] for n in self.batch_cls.FIELDS])
+        return self.batch_cls(data, np.asarray(self.column("err")[rows]))
+
+    def get(self, *index: int, **by_name: int):
+        """按网格下标取单个标量结果（`D21Result`/`D22Result`）。"""
+        row = self.row_index(*index, **by_name)
+        if row >= self.filled:
+            raise IndexError("该网格点尚未计算")
+        return self.read(slice(row, row + 1)).record(0)
+
+
+def _write_header(path: str, header: dict) -> None:
+    dst = os.path.join(path, HEADER_NAME)
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(header, f, ensure_ascii=False)
+    os.replace(tmp, dst)
+
+
+def _read_header(path: str) -> dict:
+    with open(os.path.join(path, HEADER_NAME), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_sweep_chunks(store: ResultStore, *, chunk_rows: int = 1 << 20) -> Iterator[tuple[int, dict]]:
+    """从已写入位置起按块产生 (起始行号, 计算输入)。"""
+    np = _require_numpy()
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows 必须为正")
+    for start in range(store.filled, store.count, chunk_rows):
+        stop = min(start + chunk_rows, store.count)
+        yield start, store.inputs_at(np.arange(start, stop, dtype=np.int64))
+
+
+def sweep(
+    path: str,
+    *,
+    kind: str = "d21",
+    axes: Mapping[str, Sequence[float]],
+    fixed: Mapping[str, object] | None = None,
+    chunk_rows: int = 1 << 20,
+    precision: str = "float64",
+    progress=None,
+) -> ResultStore:
+    """网格扫描并边算边写入存储；目录已存在时从上次中断处继续。
+
+    `precision="float32"` 时单精度计算并存储，Um≈Uc 的行记错误码 11（见 `scour_batch.F32_MIN_GAP`）。
+    `progress(filled, count)` 为可选回调，每写入一块调用一次。
+    """
+    if os.path.exists(os.path.join(path, HEADER_NAME)):
+        store = ResultStore.open(path, mode="r+")
+        want = [(str(k), [float(v) for v in vals]) for k, vals in axes.items()]
+        have = [(a["name"], a["values"]) for a in store.header["axes"]]
+        if (
+            store.kind != kind
+            or store.precision != precision
+            or want != have
+            or dict(fixed or {}) != store.header["fixed"]
+        ):
+            raise ValueError("已有存储的扫描定义与本次不一致，请更换目录")
+    else:
+        store = ResultStore.create(path, kind=kind, axes=axes, fixed=fixed, precision=precision)
+
+    func = _KINDS[kind][1]
+    for _start, inputs in iter_sweep_chunks(store, chunk_rows=chunk_rows):
+        store.append(func(**inputs, precision=precision))
+        if progress is not None:
+            progress(store.filled, store.count)
+    return store
@@ -0,0 +1,320 @@
+"""工程工作区：断面、输入、计算结果与计算书记录保存在本地 SQLite 数据库中。
+
+    ws = Workspace("某河段.sqlite")
+    with open("断面表.csv", encoding="utf-8-sig", newline="") as f:
+        ws.upsert_sections(read_sections_csv(f), defaults={"gamma_s": 26.0, "gamma_w": 9.81, "n": 0.25})
+    ws.recompute()                         # 只重算输入有变化（或尚无结果）的断面
+    ws.top("hs_max", 10)
+
+表结构：
+    sections   断面输入（列同 `scour_pipeline.SECTION_COLUMNS`，已套用缺省值）+ 输入哈希
+    results    D.2.1 → D.2.2 包络结果（列同 `ENVELOPE_COLUMNS`）+ 计算时的输入哈希
+    reports    已导出计算书的记录（路径、内容哈希、导出时的输入哈希）
+
+每个断面的输入哈希由规范化后的全部输入算得；结果中的哈希与断面不一致即为过期，
+`recompute()` 只对这些断面按块调用批量流水线，并在事务内批量写回。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Iterable, Iterator, Mapping
+
+from scour_batch import _require_numpy
+from scour_pipeline import (
+    ENVELOPE_COLUMNS,
+    SECTION_COLUMNS,
+    _TEXT_COLUMNS,
+    _columns_from_rows,
+    evaluate_sections,
+)
+
+
+SCHEMA_VERSION = 1
+
+_INPUT_COLUMNS = tuple(c for c in SECTION_COLUMNS if c != "section_id")
+_RESULT_COLUMNS = tuple(c for c in ENVELOPE_COLUMNS if c not in ("section_id", "H0", "U"))
+_RESULT_TEXT = ("governing", "error")
+# 建索引的关键结果列
+INDEXED_RESULTS = ("hs_d21", "hs_d22", "hs_max")
+
+
+def _sql_type(col: str) -> str:
+    return "TEXT" if col in _TEXT_COLUMNS or col in _RESULT_TEXT else "REAL"
+
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sections (
+    section_id TEXT PRIMARY KEY,
+    {", ".join(f"{c} {_sql_type(c)}" for c in _INPUT_COLUMNS)},
+    input_hash TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    section_id TEXT PRIMARY KEY REFERENCES sections(section_id) ON DELETE CASCADE,
+    {", ".join(f"{c} {_sql_type(c)}" for c in _RESULT_COLUMNS)},
+    input_hash TEXT NOT NULL,
+    computed_at REAL NOT NULL
+);
+{"".join(f"CREATE INDEX IF NOT EXISTS results_{c} ON results({c});" for c in INDEXED_RESULTS)}
+CREATE TABLE IF NOT EXISTS reports (
+    report_id INTEGER PRIMARY KEY,
+    section_id TEXT NOT NULL REFERENCES sections(section_id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    name TEXT,
+    content_key TEXT,
+    input_hash TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_section ON reports(section_id);
+"""
+
+
+def _db_value(v):
+    """NumPy 标量 → Python 值；NaN → NULL。"""
+    if v is None:
+        return None
+    if isinstance(v, str):
+        return v
+    if hasattr(v, "item"):
+        v = v.item()
+    if isinstance(v, float) and v != v:
+        return None
+    return v
+
+
+def input_hash(values: Iterable) -> str:
+    """一个断面规范化输入（按 `_INPUT_COLUMNS` 顺序）的哈希。"""
+    norm = [repr(v) if isinstance(v, float) else v for v in values]
+    return hashlib.sha256(json.dumps(norm, ensure_ascii=False).encode("utf-8")).hexdigest()[:32]
+
+
+class Workspace:
+    """单个工程的 SQLite 工作区（可作上下文管理器使用）。"""
+
+    def __init__(self, path: str) -> None:
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        with self.conn:
+            self.conn.executescript(_SCHEMA)
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None:
+                self.conn.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            elif int(row[0]) != SCHEMA_VERSION:
+                raise ValueError(f"工作区版本不受支持：{row[0]}")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "Workspace":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------------- 断面 ----------------
+    def upsert_sections(
+        self,
+        sections: Iterable[Mapping],
+        *,
+        defaults: Mapping | None = None,
+        chunk_size: int = 10000,
+    ) -> int:
+        """导入/更新断面输入（整体一个事务，按块批量写入），返回处理的断面数。
+
+        输入不变的断面保留原哈希，其结果不会被判为过期。
+        """
+        np = _require_numpy()
+        if chunk_size <= 0:
+            raise ValueError("chunk_size 必须为正")
+        defaults = dict(defaults or {})
+        cols_sql = ", ".join(_INPUT_COLUMNS)
+        marks = ", ".join("?" for _ in range(len(_INPUT_COLUMNS) + 3))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in _INPUT_COLUMNS)
+        sql = (
+            f"INSERT INTO sections (section_id, {cols_sql}, input_hash, updated_at) VALUES ({marks}) "
+            f"ON CONFLICT(section_id) DO UPDATE SET {updates}, input_hash = excluded.input_hash, "
+            "updated_at = excluded.updated_at WHERE sections.input_hash != excluded.input_hash"
+        )
+
+        n = 0
+        now = time.time()
+
+        def flush(buf):
+            cols = _columns_from_rows(np, buf, defaults)
+            params = []
+            for i, sid in enumerate(cols["section_id"]):
+                if sid in (None, ""):
+                    raise ValueError(f"第 {n + i + 1} 个断面缺少 section_id")
+                values = [_db_value(cols[c][i]) for c in _INPUT_COLUMNS]
+                params.append((str(sid), *values, input_hash(values), now))
+            self.conn.executemany(sql, params)
+            return len(params)
+
+        with self.conn:
+            buf: list[Mapping] = []
+            for row in sections:
+                buf.append(row)
+                if len(buf) >= chunk_size:
+                    n += flush(buf)
+                    buf = []
+            if buf:
+                n += flush(buf)
+        return n
+
+    def delete_sections(self, section_ids: Iterable[str]) -> int:
+        """删除断面（连同其结果与计算书记录），返回删除数。"""
+        with self.conn:
+            cur = self.conn.executemany("DELETE FROM sections WHERE section_id = ?", ((str(s),) for s in section_ids))
+        return cur.rowcount
+
+    def section(self, section_id: str) -> dict | None:
+        row = self.conn.execute("SELECT * FROM sections WHERE section_id = ?", (str(section_id),)).fetchone()
+        return None if row is None else dict(row)
+
+    def section_ids(self) -> list[str]:
+        """全部断面编号（按导入顺序）。"""
+        return [r[0] for r in self.conn.execute("SELECT section_id FROM sections ORDER BY rowid")]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM sections").fetchone()[0]
+
+    # ---------------- 计算 ----------------
+    def stale_count(self) -> int:
+        """尚无结果或输入已变化的断面数。"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM sections s LEFT JOIN results r USING (section_id) "
+            "WHERE r.input_hash IS NULL OR r.input_hash != s.input_hash"
+        ).fetchone()[0]
+
+    def recompute(self, *, force: bool = False, chunk_size: int = 10000) -> int:
+        """对过期断面（`force=True` 时为全部断面）按块计算 D.2.1 → D.2.2 并写回，返回计算的断面数。"""
+        np = _require_numpy()
+        if chunk_size <= 0:
+            raise ValueError("chunk_size 必须为正")
+        stale = "" if force else "AND (r.input_hash IS NULL OR r.input_hash != s.input_hash)"
+        select = (
+            f"SELECT s.rowid AS _rowid, s.section_id, {', '.join('s.' + c for c in _INPUT_COLUMNS)}, s.input_hash "
+            f"FROM sections s LEFT JOIN results r USING (section_id) "
+            f"WHERE s.rowid > ? {stale} ORDER BY s.rowid LIMIT ?"
+        )
+        insert = (
+            f"INSERT OR REPLACE INTO results (section_id, {', '.join(_RESULT_COLUMNS)}, input_hash, computed_at) "
+            f"VALUES ({', '.join('?' for _ in range(len(_RESULT_COLUMNS) + 3))})"
+        )
+
+        n = 0
+        last = 0
+        with self.conn:
+            while True:
+                # 按 rowid 分页，每页重新查询，不在写入 results 时保持打开的读游标
+                rows = [dict(r) for r in self.conn.execute(select, (last, chunk_size)).fetchall()]
+                if not rows:
+                    break
+                last = rows[-1]["_rowid"]
+                chunk = evaluate_sections(_columns_from_rows(np, rows, {}))
+                cols = chunk.columns()
+                now = time.time()
+                self.conn.executemany(
+                    insert,
+                    (
+                        (r["section_id"], *(_db_value(cols[c][i]) for c in _RESULT_COLUMNS), r["input_hash"], now)
+                        for i, r in enumerate(rows)
+                    ),
+                )
+                n += len(rows)
+        return n
+
+    # ---------------- 查询 ----------------
+    def _envelope_sql(self, where: str = "", order: str = "") -> str:
+        cols = ", ".join(["s.section_id", "s.H0", "s.U", *("r." + c for c in _RESULT_COLUMNS)])
+        return (
+            f"SELECT {cols}, r.input_hash != s.input_hash AS stale "
+            f"FROM results r JOIN sections s USING (section_id) {where} {order}"
+        )
+
+    def result(self, section_id: str) -> dict | None:
+        """单个断面的包络结果（含 `stale`：输入在计算后是否改过）。"""
+        row = self.conn.execute(self._envelope_sql("WHERE s.section_id = ?"), (str(section_id),)).fetchone()
+        return None if row is None else dict(row)
+
+    def top(self, column: str = "hs_max", k: int = 10, *, descending: bool = True) -> list[dict]:
+        """按结果列取前 k 个断面（走结果列索引）。"""
+        if column not in _RESULT_COLUMNS or column in _RESULT_TEXT:
+            raise KeyError(f"不能按该列排序：{column}")
+        order = f"ORDER BY r.{column} {'DESC' if descending else 'ASC'} LIMIT ?"
+        where = f"WHERE r.{column} IS NOT NULL"
+        return [dict(r) for r in self.conn.execute(self._envelope_sql(where, order), (int(k),))]
+
+    def iter_results(self, *, min_hs: float | None = None) -> Iterator[dict]:
+        """逐行遍历包络结果（按断面导入顺序）；`min_hs` 只取 hs_max ≥ 该值的断面。"""
+        if min_hs is None:
+            cur = self.conn.execute(self._envelope_sql(order="ORDER BY s.rowid"))
+        else:
+            cur = self.conn.execute(self._envelope_sql("WHERE r.hs_max >= ?", "ORDER BY s.rowid"), (float(min_hs),))
+        for row in cur:
+            yield dict(row)
+
+    # ---------------- 计算书记录 ----------------
+    def record_report(
+        self,
+        section_id: str,
+        kind: str,
+        path: str,
+        *,
+        name: str | None = None,
+        content_key: str | None = None,
+    ) -> int:
+        """登记一份已导出的计算书，返回记录 id。"""
+        sec = self.section(section_id)
+        if sec is None:
+            raise KeyError(f"断面不存在：{section_id}")
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO reports (section_id, kind, path, name, content_key, input_hash, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (str(section_id), kind, str(path), name, content_key, sec["input_hash"], time.time()),
+            )
+        return int(cur.lastrowid)
+
+    def reports(self, section_id: str | None = None, *, stale_only: bool = False) -> list[dict]:
+        """计算书记录；`stale_only` 只列导出后断面输入又改过的。"""
+        sql = (
+            "SELECT p.*, p.input_hash != s.input_hash AS stale "
+            "FROM reports p JOIN sections s USING (section_id)"
+        )
+        cond, params = [], []
+        if section_id is not None:
+            cond.append("p.section_id = ?")
+            params.append(str(section_id))
+        if stale_only:
+            cond.append("p.input_hash != s.input_hash")
+        if cond:
+            sql += " WHERE " + " AND ".join(cond)
+        return [dict(r) for r in self.conn.execute(sql + " ORDER BY p.report_id", params)]
+
+
+def write_workspace_csv(ws: Workspace, f, *, min_hs: float | None = None) -> int:
+    """把工作区的包络结果写为与 `write_envelope_csv` 相同格式的 CSV，返回行数。"""
+    import csv
+
+    from scour_pipeline import _fmt_cell
+
+    writer = csv.writer(f)
+    writer.writerow(ENVELOPE_COLUMNS)
+    n = 0
+    for row in ws.iter_results(min_hs=min_hs):
+        writer.writerow([_fmt_cell(row[k]) for k in ENVELOPE_COLUMNS])
+        n += 1
+    return n
@@ -0,0 +1,282 @@
+"""服务端跨会话共享缓存（全局内存上限 + TTL 过期 + 按会话记账）。
+
+Streamlit 每个会话各自在 `st.session_state` 中保存结果与导出字节，用户多、标准工况重复时
+内存随会话数线性增长且重复计算。本模块提供进程内共享缓存，在 `app.py` 中经
+`st.cache_resource` 取得唯一实例：
+
+    cache = SharedCache(max_bytes=256 << 20, ttl_s=3600)
+    res = cache.get_or_compute(make_key("d21", inputs), lambda: calc_d21(**inputs), session=sid)
+    cache.session_bytes(sid)          # 该会话写入、仍在缓存中的字节数
+
+- 总占用超过 `max_bytes` 时按最久未用淘汰；条目超过 `ttl_s` 未被访问即过期；
+- 每个条目记在首次写入它的会话名下，`per_session_bytes` 限制单个会话可占用的份额
+  （超出时先淘汰该会话自己最久未用的条目），其他会话命中同一条目不重复计费；
+- 同一键并发计算时只算一次，其余调用等待结果。
+
+占用按 `nbytes`（NumPy 数组、批量结果容器）、bytes/str 长度或 `sys.getsizeof` 估算，
+也可在写入时直接给出。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from enum import Enum
+from typing import Callable, Hashable
+
+
+DEFAULT_MAX_BYTES = 256 << 20
+DEFAULT_TTL_S = 3600.0
+
+
+def _jsonable(v):
+    if isinstance(v, Enum):
+        return v.value
+    if isinstance(v, float):
+        return repr(v)
+    if isinstance(v, (bytes, bytearray)):
+        return hashlib.sha256(v).hexdigest()
+    if isinstance(v, dict):
+        return {str(k): _jsonable(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_jsonable(x) for x in v]
+    return v
+
+
+def make_key(*parts) -> str:
+    """由若干部分（字符串、数值、输入 dict、字节内容等）生成缓存键。"""
+    raw = json.dumps(_jsonable(list(parts)), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def sizeof(value) -> int:
+    """估算缓存值占用的字节数。"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) if not value.isascii() else len(value)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if is_dataclass(value) and not isinstance(value, type):
+        return sys.getsizeof(value) + sum(sys.getsizeof(getattr(value, f.name)) for f in fields(value))
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+@dataclass
+class _Entry:
+    value: object
+    nbytes: int
+    owner: Hashable | None
+    last_used: float
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        n = self.hits + self.misses
+        return self.hits / n if n else 0.0
+
+
+class SharedCache:
+    """线程安全的共享缓存。`clock` 可替换（测试用）。"""
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_s: float | None = DEFAULT_TTL_S,
+        per_session_bytes: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes 必须为正")
+        if ttl_s is not None and ttl_s <= 0:
+            raise ValueError("ttl_s 必须为正")
+        if per_session_bytes is not None and per_session_bytes <= 0:
+            raise ValueError("per_session_bytes 必须为正")
+        self.max_bytes = int(max_bytes)
+        self.ttl_s = ttl_s
+        self.per_session_bytes = per_session_bytes
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._session_bytes: dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._inflight: dict[str, threading.Event] = {}
+        self._hits = self._misses = self._evictions = self._expirations = 0
+
+    # ---------------- 内部 ----------------
+    def _expired(self, e: _Entry, now: float) -> bool:
+        return self.ttl_s is not None and now - e.last_used > self.ttl_s
+
+    def _drop(self, key: str) -> None:
+        e = self._entries.pop(key)
+        self._bytes -= e.nbytes
+        if e.owner is not None:
+            left = self._session_bytes.get(e.owner, 0) - e.nbytes
+            if left > 0:
+                self._session_bytes[e.owner] = left
+            else:
+                self._session_bytes.pop(e.owner, None)
+
+    def _purge_expired(self, now: float) -> None:
+        if self.ttl_s is None:
+            return
+        # 条目按最近使用排序，最旧的在前
+        while self._entries:
+            key, e = next(iter(self._entries.items()))
+            if not self._expired(e, now):
+                break
+            self._drop(key)
+            self._expirations += 1
+
+    def _evict_for(self, owner: Hashable | None, incoming: int) -> None:
+        if owner is not None and self.per_session_bytes is not None:
+            while self._session_bytes.get(owner, 0) + incoming > self.per_session_bytes:
+                key = next((k for k, e in self._entries.items() if e.owner == owner), None)
+                if key is None:
+                    break
+                self._drop(key)
+                self._evictions += 1
+        while self._entries and self._bytes + incoming > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self._evictions += 1
+
+    # ---------------- 读写 ----------------
+    def get(self, key: str, default=None):
+        with self._lock:
+            now = self._clock()
+            e = self._entries.get(key)
+            if e is None or self._expired(e, now):
+                if e is not None:
+                    self._drop(key)
+                    self._expirations += 1
+                self._misses += 1
+                return default
+            e.last_used = now
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return e.value
+
+    def put(self, key: str, value, *, session: Hashable | None = None, nbytes: int | None = None) -> bool:
+        """写入（已存在则替换），返回是否写入；单个值超过上限时不缓存。"""
+        n = sizeof(value) if nbytes is None else int(nbytes)
+        limit = self.max_bytes if (session is None or self.per_session_bytes is None) else min(self.max_bytes, self.per_session_bytes)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if n > limit:
+                return False
+            now = self._clock()
+            self._purge_expired(now)
+            self._evict_for(session, n)
+            self._entries[key] = _Entry(value, n, session, now)
+            self._bytes += n
+            if session is not None:
+                self._session_bytes[session] = self._session_bytes.get(session, 0) + n
+            return True
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], object],
+        *,
+        session: Hashable | None = None,
+        nbytes: Callable[[object], int] | None = None,
+    ):
+        """命中则返回缓存值，否则调用 `compute()` 并写入；同一键的并发调用只计算一次。"""
+        sentinel = object()
+        while True:
+            value = self.get(key, sentinel)
+            if value is not sentinel:
+                return value
+            with self._lock:
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    break
+            event.wait()
+        try:
+            value = compute()
+            self.put(key, value, session=session, nbytes=None if nbytes is None else nbytes(value))
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def __contains__(self, key: str) -> bool:
+        """键是否在缓存中且未过期（不计命中/未命中，不改变淘汰顺序）。
+
+        `put` 对超过上限的值不缓存，`get_or_compute` 之后可据此判断结果是否真正写入。
+        """
+        with self._lock:
+            e = self._entries.get(key)
+            return e is not None and not self._expired(e, self._clock())
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    # ---------------- 会话记账 ----------------
+    def session_bytes(self, session: Hashable) -> int:
+        """该会话写入、仍在缓存中的字节数。"""
+        with self._lock:
+            self._purge_expired(self._clock())
+            return self._session_bytes.get(session, 0)
+
+    def usage_by_session(self) -> dict:
+        with self._lock:
+            self._purge_expired(self._clock())
+            return dict(self._session_bytes)
+
+    def release_session(self, session: Hashable, *, drop: bool = False) -> int:
+        """会话结束：其条目转为无主（仍可被他人命中）或 `drop=True` 时直接删除；返回涉及字节数。"""
+        with self._lock:
+            n = self._session_bytes.pop(session, 0)
+            for key, e in list(self._entries.items()):
+                if e.owner == session:
+                    if drop:
+                        self._entries.pop(key)
+                        self._bytes -= e.nbytes
+                    else:
+                        e.owner = None
+            return n
+
+    def purge_expired(self) -> None:
+        with self._lock:
+            self._purge_expired(self._clock())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._session_bytes.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            self._purge_expired(self._clock())
+            return CacheStats(
+                self._hits, self._misses, self._evictions, self._expirations,
+                len(self._entries), self._bytes, self.max_bytes,
+            )
@@ -0,0 +1,6 @@
+"""测试以仓库根目录的平铺模块为被测对象。"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
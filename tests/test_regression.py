@@ -0,0 +1,133 @@
+"""回归测试：金标准比对，以及工作区、扫描存储、纵剖面流水线等有状态模块。
+
+    python -m pytest -q
+"""
+
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from scour_golden import check_golden  # noqa: E402
+from scour_reach import REACH_COLUMNS, run_reach_profile  # noqa: E402
+from scour_store import ResultStore, sweep  # noqa: E402
+from scour_workspace import Workspace  # noqa: E402
+
+
+SECTION_DEFAULTS = {
+    "k1_type": 1,
+    "uc_method": 0,
+    "gamma_s": 26.5,
+    "gamma_w": 9.81,
+    "alpha_deg": 30.0,
+    "n": 0.25,
+}
+
+
+def _section(i: int, **over) -> dict:
+    row = {
+        "section_id": f"S{i}",
+        "H0": 3.0 + 0.1 * i,
+        "d50": 0.05,
+        "U": 2.8 + 0.05 * i,
+        "L0": 40.0,
+        "B": 200.0,
+        "theta_deg": 60.0,
+        "m": 2.0,
+    }
+    row.update(over)
+    return row
+
+
+@pytest.mark.parametrize("engine", ["batch", "batch-float32", "scalar"])
+def test_golden(engine):
+    report = check_golden(engine=engine)
+    assert report.ok
+
+
+def test_workspace_stale_detection(tmp_path):
+    with Workspace(str(tmp_path / "ws.sqlite")) as ws:
+        ws.upsert_sections([_section(i) for i in range(5)], defaults=SECTION_DEFAULTS)
+        assert ws.stale_count() == 5
+        assert ws.recompute() == 5
+        assert ws.stale_count() == 0
+        ws.record_report("S2", "d21", str(tmp_path / "S2.docx"))
+
+        # 重新导入整表，只有 S2 的输入变化
+        rows = [_section(i) for i in range(5)]
+        rows[2] = _section(2, U=3.4)
+        ws.upsert_sections(rows, defaults=SECTION_DEFAULTS)
+        assert ws.stale_count() == 1
+        assert ws.result("S2")["stale"]
+        assert not ws.result("S1")["stale"]
+        assert [r["section_id"] for r in ws.reports(stale_only=True)] == ["S2"]
+
+        assert ws.recompute() == 1
+        assert ws.stale_count() == 0
+        assert ws.recompute() == 0
+
+
+def test_store_resume(tmp_path):
+    axes = {"H0": [2.0, 3.0, 4.0], "U": [1.0, 2.5, 3.0, 3.5], "L0": [20.0, 40.0]}
+    fixed = {"d50": 0.05, "B": 200.0, "theta_deg": 60.0, "m": 2.0, "k1_type": 1, "uc_method": 0,
+             "gamma_s": 26.5, "gamma_w": 9.81}
+
+    full = sweep(str(tmp_path / "full"), axes=axes, fixed=fixed, chunk_rows=5)
+
+    class Interrupted(Exception):
+        pass
+
+    def stop_after_first(filled, count):
+        raise Interrupted
+
+    part = str(tmp_path / "part")
+    with pytest.raises(Interrupted):
+        sweep(part, axes=axes, fixed=fixed, chunk_rows=5, progress=stop_after_first)
+    assert ResultStore.open(part).filled == 5
+
+    resumed = sweep(part, axes=axes, fixed=fixed, chunk_rows=7)
+    assert resumed.filled == resumed.count == full.count
+    a, b = full.read(), resumed.read()
+    np.testing.assert_array_equal(a.data, b.data)
+    np.testing.assert_array_equal(a.err, b.err)
+
+    with pytest.raises(ValueError):
+        sweep(part, axes={**axes, "L0": [20.0]}, fixed=fixed)
+
+
+def _reach_rows(chunk_size: int, profile_chunk_rows: int) -> list[dict]:
+    profile = [
+        {"chainage": 10.0 * k, "H0": 3.0 + 0.01 * k, "U": 3.0 - 0.002 * k, "B": 200.0, "d50": 0.05}
+        for k in range(101)
+    ]
+    # 桩号重复的测点（断面突变）与剖面范围外的建筑物
+    profile.insert(51, {"chainage": 500.0, "H0": 4.2, "U": 2.6, "B": 180.0, "d50": 0.08})
+    structures = [
+        {"structure_id": f"T{j}", "chainage": c, "L0": 40.0, "theta_deg": 60.0, "m": 2.0}
+        for j, c in enumerate([735.0, -5.0, 0.0, 500.0, 123.4, 1000.0, 1005.0, 499.9, 500.1, 10.0])
+    ]
+    chunks = run_reach_profile(
+        profile,
+        structures,
+        defaults=SECTION_DEFAULTS,
+        chunk_size=chunk_size,
+        profile_chunk_rows=profile_chunk_rows,
+    )
+    return [row for chunk in chunks for row in chunk.rows()]
+
+
+def test_reach_chunk_invariance():
+    ref = _reach_rows(10000, 1 << 16)
+    assert len(ref) == 10
+    assert sum(r["error"] == "" for r in ref) == 8
+    for chunk_size, profile_chunk_rows in [(1, 1), (3, 7), (4, 51), (2, 102)]:
+        rows = _reach_rows(chunk_size, profile_chunk_rows)
+        assert len(rows) == len(ref)
+        for r, s in zip(ref, rows):
+            for k in REACH_COLUMNS:
+                x, y = r[k], s[k]
+                if isinstance(x, str) or isinstance(y, str):
+                    assert x == y, (chunk_size, profile_chunk_rows, k)
+                else:
+                    assert x == y or (x != x and y != y), (chunk_size, profile_chunk_rows, k)
@@ -1,9 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import asdict
-from datetime import datetime
-
-from scour_calc import D21Result, D22Result, D21_VELOCITY_EXPONENT
+from report_model import Report, _format_runs, build_d21_report, build_d22_report
+from scour_calc import D21Result, D22Result
 
 
 def _require_docx():
@@ -23,71 +21,14 @@ def _ensure_docx_suffix(path: str) -> str:
     return p if p.lower().endswith(".docx") else (p + ".docx")
 
 
-def _fmt(x, nd: int = 6) -> str:
-    try:
-        v = float(x)
-        if abs(v) >= 1e4 or (abs(v) > 0 and abs(v) < 1e-3):
-            return f"{v:.{nd}e}"
-        return f"{v:.{nd}f}".rstrip("0").rstrip(".")
-    except Exception:
-        return str(x)
-
-
 def _add_text_with_format(paragraph, text):
-    """添加带上下标格式的文本
-    
-    支持的格式：
-    - H0, d50 等数字下标
-    - m³, m² 等上标
-    - γs, γw 等希腊字母+下标
-    """
-    import re
-    
-    # 将 m³ 临时替换以便处理
-    text = text.replace('m³', '<<m3>>')
-    text = text.replace('m²', '<<m2>>')
-    text = text.replace('kN/m³', '<<kNm3>>')
-    
-    # 正则匹配变量名+数字（如H0, d50, k1, L0, B等）
-    pattern = r'([A-Za-zγαθ]+)(\d+)'
-    parts = re.split(r'(<<.*?>>)', text)  # 先分割特殊标记
-    
-    for part in parts:
-        if part.startswith('<<') and part.endswith('>>'):
-            # 处理特殊标记
-            if part == '<<m3>>':
-                paragraph.add_run('m')
-                run = paragraph.add_run('3')
-                run.font.superscript = True
-            elif part == '<<m2>>':
-                paragraph.add_run('m')
-                run = paragraph.add_run('2')
-                run.font.superscript = True
-            elif part == '<<kNm3>>':
-                paragraph.add_run('kN/m')
-                run = paragraph.add_run('3')
-                run.font.superscript = True
-        else:
-            # 处理普通文本和下标
-            last_end = 0
-            for match in re.finditer(pattern, part):
-                # 添加匹配前的文本
-                if match.start() > last_end:
-                    paragraph.add_run(part[last_end:match.start()])
-                
-                # 添加变量名
-                var_name = match.group(1)
-                subscript = match.group(2)
-                
-                paragraph.add_run(var_name)
-                run = paragraph.add_run(subscript)
-                run.font.subscript = True
-                
-                last_end = match.end()
-            
-            # 添加剩余文本
-            if last_end < len(part):
-                paragraph.add_run(part[last_end:])
+    """添加带上下标格式的文本（拆分规则见 `_format_runs`）"""
+    for t, vert in _format_runs(text):
+        run = paragraph.add_run(t)
+        if vert == 'subscript':
+            run.font.subscript = True
+        elif vert == 'superscript':
+            run.font.superscript = True
 
 
 def _build_doc_base():
@@ -161,6 +102,22 @@ def _build_doc_base():
     return doc, add_title, add_h, add_line, Cm
 
 
+def _render_doc(report: Report):
+    """按内容模型逐段生成 python-docx 文档。"""
+    doc, add_title, add_h, add_line, Cm = _build_doc_base()
+    for b in report.blocks:
+        if b.kind == "title":
+            add_title(b.text)
+        elif b.kind == "heading":
+            add_h(b.text)
+        elif b.kind == "line":
+            add_line(b.text, level=b.level, use_format=b.use_format)
+        elif b.kind == "figure":
+            add_h(b.text)
+            doc.add_picture(b.image, width=Cm(14))
+    return doc
+
+
 def export_d21_docx(
     *,
     path: str,
@@ -169,86 +126,7 @@ def export_d21_docx(
     result: D21Result,
 ) -> str:
     path = _ensure_docx_suffix(path)
-    doc, add_title, add_h, add_line, Cm = _build_doc_base()
-
-    title_name = (name or "").strip()
-    suffix = f" - {title_name}" if title_name else ""
-    add_title(f"冲刷深度计算书 - D.2.1 丁坝一般冲刷{suffix}")
-    add_line(f"生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    add_line("计算依据：规范 D.2.1（非淹没丁坝一般冲刷深度）。")
-
-    add_h("1  已知条件")
-    add_line(
-        "H₀={H0} m，d₅₀={d50} m，U={U} m/s，L₀={L0} m，B={B} m".format(
-            H0=_fmt(inputs.get("H0"), 6),
-            d50=_fmt(inputs.get("d50"), 6),
-            U=_fmt(inputs.get("U"), 6),
-            L0=_fmt(inputs.get("L0"), 6),
-            B=_fmt(inputs.get("B"), 6),
-        ),
-        use_format=False
-    )
-    add_line(
-        "θ={theta}°，m={m}，k₁类型={k1_type}".format(
-            theta=_fmt(inputs.get("theta_deg"), 6),
-            m=_fmt(inputs.get("m"), 6),
-            k1_type=str(inputs.get("k1_type")),
-        ),
-        use_format=False
-    )
-
-    uc_method = str(inputs.get("uc_method"))
-    if uc_method == "手动输入":
-        add_line(f"Uᴄ 取值：手动输入，Uᴄ={_fmt(inputs.get('uc_manual'), 6)} m/s", use_format=False)
-    else:
-        add_line(
-            "Uᴄ 取值：{mth}，γₛ={gs} kN/m³，γ={gw} kN/m³".format(
-                mth=uc_method,
-                gs=_fmt(inputs.get("gamma_s"), 6),
-                gw=_fmt(inputs.get("gamma_w"), 6),
-            ),
-            use_format=False
-        )
-
-    add_h("2  计算过程")
-    add_line(f"速度项指数 a 固定为 {D21_VELOCITY_EXPONENT:.2f}。", use_format=False)
-    add_line(f"k₁={_fmt(result.k1, 6)}，k₂={_fmt(result.k2, 6)}，k₃={_fmt(result.k3, 6)}", use_format=False)
-    add_line(f"Uₘ={_fmt(result.Um, 6)} m/s，Uᴄ={_fmt(result.Uc, 6)} m/s", use_format=False)
-
-    # 速度项 v = (Um-Uc)/sqrt(g*d50)
-    try:
-        v_term = (float(result.Um) - float(result.Uc)) / ((9.81 * float(inputs.get("d50"))) ** 0.5)
-    except Exception:
-        v_term = None
-    if v_term is not None:
-        add_line(f"v = (Uₘ − Uᴄ) / √(g·d₅₀) = {_fmt(v_term, 6)}", use_format=False)
-
-    add_line(f"hₛ/H₀ = {_fmt(result.hs_over_H0, 6)}", use_format=False)
-
-    add_h("3  计算结果")
-    add_line(f"hₛ = {_fmt(result.hs, 6)} m", use_format=False)
-
-    add_h("附  中间量")
-    for k, v in asdict(result).items():
-        # 格式化变量名的下标
-        k_formatted = k.replace("_", "₋")
-        add_line(f"{k_formatted} = {_fmt(v, 12)}", level=1, use_format=False)
-
-    # 添加图片附件
-    import os
-    base_dir = os.path.dirname(__file__)
-    img1_path = os.path.join(base_dir, "1.png")
-    img2_path = os.path.join(base_dir, "2.png")
-    
-    if os.path.exists(img1_path):
-        add_h("附图1")
-        doc.add_picture(img1_path, width=Cm(14))
-    
-    if os.path.exists(img2_path):
-        add_h("附图2")
-        doc.add_picture(img2_path, width=Cm(14))
-
-    doc.save(path)
+    _render_doc(build_d21_report(name=name, inputs=inputs, result=result)).save(path)
     return path
 
 
@@ -260,52 +138,5 @@ def export_d22_docx(
     result: D22Result,
 ) -> str:
     path = _ensure_docx_suffix(path)
-    doc, add_title, add_h, add_line, Cm = _build_doc_base()
-
-    title_name = (name or "").strip()
-    suffix = f" - {title_name}" if title_name else ""
-    add_title(f"冲刷深度计算书 - D.2.2 护岸局部冲刷{suffix}")
-    add_line(f"生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    add_line("计算依据：规范 D.2.2（顺坡及平顺护岸局部冲刷深度）。")
-
-    add_h("1  已知条件")
-    add_line(
-        "H₀={H0} m，U={U} m/s，Uᴄ={Uc} m/s，α={alpha}°，n={n}".format(
-            H0=_fmt(inputs.get("H0"), 6),
-            U=_fmt(inputs.get("U"), 6),
-            Uc=_fmt(inputs.get("Uc"), 6),
-            alpha=_fmt(inputs.get("alpha_deg"), 6),
-            n=_fmt(inputs.get("n"), 6),
-        ),
-        use_format=False
-    )
-
-    add_h("2  计算过程")
-    add_line(f"η（表 D.2.2）= {_fmt(result.eta, 6)}", use_format=False)
-    add_line(f"Uₑₚ = U · (2η/(1+η)) = {_fmt(result.Uep, 6)} m/s", use_format=False)
-    add_line(f"hₛ = H₀ · [(Uₑₚ/Uᴄ)ⁿ − 1] = {_fmt(result.hs_local, 6)} m", use_format=False)
-
-    add_h("3  计算结果")
-    add_line(f"hₛ(局部) = {_fmt(result.hs_local, 6)} m", use_format=False)
-
-    add_h("附  中间量")
-    for k, v in asdict(result).items():
-        k_formatted = k.replace("_", "₋")
-        add_line(f"{k_formatted} = {_fmt(v, 12)}", level=1, use_format=False)
-    
-    # 添加图片附件
-    import os
-    base_dir = os.path.dirname(__file__)
-    img1_path = os.path.join(base_dir, "1.png")
-    img2_path = os.path.join(base_dir, "2.png")
-    
-    if os.path.exists(img1_path):
-        add_h("附图1")
-        doc.add_picture(img1_path, width=Cm(14))
-    
-    if os.path.exists(img2_path):
-        add_h("附图2")
-        doc.add_picture(img2_path, width=Cm(14))
-
-    doc.save(path)
+    _render_doc(build_d22_report(name=name, inputs=inputs, result=result)).save(path)
     return path
@@ -0,0 +1,347 @@
+"""批量 / 扫描结果的流式 Excel（xlsx）导出。
+
+工作簿不在内存中构建：每块结果直接转成工作表 XML 写入 zip 成员（只写、常数内存），
+字符串用行内字符串（不建共享字符串表）。单个工作表达到 Excel 行数上限（1,048,576 行，
+含表头）时自动另起一张，表头重复。
+
+    with XlsxStreamWriter("结果.xlsx", columns=D21_XLSX_COLUMNS, sheet_name="D.2.1") as w:
+        for cols, batch in iter_batches("d21", space, 10**6, fixed=fixed):
+            w.write_columns(d21_xlsx_columns({**fixed, **cols}, batch))
+
+也可直接用 `export_d21_xlsx`（取样 / 扫描存储的 (输入, 结果) 块）、
+`export_envelope_xlsx`（河段流水线结果块）。
+"""
+
+from __future__ import annotations
+
+import re
+import zipfile
+from typing import BinaryIO, Iterable, Iterator, Mapping, Sequence
+
+from scour_batch import D21Batch, _require_numpy
+from scour_calc import G, K1_LABELS, UC_LABELS, k1_code, uc_code
+
+
+EXCEL_MAX_ROWS = 1_048_576
+
+D21_INPUT_COLUMNS = (
+    "H0", "d50", "U", "L0", "B", "theta_deg", "m", "k1_type", "uc_method", "gamma_s", "gamma_w", "uc_manual",
+)
+D21_XLSX_COLUMNS = (
+    *D21_INPUT_COLUMNS, "k1", "k2", "k3", "Um", "Uc", "v_term", "hs_over_H0", "hs", "error",
+)
+
+_SHEET_BAD = re.compile(r"[\[\]:*?/\\]")
+_XML_BAD = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<worksheet xmlns="{_NS}" xmlns:r="{_NS_R}">'
+    '<sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    "</sheetView></sheetViews><sheetData>"
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<styleSheet xmlns="{_NS}">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+
+
+def _escape(s: str) -> str:
+    s = _XML_BAD.sub("", s)
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def _str_cell(s, *, style: str = "") -> str:
+    if s is None or s == "":
+        return "<c/>"
+    s = str(s)
+    space = ' xml:space="preserve"' if s != s.strip() else ""
+    return f'<c t="inlineStr"{style}><is><t{space}>{_escape(s)}</t></is></c>'
+
+
+def _num_cells(np, col) -> list[str]:
+    """数值列 → 单元格 XML；NaN / ±inf 为空单元格。"""
+    a = np.asarray(col, dtype=np.float64)
+    fin = np.isfinite(a).tolist()
+    return [f"<c><v>{v!r}</v></c>" if ok else "<c/>" for v, ok in zip(a.tolist(), fin)]
+
+
+def _cells(np, col, n: int) -> list[str]:
+    """任意一列（NumPy 数组、列表或标量）→ n 个单元格 XML。"""
+    if col is None:
+        return ["<c/>"] * n
+    if isinstance(col, str):
+        return [_str_cell(col)] * n
+    if np.ndim(col) == 0:
+        try:
+            cell = _num_cells(np, [float(col)])[0]
+        except (TypeError, ValueError):
+            cell = _str_cell(col)
+        return [cell] * n
+    a = np.asarray(col)
+    if len(a) != n:
+        raise ValueError(f"列长度 {len(a)} 与行数 {n} 不一致")
+    if a.dtype.kind in "fiub":
+        return _num_cells(np, a)
+    out = []
+    for v in a.tolist():
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            out.extend(_num_cells(np, [v]))
+        else:
+            out.append(_str_cell(v))
+    return out
+
+
+def _sheet_title(base: str, k: int) -> str:
+    base = _SHEET_BAD.sub("_", base or "Sheet").strip("'") or "Sheet"
+    if k == 1:
+        return base[:31]
+    suffix = f" ({k})"
+    return base[: 31 - len(suffix)] + suffix
+
+
+class XlsxStreamWriter:
+    """只写、常数内存的 xlsx 写出器。
+
+    `columns` 为表头；`write_columns` 每次写入一块列式数据，`write_rows` 写逐行数据。
+    `max_rows` 为每张工作表的最大行数（含表头），默认即 Excel 上限。
+    """
+
+    def __init__(
+        self,
+        f: str | BinaryIO,
+        *,
+        columns: Sequence[str],
+        sheet_name: str = "结果",
+        max_rows: int = EXCEL_MAX_ROWS,
+    ) -> None:
+        if max_rows < 2:
+            raise ValueError("max_rows 至少为 2（表头 + 1 行）")
+        if not columns:
+            raise ValueError("columns 不能为空")
+        self.columns = tuple(columns)
+        self.sheet_name = sheet_name
+        self.max_rows = int(max_rows)
+        self.rows_written = 0
+        self.sheets: list[str] = []
+        self._zf = zipfile.ZipFile(f, "w", compression=zipfile.ZIP_DEFLATED)
+        self._out = None
+        self._sheet_rows = 0
+        self._header = "<row>" + "".join(_str_cell(c, style=' s="1"') for c in self.columns) + "</row>"
+
+    # ---------------- 工作表 ----------------
+    def _open_sheet(self) -> None:
+        self._close_sheet()
+        k = len(self.sheets) + 1
+        self.sheets.append(_sheet_title(self.sheet_name, k))
+        self._out = self._zf.open(f"xl/worksheets/sheet{k}.xml", "w", force_zip64=True)
+        self._out.write(_SHEET_HEAD.encode("utf-8"))
+        self._out.write(self._header.encode("utf-8"))
+        self._sheet_rows = 1
+
+    def _close_sheet(self) -> None:
+        if self._out is not None:
+            self._out.write(_SHEET_TAIL.encode("utf-8"))
+            self._out.close()
+            self._out = None
+
+    def _write_xml_rows(self, rows: list[str]) -> None:
+        i = 0
+        while i < len(rows):
+            if self._out is None or self._sheet_rows >= self.max_rows:
+                self._open_sheet()
+            take = min(len(rows) - i, self.max_rows - self._sheet_rows)
+            self._out.write("".join(rows[i:i + take]).encode("utf-8"))
+            self._sheet_rows += take
+            self.rows_written += take
+            i += take
+
+    # ---------------- 写入 ----------------
+    def write_columns(self, cols: Mapping[str, object], n: int | None = None) -> int:
+        """写入一块列式数据（键为表头列名，缺列留空，标量列广播），返回行数。"""
+        np = _require_numpy()
+        if n is None:
+            n = max((len(v) for v in cols.values() if not isinstance(v, str) and np.ndim(v) > 0), default=0)
+        if n == 0:
+            return 0
+        cells = [_cells(np, cols.get(c), n) for c in self.columns]
+        self._write_xml_rows(["<row>" + "".join(r) + "</row>" for r in zip(*cells)])
+        return n
+
+    def write_rows(self, rows: Iterable[Sequence]) -> int:
+        """逐行写入（每行按表头顺序），返回行数。"""
+        np = _require_numpy()
+        out = []
+        for r in rows:
+            if len(r) != len(self.columns):
+                raise ValueError(f"行宽 {len(r)} 与表头 {len(self.columns)} 列不一致")
+            out.append("<row>" + "".join(_cells(np, v, 1)[0] for v in r) + "</row>")
+        self._write_xml_rows(out)
+        return len(out)
+
+    def close(self) -> None:
+        if self._zf is None:
+            return
+        if not self.sheets:
+            self._open_sheet()
+        self._close_sheet()
+        zf = self._zf
+        n = len(self.sheets)
+        zf.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            + "".join(
+                f'<Override PartName="/xl/worksheets/sheet{k}.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                for k in range(1, n + 1)
+            )
+            + "</Types>",
+        )
+        zf.writestr(
+            "_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{_PKG_REL}">'
+            f'<Relationship Id="rId1" Type="{_REL}/officeDocument" Target="xl/workbook.xml"/>'
+            "</Relationships>",
+        )
+        zf.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<workbook xmlns="{_NS}" xmlns:r="{_NS_R}"><sheets>'
+            + "".join(
+                f'<sheet name="{_escape(t)}" sheetId="{k}" r:id="rId{k}"/>'
+                for k, t in enumerate(self.sheets, start=1)
+            )
+            + "</sheets></workbook>",
+        )
+        zf.writestr(
+            "xl/_rels/workbook.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{_PKG_REL}">'
+            + "".join(
+                f'<Relationship Id="rId{k}" Type="{_REL}/worksheet" Target="worksheets/sheet{k}.xml"/>'
+                for k in range(1, n + 1)
+            )
+            + f'<Relationship Id="rId{n + 1}" Type="{_REL}/styles" Target="styles.xml"/>'
+            "</Relationships>",
+        )
+        zf.writestr("xl/styles.xml", _STYLES)
+        zf.close()
+        self._zf = None
+
+    def __enter__(self) -> "XlsxStreamWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------------- D.2.1 结果 ----------------
+
+def _label_column(np, col, to_code, labels):
+    """类别列（编码或显示文字，标量或数组）→ 显示文字。"""
+    if col is None:
+        return None
+    if isinstance(col, str) or np.ndim(col) == 0:
+        vals, scalar = [col], True
+    else:
+        vals, scalar = np.asarray(col).tolist(), False
+    cache: dict = {}
+    out = []
+    for v in vals:
+        if v not in cache:
+            try:
+                cache[v] = labels[to_code(int(v) if isinstance(v, float) else v)]
+            except (KeyError, ValueError, TypeError):
+                cache[v] = str(v)
+        out.append(cache[v])
+    return out[0] if scalar else out
+
+
+def d21_xlsx_columns(inputs: Mapping[str, object], batch: D21Batch) -> dict:
+    """一块 D.2.1 输入与结果 → `D21_XLSX_COLUMNS` 各列（含速度项 v 与错误文字）。"""
+    np = _require_numpy()
+    cols = {k: inputs.get(k) for k in D21_INPUT_COLUMNS}
+    cols["k1_type"] = _label_column(np, cols["k1_type"], k1_code, K1_LABELS)
+    cols["uc_method"] = _label_column(np, cols["uc_method"], uc_code, UC_LABELS)
+    cols.update(batch.to_dict(include_errors=False))
+    with np.errstate(all="ignore"):
+        d50 = np.broadcast_to(np.asarray(inputs.get("d50"), dtype=np.float64), (len(batch),))
+        cols["v_term"] = np.where(batch.ok, (batch.Um - batch.Uc) / np.sqrt(G * d50), np.nan)
+    cols["error"] = batch.errors()
+    return cols
+
+
+def export_d21_xlsx(
+    f: str | BinaryIO,
+    chunks: Iterable[tuple[Mapping[str, object], D21Batch]],
+    *,
+    fixed: Mapping[str, object] | None = None,
+    sheet_name: str = "D.2.1",
+    max_rows: int = EXCEL_MAX_ROWS,
+) -> int:
+    """逐块写出 D.2.1 (输入, 结果)，如 `scour_sampling.iter_batches` 或 `store_chunks` 的输出；返回行数。
+
+    `fixed` 为块中未包含的固定参数（如 `iter_batches` 的 `fixed`），按列广播写出。
+    """
+    fixed = dict(fixed or {})
+    with XlsxStreamWriter(f, columns=D21_XLSX_COLUMNS, sheet_name=sheet_name, max_rows=max_rows) as w:
+        for inputs, batch in chunks:
+            w.write_columns(d21_xlsx_columns({**fixed, **inputs}, batch), len(batch))
+    return w.rows_written
+
+
+def store_chunks(store, *, chunk_rows: int = 1 << 18) -> Iterator[tuple[dict, D21Batch]]:
+    """从扫描结果存储（`scour_store.ResultStore`）已写入部分按块读出 (输入, 结果)。"""
+    np = _require_numpy()
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows 必须为正")
+    for start in range(0, store.filled, chunk_rows):
+        stop = min(start + chunk_rows, store.filled)
+        yield store.inputs_at(np.arange(start, stop, dtype=np.int64)), store.read(slice(start, stop))
+
+
+def export_envelope_xlsx(
+    f: str | BinaryIO,
+    chunks: Iterable,
+    *,
+    sheet_name: str = "包络",
+    max_rows: int = EXCEL_MAX_ROWS,
+    columns: Sequence[str] | None = None,
+) -> int:
+    """逐块写出河段流水线结果（`scour_pipeline.ReachChunk`），列同包络 CSV；返回行数。
+
+    `columns` 缺省为包络 CSV 的列；沿程包络（`scour_reach.StructureChunk`）传 `REACH_COLUMNS`。
+    """
+    from scour_pipeline import ENVELOPE_COLUMNS
+
+    columns = ENVELOPE_COLUMNS if columns is None else columns
+    with XlsxStreamWriter(f, columns=columns, sheet_name=sheet_name, max_rows=max_rows) as w:
+        for chunk in chunks:
+            w.write_columns(chunk.columns(), len(chunk))
+    return w.rows_written